@@ -0,0 +1,5 @@
+"""Benchmarks of the topology aggregation pipeline.
+
+Run them with ``invoke bench`` (or ``python -m benchmarks``). The results are
+written as json to compare them across commits.
+"""
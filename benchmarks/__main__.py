@@ -0,0 +1,165 @@
+"""Command line interface of the benchmarks (``python -m benchmarks --help``)."""
+
+from datetime import datetime, timezone
+from json import dump, load
+from pathlib import Path
+from platform import platform, python_version
+from subprocess import CalledProcessError, check_output
+from typing import Any, Dict, Iterable, Iterator, Optional
+
+import click
+
+from .environment import benchmark_app
+from .timing import BenchmarkResult
+
+KB = 1024
+MB = 1024 * KB
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+# parameters of the benchmarks ("quick" runs in about a minute)
+PROFILES: Dict[str, Dict[str, Any]] = {
+    "quick": {
+        "nodes": [10, 100, 1000],
+        "densities": [0.1, 1.0],
+        "file_sizes": [1 * KB, 100 * KB, 1 * MB],
+        "solutions": [2, 10, 100],
+        "max_total_bytes": 4 * MB,
+        "end_to_end_nodes": [10, 100],
+        "end_to_end_file_sizes": [1 * KB, 100 * KB],
+        "end_to_end_max_total_bytes": 8 * MB,
+    },
+    "full": {
+        "nodes": [10, 100, 1000, 10000],
+        "densities": [0.1, 0.5, 1.0],
+        "file_sizes": [1 * KB, 10 * KB, 100 * KB, 1 * MB, 10 * MB],
+        "solutions": [2, 10, 100, 1000],
+        "max_total_bytes": 64 * MB,
+        "end_to_end_nodes": [10, 100, 1000],
+        "end_to_end_file_sizes": [1 * KB, 100 * KB, 1 * MB, 10 * MB],
+        "end_to_end_max_total_bytes": 64 * MB,
+    },
+}
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, CalledProcessError):
+        return None
+
+
+def run_benchmarks(
+    profile: Dict[str, Any], groups: Iterable[str]
+) -> Iterator[BenchmarkResult]:
+    from .end_to_end import bench_end_to_end
+    from .pipeline import bench_aggregation, bench_sections, bench_topology
+
+    groups = set(groups)
+    # the steps of the pipeline do not request the atlas
+    with benchmark_app("http://127.0.0.1:9") as app:
+        if "topology" in groups:
+            yield from bench_topology(app, profile["nodes"], profile["densities"])
+        if "sections" in groups:
+            yield from bench_sections(profile["file_sizes"])
+        if "aggregation" in groups:
+            yield from bench_aggregation(
+                app,
+                profile["solutions"],
+                profile["file_sizes"],
+                profile["max_total_bytes"],
+            )
+    if "end_to_end" in groups:
+        yield from bench_end_to_end(
+            profile["end_to_end_nodes"],
+            profile["end_to_end_file_sizes"],
+            profile["end_to_end_max_total_bytes"],
+        )
+
+
+def _format_duration(seconds: float) -> str:
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:8.1f} µs"
+    if seconds < 1:
+        return f"{seconds * 1e3:8.2f} ms"
+    return f"{seconds:8.3f} s "
+
+
+def _load_baseline(path: Path) -> Dict[str, float]:
+    with path.open(encoding="utf-8") as baseline_file:
+        return {
+            result["key"]: result["median"] for result in load(baseline_file)["results"]
+        }
+
+
+GROUPS = ("topology", "sections", "aggregation", "end_to_end")
+
+
+@click.command()
+@click.option(
+    "--profile",
+    type=click.Choice(list(PROFILES)),
+    default="quick",
+    show_default=True,
+    help="Set of benchmark parameters.",
+)
+@click.option(
+    "--group",
+    "groups",
+    type=click.Choice(GROUPS),
+    multiple=True,
+    help="Only run these benchmark groups (default: all).",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Result file (default: benchmarks/results/<commit>-<profile>.json).",
+)
+@click.option(
+    "--compare",
+    type=click.Path(exists=True, dir_okay=False, path_type=Path),
+    default=None,
+    help="Result file of an earlier run to compare the medians with.",
+)
+def main(
+    profile: str,
+    groups: Iterable[str],
+    output: Optional[Path],
+    compare: Optional[Path],
+):
+    """Benchmark the steps of the aggregation pipeline and the whole endpoint."""
+    baseline = _load_baseline(compare) if compare else {}
+    commit = _git_commit()
+    results = []
+    for result in run_benchmarks(PROFILES[profile], groups or GROUPS):
+        results.append(result)
+        line = (
+            f"{result.key:<80} median {_format_duration(result.median)}"
+            f"  min {_format_duration(result.min)}  n={result.samples}"
+        )
+        if result.key in baseline:
+            line += f"  {result.median / baseline[result.key]:6.2f}x baseline"
+        click.echo(line)
+
+    if output is None:
+        output = RESULTS_DIR / f"{commit or 'unknown'}-{profile}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with output.open("w", encoding="utf-8") as output_file:
+        dump(
+            {
+                "commit": commit,
+                "created": datetime.now(timezone.utc).isoformat(),
+                "profile": profile,
+                "python": python_version(),
+                "platform": platform(),
+                "results": [result.to_dict() for result in results],
+            },
+            output_file,
+            indent=2,
+        )
+    click.echo(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""End to end benchmarks of the aggregation endpoint against the QC Atlas stub."""
+
+from functools import partial
+from itertools import count
+from typing import Iterator, List
+
+from flask import Flask
+from requests import Session
+
+from .environment import TOPOLOGY_URL, benchmark_app, clear_caches, run_atlas_stub
+from .generators import concrete_solution_ids, generate_topology
+from .timing import BenchmarkResult, measure
+
+
+class AggregationFailedError(RuntimeError):
+    """Raised if the aggregation endpoint does not answer with 200."""
+
+
+def post_topology(app: Flask, topology) -> bytes:
+    """Aggregate a topology with the test client and read the whole response."""
+    with app.test_client() as client:
+        response = client.post(TOPOLOGY_URL, json=topology)
+        body = response.get_data()
+        response.close()
+    if response.status_code != 200:
+        raise AggregationFailedError(
+            f"Aggregation failed with {response.status_code}: {body[:200]!r}"
+        )
+    return body
+
+
+def _uncached(app: Flask, topology):
+    clear_caches()
+    return app, topology
+
+
+def _unique_topology(app: Flask, nodes: int, density: float, seeds, session: Session):
+    topology = generate_topology(nodes, density, seed=next(seeds))
+    # let the stub generate the new files before the timed request
+    for concrete_solution_id in concrete_solution_ids(topology):
+        session.get(
+            f"{app.config['ATLAS_BASE_URL']}/atlas/patterns/patternId/concrete-solutions"
+            f"/{concrete_solution_id}/file/content"
+        ).raise_for_status()
+    return app, topology
+
+
+def bench_end_to_end(
+    nodes: List[int], file_sizes: List[int], max_total_bytes: int, density: float = 0.5
+) -> Iterator[BenchmarkResult]:
+    """Benchmark uncached, cached and unique topologies through the endpoint.
+
+    * ``cold``: the same topology with all caches cleared before every request
+    * ``cached``: the same topology again (answered from the result cache)
+    * ``unique``: a new topology (new concrete solutions) for every request
+    """
+    for size in file_sizes:
+        with run_atlas_stub(file_size=size) as atlas_base_url, benchmark_app(
+            atlas_base_url
+        ) as app, Session() as session:
+            seeds = count(1)
+            for node_count in nodes:
+                topology = generate_topology(node_count, density)
+                if len(concrete_solution_ids(topology)) * size > max_total_bytes:
+                    continue
+                params = {"nodes": node_count, "file_size": size}
+                yield measure(
+                    "end_to_end",
+                    post_topology,
+                    {**params, "mode": "cold"},
+                    setup=partial(_uncached, app, topology),
+                )
+                yield measure(
+                    "end_to_end",
+                    post_topology,
+                    {**params, "mode": "cached"},
+                    args=(app, topology),
+                )
+                yield measure(
+                    "end_to_end",
+                    post_topology,
+                    {**params, "mode": "unique"},
+                    setup=partial(
+                        _unique_topology, app, node_count, density, seeds, session
+                    ),
+                )
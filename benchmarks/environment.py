@@ -0,0 +1,79 @@
+"""Module setting up the app and a local QC Atlas stub for the benchmarks."""
+
+from contextlib import contextmanager
+from tempfile import TemporaryDirectory
+from threading import Thread
+from typing import Any, Dict, Iterator, Optional
+
+from flask import Flask
+from werkzeug.serving import WSGIRequestHandler, make_server
+
+from bloqcat import create_app
+from bloqcat.aggregation import AGGREGATION_STATES, RESULT_CACHE
+from bloqcat.atlas import FILE_CACHE
+from bloqcat.atlas.stub import create_stub_app
+from bloqcat.db import DB
+from bloqcat.qasm import PROGRAM_CACHE
+from bloqcat.util.config import ProductionConfig
+
+TOPOLOGY_URL = "/api/v1/bloqcat/winery/topology/deploy/json"
+
+
+class QuietRequestHandler(WSGIRequestHandler):
+    """Request handler of the stub server that does not log every request."""
+
+    def log_request(self, *args, **kwargs):
+        pass
+
+
+def clear_caches():
+    """Empty all caches, the next aggregation fetches and parses every file again."""
+    for cache in (RESULT_CACHE, AGGREGATION_STATES, FILE_CACHE, PROGRAM_CACHE):
+        cache.clear()
+
+
+@contextmanager
+def run_atlas_stub(
+    file_size: int, qubits: int = 2, latency: float = 0.0, port: int = 0
+) -> Iterator[str]:
+    """Serve the QC Atlas stub with generated files in a thread, yields its base url."""
+    stub_app = create_stub_app(file_size=file_size, qubits=qubits, latency=latency)
+    server = make_server(
+        "127.0.0.1", port, stub_app, threaded=True, request_handler=QuietRequestHandler
+    )
+    thread = Thread(target=server.serve_forever, name="atlas-stub", daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_port}"
+    finally:
+        server.shutdown()
+        thread.join()
+
+
+def benchmark_config(
+    atlas_base_url: str, database_dir: str, overrides: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """The production config without tracing, metrics and the persistent file store."""
+    config = {key: getattr(ProductionConfig, key) for key in dir(ProductionConfig)}
+    config = {key: value for key, value in config.items() if key.isupper()}
+    config.update(
+        SQLALCHEMY_DATABASE_URI=f"sqlite:///{database_dir}/benchmark.db",
+        ATLAS_BASE_URL=atlas_base_url,
+        ATLAS_STORE_ENABLED=False,
+        TRACING_EXPORTER="none",
+        METRICS_ENABLED=False,
+    )
+    config.update(overrides or {})
+    return config
+
+
+@contextmanager
+def benchmark_app(
+    atlas_base_url: str, overrides: Optional[Dict[str, Any]] = None
+) -> Iterator[Flask]:
+    """Create the app with a temporary database for the benchmarks."""
+    with TemporaryDirectory(prefix="bloqcat-bench-") as database_dir:
+        app = create_app(benchmark_config(atlas_base_url, database_dir, overrides))
+        with app.app_context():
+            DB.create_all()
+        yield app
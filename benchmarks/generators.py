@@ -0,0 +1,104 @@
+"""Generators for synthetic winery topologies and QASM concrete solutions."""
+
+from random import Random
+from typing import Any, Dict, List
+
+from bloqcat.aggregation.ingest import CONCRETE_SOLUTION_PREFIX
+from bloqcat.atlas.stub import generate_qasm
+
+
+def _node(node_id: str, name: str, qubits: int, has_header: bool) -> Dict[str, Any]:
+    return {
+        "id": node_id,
+        "name": name,
+        "type": "{http://opentosca.org/nodetypes}Pattern",
+        "properties": {
+            "kvproperties": {
+                "QubitCount": str(qubits),
+                "hasHeader": "true" if has_header else "false",
+            }
+        },
+    }
+
+
+def _relationship(name: str, source: str, target: str) -> Dict[str, Any]:
+    return {
+        "id": f"{name}-{source}-{target}",
+        "name": name,
+        "sourceElement": {"ref": source},
+        "targetElement": {"ref": target},
+    }
+
+
+def concrete_solution_ids(topology: Dict[str, Any]) -> List[str]:
+    """The ids of all concrete solution nodes of a topology."""
+    return [
+        node["id"]
+        for node in topology["nodeTemplates"]
+        if node["name"].startswith(CONCRETE_SOLUTION_PREFIX)
+    ]
+
+
+def generate_topology(
+    nodes: int,
+    aggregation_density: float = 0.5,
+    qubits: int = 2,
+    has_header: bool = True,
+    seed: int = 0,
+    id_prefix: str = "",
+) -> Dict[str, Any]:
+    """Generate a winery topology with ``nodes`` node templates.
+
+    A share of ``aggregation_density`` of the nodes (at least two) are concrete
+    solutions chained by aggregation relationships in a shuffled order, the
+    other nodes are patterns with a solution relationship to a random node.
+    Ids depend on the seed (and start with ``id_prefix``), so topologies with
+    different seeds do not share concrete solutions.
+    """
+    rng = Random(seed)
+    solution_count = min(nodes, max(2, round(nodes * aggregation_density)))
+    node_templates = [
+        _node(
+            f"{id_prefix}cs-{seed}-{index}",
+            f"{CONCRETE_SOLUTION_PREFIX} Pattern {index}",
+            qubits,
+            has_header,
+        )
+        for index in range(solution_count)
+    ]
+    node_templates += [
+        _node(f"pattern-{seed}-{index}", f"Pattern {index}", qubits, has_header)
+        for index in range(nodes - solution_count)
+    ]
+    rng.shuffle(node_templates)
+
+    solution_ids = [f"{id_prefix}cs-{seed}-{index}" for index in range(solution_count)]
+    relationships = [
+        _relationship("Aggregation", source, target)
+        for source, target in zip(solution_ids, solution_ids[1:])
+    ]
+    for index in range(nodes - solution_count):
+        target = rng.choice(node_templates)["id"]
+        relationships.append(_relationship("Solution", f"pattern-{seed}-{index}", target))
+    rng.shuffle(relationships)
+
+    return {
+        "id": f"service-template-{seed}",
+        "name": f"Benchmark {nodes} nodes",
+        "nodeTemplates": node_templates,
+        "relationshipTemplates": relationships,
+    }
+
+
+def generate_concrete_solutions(
+    topology: Dict[str, Any], size: int, qubits: int = 2
+) -> Dict[str, str]:
+    """Generate a QASM file of roughly ``size`` bytes per concrete solution.
+
+    The files are the same as the ones served by the QC Atlas stub with a
+    synthetic file size.
+    """
+    return {
+        node_id: generate_qasm(size, qubits, seed=node_id)
+        for node_id in concrete_solution_ids(topology)
+    }
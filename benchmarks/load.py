@@ -0,0 +1,432 @@
+"""Load test of the aggregation endpoint (``python -m benchmarks.load --help``).
+
+The app is started under gunicorn or waitress (if installed, the threaded
+werkzeug server otherwise) in a separate process together with the QC Atlas
+stub. Client threads post topologies according to a request mix for a fixed
+duration and the throughput, latency percentiles and error rates are reported.
+"""
+
+from contextlib import contextmanager
+from functools import partial
+from itertools import count
+from json import dump, dumps
+from multiprocessing import Process
+from os import environ
+from pathlib import Path
+from random import Random
+from socket import create_connection
+from subprocess import DEVNULL, Popen, run
+from sys import executable
+from tempfile import TemporaryDirectory
+from threading import Lock, Thread
+from time import monotonic, perf_counter, sleep
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+import click
+from requests import RequestException, Session
+
+from .environment import TOPOLOGY_URL
+from .generators import generate_topology
+
+KB = 1024
+MB = 1024 * KB
+
+PROJECT_DIR = Path(__file__).parent.parent
+
+SERVERS = ("gunicorn", "waitress", "werkzeug")
+
+# kinds of requests: repeated requests are answered from the result cache after
+# the first request, unique topologies contain new concrete solutions
+SCENARIOS = ("repeated-small", "repeated-large", "unique-small", "unique-large")
+
+
+class Sample(NamedTuple):
+    scenario: str
+    start: float
+    duration: float
+    status: str
+
+
+def _file_size(small: int, large: int, concrete_solution_id: str) -> int:
+    return large if concrete_solution_id.startswith("large-") else small
+
+
+def _serve_stub(port: int, small: int, large: int, latency: float):
+    from werkzeug.serving import make_server
+
+    from bloqcat.atlas.stub import create_stub_app
+
+    from .environment import QuietRequestHandler
+
+    stub_app = create_stub_app(
+        file_size=partial(_file_size, small, large), latency=latency
+    )
+    make_server(
+        "127.0.0.1", port, stub_app, threaded=True, request_handler=QuietRequestHandler
+    ).serve_forever()
+
+
+def _wait_for_port(port: int, timeout: float = 30):
+    deadline = monotonic() + timeout
+    while True:
+        try:
+            create_connection(("127.0.0.1", port), timeout=1).close()
+            return
+        except OSError:
+            if monotonic() > deadline:
+                raise click.ClickException(f"Nothing is listening on port {port}.")
+            sleep(0.1)
+
+
+def detect_server() -> str:
+    for server in SERVERS[:-1]:
+        try:
+            __import__(server)
+        except ImportError:
+            continue
+        return server
+    return "werkzeug"
+
+
+def server_command(server: str, port: int, workers: int, threads: int) -> List[str]:
+    if server == "gunicorn":
+        return [
+            executable,
+            "-m",
+            "gunicorn",
+            f"--workers={workers}",
+            f"--threads={threads}",
+            f"--bind=127.0.0.1:{port}",
+            "bloqcat:create_app()",
+        ]
+    if server == "waitress":
+        return [
+            executable,
+            "-m",
+            "waitress",
+            f"--threads={threads}",
+            f"--listen=127.0.0.1:{port}",
+            "--call",
+            "bloqcat:create_app",
+        ]
+    return [
+        executable,
+        "-m",
+        "flask",
+        "--app",
+        "bloqcat",
+        "run",
+        f"--port={port}",
+        "--with-threads",
+        "--no-reload",
+        "--no-debugger",
+    ]
+
+
+@contextmanager
+def run_services(
+    server: str,
+    port: int,
+    atlas_port: int,
+    workers: int,
+    threads: int,
+    small: int,
+    large: int,
+    atlas_latency: float,
+    server_log: Optional[Path] = None,
+) -> Iterator[str]:
+    """Start the QC Atlas stub and the app in separate processes, yields the app url."""
+    stub = Process(
+        target=_serve_stub, args=(atlas_port, small, large, atlas_latency), daemon=True
+    )
+    stub.start()
+    with TemporaryDirectory(prefix="bloqcat-load-") as instance_path:
+        env = {
+            **environ,
+            "INSTANCE_PATH": instance_path,
+            "FLASK_ENV": "production",
+            "BLOQCAT_ATLAS_BASE_URL": f"http://127.0.0.1:{atlas_port}",
+            "BLOQCAT_TRACING_EXPORTER": "none",
+        }
+        run(
+            [executable, "-m", "flask", "--app", "bloqcat", "db", "upgrade"],
+            cwd=PROJECT_DIR,
+            env=env,
+            check=True,
+            capture_output=True,
+        )
+        log = server_log.open("wb") if server_log is not None else DEVNULL
+        app_process = Popen(
+            server_command(server, port, workers, threads),
+            cwd=PROJECT_DIR,
+            env=env,
+            stdout=log,
+            stderr=log,
+        )
+        try:
+            _wait_for_port(atlas_port)
+            _wait_for_port(port)
+            yield f"http://127.0.0.1:{port}"
+        finally:
+            app_process.terminate()
+            app_process.wait(timeout=30)
+            stub.terminate()
+            stub.join()
+            if log is not DEVNULL:
+                log.close()
+
+
+class RequestMix:
+    """Picks scenarios by weight and creates the topologies for them."""
+
+    def __init__(self, weights: Dict[str, float], nodes: int, seed: int = 0):
+        self.scenarios = list(weights)
+        self.weights = [weights[scenario] for scenario in self.scenarios]
+        self.nodes = nodes
+        self._rng = Random(seed)
+        self._seeds = count(1)
+        self._lock = Lock()
+        self._repeated = {
+            scenario: self._body(scenario, seed=0)
+            for scenario in ("repeated-small", "repeated-large")
+        }
+
+    def _body(self, scenario: str, seed: int) -> bytes:
+        # the prefix of the concrete solution ids selects the file size of the stub
+        size = scenario.split("-")[1]
+        topology = generate_topology(self.nodes, seed=seed, id_prefix=f"{size}-")
+        return dumps(topology).encode()
+
+    def next_request(self) -> Tuple[str, bytes]:
+        with self._lock:
+            scenario = self._rng.choices(self.scenarios, self.weights)[0]
+            seed = next(self._seeds)
+        if scenario in self._repeated:
+            return scenario, self._repeated[scenario]
+        return scenario, self._body(scenario, seed)
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(","):
+        scenario, _, weight = part.partition("=")
+        if scenario not in SCENARIOS:
+            raise click.BadParameter(
+                f"Unknown scenario '{scenario}', use one of {', '.join(SCENARIOS)}."
+            )
+        weights[scenario] = float(weight or 1)
+    return weights
+
+
+def drive_load(
+    base_url: str,
+    next_request: Callable[[], Tuple[str, bytes]],
+    concurrency: int,
+    duration: float,
+    timeout: float,
+) -> List[Sample]:
+    """Post topologies from ``concurrency`` threads for ``duration`` seconds."""
+    samples: List[Sample] = []
+    stop_at = perf_counter() + duration
+
+    def client():
+        with Session() as session:
+            while perf_counter() < stop_at:
+                scenario, body = next_request()
+                start = perf_counter()
+                try:
+                    response = session.post(
+                        base_url + TOPOLOGY_URL,
+                        data=body,
+                        headers={"Content-Type": "application/json"},
+                        timeout=timeout,
+                    )
+                    status = str(response.status_code)
+                except RequestException as err:
+                    status = type(err).__name__
+                samples.append(Sample(scenario, start, perf_counter() - start, status))
+
+    threads = [Thread(target=client) for _ in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def percentile(sorted_values: List[float], share: float) -> float:
+    """Nearest rank percentile of sorted values."""
+    if not sorted_values:
+        return 0.0
+    index = max(0, min(len(sorted_values) - 1, round(share * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def summarize(samples: List[Sample], duration: float) -> Dict[str, Any]:
+    durations = sorted(sample.duration for sample in samples)
+    statuses: Dict[str, int] = {}
+    for sample in samples:
+        statuses[sample.status] = statuses.get(sample.status, 0) + 1
+    errors = sum(number for status, number in statuses.items() if status != "200")
+    return {
+        "requests": len(samples),
+        "rps": len(samples) / duration if duration else 0.0,
+        "p50": percentile(durations, 0.50),
+        "p95": percentile(durations, 0.95),
+        "p99": percentile(durations, 0.99),
+        "max": durations[-1] if durations else 0.0,
+        "error_rate": errors / len(samples) if samples else 0.0,
+        "statuses": statuses,
+    }
+
+
+def _print_summary(name: str, summary: Dict[str, Any]):
+    click.echo(
+        f"{name:<16} {summary['requests']:>7} req {summary['rps']:>8.1f} req/s"
+        f"  p50 {summary['p50'] * 1e3:8.1f} ms  p95 {summary['p95'] * 1e3:8.1f} ms"
+        f"  p99 {summary['p99'] * 1e3:8.1f} ms  errors {summary['error_rate']:6.2%}"
+    )
+
+
+@click.command()
+@click.option(
+    "--server",
+    type=click.Choice(("auto",) + SERVERS),
+    default="auto",
+    show_default=True,
+    help="WSGI server of the app (auto: gunicorn, waitress or werkzeug).",
+)
+@click.option("--port", type=int, default=5005, show_default=True)
+@click.option("--atlas-port", type=int, default=6627, show_default=True)
+@click.option(
+    "--workers", type=int, default=2, show_default=True, help="gunicorn workers."
+)
+@click.option(
+    "--threads", type=int, default=8, show_default=True, help="Threads per worker."
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=click.IntRange(min=1),
+    default=8,
+    show_default=True,
+    help="Number of concurrent clients.",
+)
+@click.option(
+    "--duration", type=float, default=30, show_default=True, help="Seconds of load."
+)
+@click.option(
+    "--warmup",
+    type=float,
+    default=5,
+    show_default=True,
+    help="Seconds of load before the measurement.",
+)
+@click.option(
+    "--mix",
+    default="repeated-small=60,unique-small=30,repeated-large=5,unique-large=5",
+    show_default=True,
+    help=f"Weighted request mix of the scenarios {', '.join(SCENARIOS)}.",
+)
+@click.option(
+    "--nodes", type=int, default=20, show_default=True, help="Nodes per topology."
+)
+@click.option("--small-size", type=int, default=4 * KB, show_default=True)
+@click.option("--large-size", type=int, default=1 * MB, show_default=True)
+@click.option(
+    "--atlas-latency",
+    type=float,
+    default=0.02,
+    show_default=True,
+    help="Latency of the QC Atlas stub in seconds.",
+)
+@click.option("--timeout", type=float, default=60, show_default=True)
+@click.option(
+    "--server-log",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the output of the app server to this file (discarded by default).",
+)
+@click.option(
+    "--output",
+    type=click.Path(dir_okay=False, path_type=Path),
+    default=None,
+    help="Write the report as json to this file.",
+)
+def main(
+    server: str,
+    port: int,
+    atlas_port: int,
+    workers: int,
+    threads: int,
+    concurrency: int,
+    duration: float,
+    warmup: float,
+    mix: str,
+    nodes: int,
+    small_size: int,
+    large_size: int,
+    atlas_latency: float,
+    timeout: float,
+    server_log: Optional[Path],
+    output: Optional[Path],
+):
+    """Drive the aggregation endpoint with concurrent clients and report the
+    throughput and the tail latencies."""
+    weights = parse_mix(mix)
+    if server == "auto":
+        server = detect_server()
+    processes = f"{workers} workers, " if server == "gunicorn" else ""
+    click.echo(
+        f"Starting the app with {server} ({processes}{threads} threads) "
+        "and the QC Atlas stub."
+    )
+    request_mix = RequestMix(weights, nodes)
+    with run_services(
+        server,
+        port,
+        atlas_port,
+        workers,
+        threads,
+        small_size,
+        large_size,
+        atlas_latency,
+        server_log,
+    ) as base_url:
+        if warmup > 0:
+            drive_load(base_url, request_mix.next_request, concurrency, warmup, timeout)
+        samples = drive_load(
+            base_url, request_mix.next_request, concurrency, duration, timeout
+        )
+
+    report = {
+        "server": server,
+        "workers": workers,
+        "threads": threads,
+        "concurrency": concurrency,
+        "duration": duration,
+        "mix": weights,
+        "nodes": nodes,
+        "small_size": small_size,
+        "large_size": large_size,
+        "total": summarize(samples, duration),
+        "scenarios": {
+            scenario: summarize(
+                [sample for sample in samples if sample.scenario == scenario], duration
+            )
+            for scenario in weights
+        },
+    }
+    _print_summary("total", report["total"])
+    for scenario, summary in report["scenarios"].items():
+        _print_summary(scenario, summary)
+    statuses = report["total"]["statuses"]
+    click.echo("statuses: " + ", ".join(f"{s}={n}" for s, n in sorted(statuses.items())))
+    if output is not None:
+        with output.open("w", encoding="utf-8") as output_file:
+            dump(report, output_file, indent=2)
+        click.echo(f"Report written to {output}")
+
+
+if __name__ == "__main__":
+    main()
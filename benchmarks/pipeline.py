@@ -0,0 +1,117 @@
+"""Benchmarks of the single steps of the :class:`TopologyView` pipeline."""
+
+from functools import partial
+from typing import Any, Dict, Iterator, List
+
+from flask import Flask
+
+from bloqcat.aggregation import TopologyGraph, extract_topology
+from bloqcat.api.v1_api.bloqcat import TopologyView
+from bloqcat.atlas.stub import generate_qasm
+from bloqcat.qasm import PROGRAM_CACHE
+
+from .generators import generate_concrete_solutions, generate_topology
+from .timing import BenchmarkResult, measure
+
+
+def _prepared_topology(nodes: int, density: float):
+    record = extract_topology(generate_topology(nodes, density))
+    return record, TopologyGraph.from_record(record)
+
+
+def _new_graph(record):
+    return (TopologyGraph.from_record(record),)
+
+
+def _ordered_graph(record):
+    # the aggregation order is computed by validate_path before the solution path
+    topology = TopologyGraph.from_record(record)
+    topology.aggregation_order()
+    return (topology,)
+
+
+def bench_topology(
+    app: Flask, nodes: List[int], densities: List[float]
+) -> Iterator[BenchmarkResult]:
+    """Benchmark the validation and the solution path of generated topologies."""
+    view = TopologyView()
+    for node_count in nodes:
+        for density in densities:
+            params = {"nodes": node_count, "density": density}
+            record, topology = _prepared_topology(node_count, density)
+            yield measure(
+                "build_graph", TopologyGraph.from_record, params, args=(record,)
+            )
+            yield measure(
+                "validate_data", view.validate_data, params, args=(record, topology)
+            )
+            # the aggregation order is cached per graph, use a new graph per sample
+            yield measure(
+                "validate_path",
+                view.validate_path,
+                params,
+                setup=partial(_new_graph, record),
+            )
+            with app.app_context():
+                yield measure(
+                    "create_solution_path",
+                    view.create_solution_path,
+                    params,
+                    setup=partial(_ordered_graph, record),
+                )
+
+
+def bench_sections(file_sizes: List[int]) -> Iterator[BenchmarkResult]:
+    """Benchmark the extraction of the sections of single QASM files."""
+    view = TopologyView()
+    for size in file_sizes:
+        text = generate_qasm(size)
+        params = {"file_size": size}
+        yield measure("extract_cs", view.extract_cs, params, args=(text,))
+        yield measure(
+            "extract_header_until_reg",
+            view.extract_header_until_reg,
+            params,
+            args=(text,),
+        )
+
+
+def _cold_arguments(arguments):
+    PROGRAM_CACHE.clear()
+    return arguments
+
+
+def bench_aggregation(
+    app: Flask, solutions: List[int], file_sizes: List[int], max_total_bytes: int
+) -> Iterator[BenchmarkResult]:
+    """Benchmark the aggregation of parsed (warm) and unparsed (cold) files."""
+    view = TopologyView()
+    for solution_count in solutions:
+        for size in file_sizes:
+            if solution_count * size > max_total_bytes:
+                continue
+            topology_data = generate_topology(solution_count, aggregation_density=1)
+            files = generate_concrete_solutions(topology_data, size)
+            with app.app_context():
+                topology = TopologyGraph.from_topology(topology_data)
+                solution_nodes, solution_relationships = view.create_solution_path(
+                    topology
+                )
+            arguments = (
+                [files[node_id] for node_id in solution_nodes],
+                solution_nodes,
+                solution_relationships,
+            )
+            params: Dict[str, Any] = {"solutions": solution_count, "file_size": size}
+            yield measure(
+                "aggregate_concrete_solution_files",
+                view.aggregate_concrete_solution_files,
+                {**params, "programs": "cold"},
+                setup=partial(_cold_arguments, arguments),
+            )
+            yield measure(
+                "aggregate_concrete_solution_files",
+                view.aggregate_concrete_solution_files,
+                {**params, "programs": "cached"},
+                args=arguments,
+            )
@@ -0,0 +1,60 @@
+"""Module containing the timing of single benchmarks and the result records."""
+
+from statistics import mean, median, stdev
+from time import perf_counter
+from typing import Any, Callable, Dict, NamedTuple, Optional, Sequence
+
+
+class BenchmarkResult(NamedTuple):
+    name: str
+    params: Dict[str, Any]
+    samples: int
+    min: float
+    median: float
+    mean: float
+    stdev: float
+
+    @property
+    def key(self) -> str:
+        params = ",".join(f"{key}={value}" for key, value in self.params.items())
+        return f"{self.name}[{params}]" if params else self.name
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"key": self.key, **self._asdict()}
+
+
+def measure(
+    name: str,
+    func: Callable[..., Any],
+    params: Optional[Dict[str, Any]] = None,
+    args: Sequence[Any] = (),
+    setup: Optional[Callable[[], Sequence[Any]]] = None,
+    min_samples: int = 5,
+    max_samples: int = 1000,
+    min_time: float = 0.5,
+) -> BenchmarkResult:
+    """Time ``func`` until ``min_samples`` samples and ``min_time`` seconds are reached.
+
+    ``func`` is called with ``args`` or, if given, with the arguments returned by
+    ``setup`` which is called (untimed) before every sample.
+    """
+    durations = []
+    total = 0.0
+    while len(durations) < max_samples and (
+        len(durations) < min_samples or total < min_time
+    ):
+        arguments = setup() if setup is not None else args
+        start = perf_counter()
+        func(*arguments)
+        duration = perf_counter() - start
+        durations.append(duration)
+        total += duration
+    return BenchmarkResult(
+        name,
+        params or {},
+        len(durations),
+        min(durations),
+        median(durations),
+        mean(durations),
+        stdev(durations) if len(durations) > 1 else 0.0,
+    )
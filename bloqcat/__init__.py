@@ -20,6 +20,12 @@ from .util.config import ProductionConfig, DebugConfig
 from . import babel
 from . import licenses
 from . import db
+from . import profiling
+from . import tracing
+from . import atlas
+from . import qasm
+from . import aggregation
+from . import metrics
 from . import api
 from .api import jwt
 
@@ -63,7 +69,8 @@ def create_app(test_config: Optional[Dict[str, Any]] = None):
         config.from_file("config.toml", load=load_toml, silent=True)
         # load config from file specified in env var
         config.from_envvar(f"{CONFIG_ENV_VAR_PREFIX}_SETTINGS", silent=True)
-        # TODO load some config keys directly from env vars
+        # load single config keys from env vars (e.g. BLOQCAT_ATLAS_BASE_URL)
+        config.from_prefixed_env(CONFIG_ENV_VAR_PREFIX)
     else:
         # load the test config if passed in
         config.from_mapping(test_config)
@@ -115,6 +122,16 @@ def create_app(test_config: Optional[Dict[str, Any]] = None):
 
     db.register_db(app)
 
+    profiling.register_profiling(app)
+    tracing.register_tracing(app)
+
+    atlas.register_atlas(app)
+
+    qasm.register_qasm(app)
+    aggregation.register_aggregation(app)
+
+    metrics.register_metrics(app)
+
     jwt.register_jwt(app)
     api.register_root_api(app)
 
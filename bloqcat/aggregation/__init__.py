@@ -0,0 +1,71 @@
+"""Module containing the topology processing, the caching of aggregation results
+and the asynchronous aggregation jobs."""
+
+from flask import Flask
+
+from .fingerprint import topology_fingerprint
+from .graph import TopologyCycleError, TopologyGraph
+from .ingest import (
+    BodyTooLargeError,
+    NodeRecord,
+    RelationshipRecord,
+    TopologyFormatError,
+    TopologyRecord,
+    extract_topology,
+    loads_json,
+    parse_topology,
+    read_body,
+)
+from .incremental import (
+    AGGREGATION_STATES,
+    SolutionBlock,
+    configure_aggregation_states,
+    split_reusable_blocks,
+    store_aggregation_state,
+)
+from .jobs import AGGREGATION_LOGGER, JOB_WORKERS, JobState, get_job
+from .results import (
+    RESULT_CACHE,
+    CachedResult,
+    cache_result,
+    configure_result_cache,
+    get_cached_body,
+    tee_into_cache,
+)
+
+
+def register_aggregation(app: Flask):
+    """Configure the aggregation caches and the aggregation job workers."""
+    configure_result_cache(app)
+    configure_aggregation_states(app)
+    JOB_WORKERS.init_app(app)
+
+
+__all__ = [
+    "AGGREGATION_LOGGER",
+    "AGGREGATION_STATES",
+    "BodyTooLargeError",
+    "CachedResult",
+    "JOB_WORKERS",
+    "JobState",
+    "NodeRecord",
+    "RESULT_CACHE",
+    "RelationshipRecord",
+    "SolutionBlock",
+    "TopologyCycleError",
+    "TopologyFormatError",
+    "TopologyGraph",
+    "TopologyRecord",
+    "cache_result",
+    "extract_topology",
+    "get_cached_body",
+    "get_job",
+    "loads_json",
+    "parse_topology",
+    "read_body",
+    "split_reusable_blocks",
+    "store_aggregation_state",
+    "register_aggregation",
+    "tee_into_cache",
+    "topology_fingerprint",
+]
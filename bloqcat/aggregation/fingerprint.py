@@ -0,0 +1,33 @@
+"""Module containing the canonical fingerprint of an aggregation request."""
+
+from hashlib import sha256
+from json import dumps
+from typing import Dict, Iterable
+
+from .graph import AGGREGATION
+from .ingest import NodeRecord, RelationshipRecord
+
+
+def topology_fingerprint(
+    solution_nodes: Dict[str, NodeRecord],
+    solution_relationships: Iterable[RelationshipRecord],
+    content_hashes: Iterable[str],
+) -> str:
+    """Compute a canonical hash of everything the aggregated file depends on.
+
+    Only the fields of the solution nodes that are used by the aggregation, the
+    aggregation relationships between them and the content hashes of their files
+    are included. The order of the solution nodes is part of the fingerprint as it
+    determines the order of the concrete solutions in the output; the order of the
+    relationships and of any json keys is not.
+    """
+    relationships = sorted(
+        [r.source, r.target] for r in solution_relationships if r.name == AGGREGATION
+    )
+    canonical = {
+        "nodes": [list(node) for node in solution_nodes.values()],
+        "relationships": relationships,
+        "files": list(content_hashes),
+    }
+    encoded = dumps(canonical, sort_keys=True, separators=(",", ":"))
+    return sha256(encoded.encode()).hexdigest()
@@ -0,0 +1,134 @@
+"""Module containing an indexed view of a winery topology."""
+
+from heapq import heapify, heappop, heappush
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from .ingest import NodeRecord, RelationshipRecord, TopologyRecord, extract_topology
+
+AGGREGATION = "Aggregation"
+
+
+class TopologyCycleError(ValueError):
+    """Raised if the aggregation relationships of a topology contain a cycle."""
+
+    def __init__(self, node_ids: Sequence[str]):
+        super().__init__(
+            "The aggregation relationships contain a cycle, the nodes "
+            + ", ".join(node_ids)
+            + " can not be ordered."
+        )
+        self.node_ids = list(node_ids)
+
+
+class TopologyGraph:
+    """Nodes and relationships of a topology indexed in a single pass.
+
+    Nodes are indexed by id and by kind (concrete solutions are recognized by
+    their name), the aggregation relationships between concrete solutions are
+    kept as adjacency lists for the aggregation order. All indexes keep the order
+    of the topology.
+    """
+
+    def __init__(
+        self, nodes: Sequence[NodeRecord], relationships: Sequence[RelationshipRecord]
+    ):
+        self.node_list = nodes
+        self.relationship_list = relationships
+
+        self.nodes: Dict[str, NodeRecord] = {}
+        self.concrete_solutions: Dict[str, NodeRecord] = {}
+        for node in nodes:
+            self.nodes[node.id] = node
+            if node.is_concrete_solution:
+                self.concrete_solutions[node.id] = node
+
+        self._aggregation_relationships: List[RelationshipRecord] = []
+        # successors and number of predecessors of the aggregated concrete solutions
+        self._successors: Dict[str, List[str]] = {}
+        self._in_degree: Dict[str, int] = {}
+        self._aggregation_order: Optional[List[str]] = None
+        concrete_solutions = self.concrete_solutions
+        for relationship in relationships:
+            source_id, target_id = relationship.source, relationship.target
+            if (
+                relationship.name == AGGREGATION
+                and source_id in concrete_solutions
+                and target_id in concrete_solutions
+            ):
+                self._aggregation_relationships.append(relationship)
+                self._successors.setdefault(source_id, []).append(target_id)
+                self._successors.setdefault(target_id, [])
+                self._in_degree[target_id] = self._in_degree.get(target_id, 0) + 1
+                self._in_degree.setdefault(source_id, 0)
+
+    @classmethod
+    def from_record(cls, record: TopologyRecord) -> "TopologyGraph":
+        """Build the graph of the records of a topology."""
+        return cls(record.nodes or [], record.relationships or [])
+
+    @classmethod
+    def from_topology(cls, data: Mapping[str, Any]) -> "TopologyGraph":
+        """Build the graph of a parsed topology json document."""
+        return cls.from_record(extract_topology(data))
+
+    def aggregation_relationships(self) -> List[RelationshipRecord]:
+        """Return the aggregation relationships between two concrete solutions."""
+        return self._aggregation_relationships
+
+    def aggregation_order(self) -> List[str]:
+        """Return the ids of the concrete solutions connected by an aggregation
+        relationship in topological order of the aggregation relationships.
+
+        Nodes without an ordering constraint between them keep the order of the
+        node templates, so the order only depends on the topology itself.
+
+        Raises:
+            TopologyCycleError: if the aggregation relationships contain a cycle
+        """
+        if self._aggregation_order is not None:
+            return self._aggregation_order
+
+        successors = self._successors
+        in_degree = dict(self._in_degree)
+
+        # Kahn's algorithm, ties are broken by the position in the node templates
+        position = {node_id: index for index, node_id in enumerate(self.nodes)}
+        ready = [(position[i], i) for i, degree in in_degree.items() if degree == 0]
+        heapify(ready)
+        order = []
+        while ready:
+            _, node_id = heappop(ready)
+            order.append(node_id)
+            for successor in successors[node_id]:
+                in_degree[successor] -= 1
+                if in_degree[successor] == 0:
+                    heappush(ready, (position[successor], successor))
+
+        if len(order) != len(in_degree):
+            remaining = [i for i in self.nodes if in_degree.get(i, 0) > 0]
+            raise TopologyCycleError(remaining)
+
+        self._aggregation_order = order
+        return order
+
+    def solution_path(
+        self,
+    ) -> Tuple[Dict[str, NodeRecord], List[RelationshipRecord]]:
+        """Return the concrete solutions connected by an aggregation relationship
+        in aggregation order and all relationships between them.
+
+        Raises:
+            TopologyCycleError: if the aggregation relationships contain a cycle
+        """
+        concrete_solutions = self.concrete_solutions
+        solution_nodes: Dict[str, NodeRecord] = {
+            node_id: concrete_solutions[node_id] for node_id in self.aggregation_order()
+        }
+
+        solution_relationships = [
+            relationship
+            for relationship in self.relationship_list
+            if relationship.source in solution_nodes
+            and relationship.target in solution_nodes
+        ]
+        return solution_nodes, solution_relationships
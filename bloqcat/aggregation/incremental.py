@@ -0,0 +1,81 @@
+"""Module containing the state for incremental re-aggregations.
+
+The rendered concrete solution blocks of the last aggregation of every service
+template are kept, so that a redeploy only has to process the concrete solutions
+whose node or file changed. The files are still revalidated (from the file cache
+or with a conditional request to the QC Atlas) to detect changed files.
+"""
+
+from typing import Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from flask import Flask
+
+from ..qasm import QasmProgram
+from ..util.cache import LRUCache
+from .ingest import NodeRecord
+
+
+class SolutionBlock(NamedTuple):
+    """The rendered block of a concrete solution in the aggregated file."""
+
+    node: NodeRecord
+    content_hash: str
+    program: QasmProgram
+    chunk: str
+
+
+class AggregationState(NamedTuple):
+    """The blocks of the last aggregation of a service template by node id."""
+
+    blocks: Dict[str, SolutionBlock]
+
+    @property
+    def size(self) -> int:
+        return sum(len(block.chunk) for block in self.blocks.values())
+
+
+AGGREGATION_STATES: LRUCache[AggregationState] = LRUCache(max_entries=256, ttl=600)
+
+
+def configure_aggregation_states(app: Flask):
+    """Configure the limits of the stored incremental aggregation states."""
+    config = app.config
+    AGGREGATION_STATES.configure(
+        max_entries=config.get("AGGREGATION_INCREMENTAL_MAX_ENTRIES", 256),
+        max_bytes=config.get("AGGREGATION_INCREMENTAL_MAX_BYTES", 64 * 1024 * 1024),
+        ttl=config.get("AGGREGATION_INCREMENTAL_TTL", 600),
+    )
+
+
+def split_reusable_blocks(
+    service_template_id: str,
+    solution_nodes: Dict[str, NodeRecord],
+    content_hashes: Mapping[str, str],
+) -> Tuple[Dict[str, SolutionBlock], List[str]]:
+    """Split the solution nodes into the blocks that can be reused from the last
+    aggregation of the service template and the ids of the changed nodes.
+
+    A block is only reused if neither the node nor the content hash of its
+    current file changed.
+    """
+    previous: Optional[AggregationState] = AGGREGATION_STATES.get(service_template_id)
+    previous_blocks = previous.blocks if previous is not None else {}
+    reused: Dict[str, SolutionBlock] = {}
+    changed: List[str] = []
+    for node_id, node in solution_nodes.items():
+        block = previous_blocks.get(node_id)
+        if (
+            block is not None
+            and block.node == node
+            and block.content_hash == content_hashes.get(node_id)
+        ):
+            reused[node_id] = block
+        else:
+            changed.append(node_id)
+    return reused, changed
+
+
+def store_aggregation_state(service_template_id: str, blocks: Dict[str, SolutionBlock]):
+    """Store the blocks of the last aggregation of a service template."""
+    state = AggregationState(blocks)
+    AGGREGATION_STATES.set(service_template_id, state, state.size)
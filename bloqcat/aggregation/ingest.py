@@ -0,0 +1,166 @@
+"""Module containing the ingestion of topology json documents.
+
+Only the fields of the nodes and relationships used by the aggregation are
+extracted into lightweight records. ``orjson`` is used to parse the documents
+if it is installed.
+"""
+
+from json import loads as json_loads
+from typing import IO, Any, List, NamedTuple, Optional
+
+try:
+    from orjson import loads as orjson_loads
+except ImportError:  # pragma: no cover
+    orjson_loads = None
+
+CONCRETE_SOLUTION_PREFIX = "Concrete Solution of"
+
+
+class BodyTooLargeError(ValueError):
+    """Raised if a request body exceeds the configured size limit."""
+
+    def __init__(self, max_bytes: int):
+        super().__init__(f"The request body is larger than {max_bytes} bytes.")
+        self.max_bytes = max_bytes
+
+
+class TopologyFormatError(ValueError):
+    """Raised if a topology is not valid json or does not have the expected structure."""
+
+
+class NodeRecord(NamedTuple):
+    id: Optional[str]
+    name: str
+    qubit_count: Any = None
+    has_header: Any = None
+
+    @property
+    def is_concrete_solution(self) -> bool:
+        return self.name.startswith(CONCRETE_SOLUTION_PREFIX)
+
+    @property
+    def pattern_name(self) -> str:
+        return self.name.replace(CONCRETE_SOLUTION_PREFIX + " ", "")
+
+
+class RelationshipRecord(NamedTuple):
+    id: Any
+    name: Any
+    source: Optional[str]
+    target: Optional[str]
+
+
+class TopologyRecord(NamedTuple):
+    """The parts of a topology used by the aggregation.
+
+    ``nodes`` or ``relationships`` are ``None`` if the topology does not contain
+    the corresponding key.
+    """
+
+    id: Any
+    nodes: Optional[List[NodeRecord]]
+    relationships: Optional[List[RelationshipRecord]]
+
+
+def read_body(stream: IO[bytes], content_length: Optional[int], max_bytes: int) -> bytes:
+    """Read a request body of at most ``max_bytes`` bytes.
+
+    Raises:
+        BodyTooLargeError: if the body is larger than ``max_bytes``
+    """
+    if content_length is not None and content_length > max_bytes:
+        raise BodyTooLargeError(max_bytes)
+    body = stream.read(max_bytes + 1)
+    if len(body) > max_bytes:
+        raise BodyTooLargeError(max_bytes)
+    return body
+
+
+def loads_json(body: bytes) -> Any:
+    """Parse a json document.
+
+    Raises:
+        TopologyFormatError: if the document is not valid json
+    """
+    try:
+        if orjson_loads is not None:
+            return orjson_loads(body)
+        return json_loads(body)
+    except ValueError as err:
+        raise TopologyFormatError(str(err)) from err
+
+
+def _get(mapping: Any, key: str) -> Any:
+    return mapping.get(key) if isinstance(mapping, dict) else None
+
+
+def _get_id(mapping: Any, key: str) -> Optional[str]:
+    value = _get(mapping, key)
+    if value is not None and not isinstance(value, str):
+        raise TopologyFormatError(f"'{key}' must be a string.")
+    return value
+
+
+def _extract_node(node: Any) -> NodeRecord:
+    if not isinstance(node, dict):
+        raise TopologyFormatError("Every node template must be an object.")
+    name = node.get("name") or ""
+    if not isinstance(name, str):
+        raise TopologyFormatError("The name of a node template must be a string.")
+    kvproperties = _get(node.get("properties"), "kvproperties")
+    return NodeRecord(
+        _get_id(node, "id"),
+        name,
+        _get(kvproperties, "QubitCount"),
+        _get(kvproperties, "hasHeader"),
+    )
+
+
+def _extract_relationship(relationship: Any) -> RelationshipRecord:
+    if not isinstance(relationship, dict):
+        raise TopologyFormatError("Every relationship template must be an object.")
+    return RelationshipRecord(
+        relationship.get("id"),
+        relationship.get("name"),
+        _get_id(relationship.get("sourceElement"), "ref"),
+        _get_id(relationship.get("targetElement"), "ref"),
+    )
+
+
+def _extract_list(data: dict, key: str) -> Optional[list]:
+    if key not in data:
+        return None
+    value = data[key]
+    if value is None:
+        return []
+    if not isinstance(value, list):
+        raise TopologyFormatError(f"'{key}' must be a list.")
+    return value
+
+
+def extract_topology(data: Any) -> TopologyRecord:
+    """Extract the records of a parsed topology json document.
+
+    Raises:
+        TopologyFormatError: if the document does not have the expected structure
+    """
+    if not isinstance(data, dict):
+        raise TopologyFormatError("The topology must be an object.")
+    nodes = _extract_list(data, "nodeTemplates")
+    relationships = _extract_list(data, "relationshipTemplates")
+    return TopologyRecord(
+        data.get("id"),
+        None if nodes is None else [_extract_node(n) for n in nodes],
+        None
+        if relationships is None
+        else [_extract_relationship(r) for r in relationships],
+    )
+
+
+def parse_topology(body: bytes) -> TopologyRecord:
+    """Parse a topology json document into records.
+
+    Raises:
+        TopologyFormatError: if the document is not a valid topology
+    """
+    return extract_topology(loads_json(body))
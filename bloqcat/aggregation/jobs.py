@@ -0,0 +1,203 @@
+"""Module containing the asynchronous aggregation jobs.
+
+Jobs are stored in the database, so every app process can answer status
+queries. The aggregation itself runs on a worker pool of the process that
+accepted the job.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from enum import Enum
+from http import HTTPStatus
+from threading import Lock
+from typing import Callable, Optional, Tuple
+from uuid import uuid4
+
+from flask import Flask
+from sqlalchemy import delete, inspect, or_, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from ..db import DB
+from ..db.models.aggregation import AggregationJob
+from ..util.logging import get_logger
+
+AGGREGATION_LOGGER = "aggregation"
+
+AggregateFunction = Callable[[str], Tuple[int, bytes]]
+
+
+class JobState(str, Enum):
+    PENDING = "pending"
+    RUNNING = "running"
+    FINISHED = "finished"
+    FAILED = "failed"
+
+
+class JobWorkers:
+    """Worker pool running the aggregation jobs of this process."""
+
+    def __init__(self):
+        self.max_workers = 2
+        self.retention = timedelta(days=1)
+        self.stale_after = timedelta(minutes=20)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+
+    def init_app(self, app: Flask):
+        config = app.config
+        self.max_workers = max(1, config.get("AGGREGATION_JOB_WORKERS", 2))
+        self.retention = timedelta(seconds=config.get("AGGREGATION_JOB_RETENTION", 86400))
+        # the deadline only bounds the requests to the QC Atlas, a job that did not
+        # finish within twice the deadline was lost (e.g. the process was restarted)
+        self.stale_after = 2 * timedelta(
+            seconds=config.get("AGGREGATION_JOB_DEADLINE", 600)
+        )
+        with app.app_context():
+            try:
+                # the table does not exist before the first migration
+                if inspect(DB.engine).has_table(AggregationJob.__tablename__):
+                    self.fail_stale_jobs()
+            except SQLAlchemyError as err:
+                DB.session.rollback()
+                get_logger(app, AGGREGATION_LOGGER).warning(
+                    f"Could not mark stale aggregation jobs as failed: {err}"
+                )
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        # the pool is only started once the first job is submitted
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="aggregation-job"
+                )
+            return self._executor
+
+    def fail_stale_jobs(self, now: Optional[datetime] = None) -> int:
+        """Mark pending and running jobs as failed that can no longer finish.
+
+        Requires an active app context. Returns the number of failed jobs.
+        """
+        if now is None:
+            now = datetime.now(timezone.utc)
+        cutoff = now - self.stale_after
+        failed = DB.session.execute(
+            update(AggregationJob)
+            .where(
+                or_(
+                    (AggregationJob.state == JobState.PENDING.value)
+                    & (AggregationJob.created_at < cutoff),
+                    (AggregationJob.state == JobState.RUNNING.value)
+                    & (AggregationJob.started_at < cutoff),
+                )
+            )
+            .values(
+                state=JobState.FAILED.value,
+                finished_at=now,
+                status_code=int(HTTPStatus.GATEWAY_TIMEOUT),
+                message="Der Auftrag wurde nicht rechtzeitig abgeschlossen.",
+            )
+        ).rowcount
+        DB.session.commit()
+        return failed
+
+    def submit(
+        self, app: Flask, topology: str, aggregate: AggregateFunction
+    ) -> AggregationJob:
+        """Store a new job for the topology and queue it on the worker pool.
+
+        Requires an active app context. ``aggregate`` is called with the topology
+        in an app context of ``app`` and returns the http status and the content
+        (the aggregated file or the error message) of the result.
+        """
+        now = datetime.now(timezone.utc)
+        self.fail_stale_jobs(now)
+        DB.session.execute(
+            delete(AggregationJob).where(
+                AggregationJob.finished_at < now - self.retention
+            )
+        )
+        job = AggregationJob(
+            id=uuid4().hex,
+            state=JobState.PENDING.value,
+            topology=topology,
+            created_at=now,
+        )
+        DB.session.add(job)
+        DB.session.commit()
+        self.executor.submit(run_job, app, job.id, aggregate)
+        return job
+
+
+JOB_WORKERS = JobWorkers()
+
+
+def get_job(job_id: str) -> Optional[AggregationJob]:
+    """Load a job (without its topology and result). Requires an app context."""
+    return DB.session.get(AggregationJob, job_id)
+
+
+def run_job(app: Flask, job_id: str, aggregate: AggregateFunction):
+    """Run a pending job and store its result."""
+    with app.app_context():
+        logger = get_logger(app, AGGREGATION_LOGGER)
+
+        # claim the job, so that it can never run twice
+        try:
+            claimed = DB.session.execute(
+                update(AggregationJob)
+                .where(AggregationJob.id == job_id)
+                .where(AggregationJob.state == JobState.PENDING.value)
+                .values(
+                    state=JobState.RUNNING.value, started_at=datetime.now(timezone.utc)
+                )
+            ).rowcount
+            DB.session.commit()
+        except SQLAlchemyError:
+            # the job stays pending and is marked as failed once it is stale
+            DB.session.rollback()
+            logger.exception(f"Could not start aggregation job {job_id}.")
+            return
+        if not claimed:
+            return
+
+        try:
+            job = DB.session.get(AggregationJob, job_id)
+            status_code, content = aggregate(job.topology)
+        except Exception:
+            DB.session.rollback()
+            logger.exception(f"Aggregation job {job_id} failed.")
+            status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+            content = "Bei der Aggregation ist ein Fehler aufgetreten.".encode()
+
+        try:
+            _store_result(job_id, int(status_code), content)
+        except SQLAlchemyError:
+            DB.session.rollback()
+            logger.exception(f"Could not store the result of aggregation job {job_id}.")
+            status_code = HTTPStatus.INTERNAL_SERVER_ERROR
+            try:
+                _store_result(
+                    job_id,
+                    int(status_code),
+                    "Das Ergebnis der Aggregation konnte nicht gespeichert werden.".encode(),
+                )
+            except SQLAlchemyError:
+                DB.session.rollback()
+                logger.exception(f"Could not mark aggregation job {job_id} as failed.")
+                return
+        logger.info(f"Aggregation job {job_id} finished with status {status_code}.")
+
+
+def _store_result(job_id: str, status_code: int, content: bytes):
+    values = {"finished_at": datetime.now(timezone.utc), "status_code": status_code}
+    if status_code == HTTPStatus.OK:
+        values.update(
+            state=JobState.FINISHED.value, result=content, result_size=len(content)
+        )
+    else:
+        values.update(state=JobState.FAILED.value, message=content.decode())
+    DB.session.execute(
+        update(AggregationJob).where(AggregationJob.id == job_id).values(**values)
+    )
+    DB.session.commit()
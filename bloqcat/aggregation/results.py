@@ -0,0 +1,119 @@
+"""Module containing the cache for aggregated files.
+
+Compressed variants of a cached file are cached together with the file, so
+they only have to be compressed once.
+"""
+
+from threading import Lock
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from flask import Flask
+
+from ..util.cache import LRUCache
+from ..util.compression import StreamCompressor, compress
+
+
+class CachedResult:
+    """An aggregated file and its compressed variants by content encoding."""
+
+    __slots__ = ("body", "encoded", "_lock")
+
+    def __init__(self, body: bytes, encoded: Optional[Dict[str, bytes]] = None):
+        self.body = body
+        self.encoded = dict(encoded or {})
+        self._lock = Lock()
+
+    @property
+    def size(self) -> int:
+        return len(self.body) + sum(len(data) for data in self.encoded.values())
+
+    def get_body(self, encoding: Optional[str]) -> bytes:
+        """Return the body in the given content encoding (compressing it once)."""
+        if encoding is None:
+            return self.body
+        with self._lock:
+            data = self.encoded.get(encoding)
+            if data is None:
+                data = compress(self.body, encoding)
+                self.encoded[encoding] = data
+            return data
+
+
+RESULT_CACHE: LRUCache[CachedResult] = LRUCache(
+    max_entries=256, ttl=3600, max_entry_bytes=4 * 1024 * 1024
+)
+
+
+def configure_result_cache(app: Flask):
+    """Configure the limits of the aggregation result cache."""
+    config = app.config
+    RESULT_CACHE.configure(
+        max_entries=config.get("AGGREGATION_RESULT_CACHE_MAX_ENTRIES", 256),
+        max_bytes=config.get("AGGREGATION_RESULT_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+        ttl=config.get("AGGREGATION_RESULT_CACHE_TTL", 3600),
+        max_entry_bytes=config.get(
+            "AGGREGATION_RESULT_CACHE_MAX_ENTRY_BYTES", 4 * 1024 * 1024
+        ),
+    )
+
+
+def cache_result(key: str, body: bytes) -> CachedResult:
+    """Cache a complete aggregated file."""
+    result = CachedResult(body)
+    RESULT_CACHE.set(key, result, result.size)
+    return result
+
+
+def get_cached_body(key: str, result: CachedResult, encoding: Optional[str]) -> bytes:
+    """Return the body of a cached result in the given content encoding.
+
+    A newly compressed variant is accounted for in the size of the cache entry.
+    """
+    is_new = encoding is not None and encoding not in result.encoded
+    data = result.get_body(encoding)
+    if is_new:
+        RESULT_CACHE.set(key, result, result.size)
+    return data
+
+
+def tee_into_cache(
+    key: str, chunks: Iterable[str], encoding: Optional[str] = None
+) -> Iterator[bytes]:
+    """Encode (and compress) all chunks and cache the complete result (together with
+    its compressed variant) once it was generated.
+
+    Buffering stops as soon as the result exceeds the size limit of a cache entry,
+    the remaining chunks are only streamed.
+    """
+    compressor = StreamCompressor(encoding) if encoding is not None else None
+    parts: List[bytes] = []
+    compressed_parts: List[bytes] = []
+    size = 0
+    size_limit = RESULT_CACHE.entry_size_limit
+    buffering = size_limit > 0
+    for chunk in chunks:
+        data = chunk.encode()
+        compressed = compressor.compress(data) if compressor is not None else None
+        if buffering:
+            size += len(data) + (len(compressed) if compressed else 0)
+            if size > size_limit:
+                buffering = False
+                parts = []
+                compressed_parts = []
+            else:
+                parts.append(data)
+                if compressed:
+                    compressed_parts.append(compressed)
+        if compressor is None:
+            yield data
+        elif compressed:
+            yield compressed
+    if compressor is not None:
+        compressed = compressor.finish()
+        compressed_parts.append(compressed)
+        yield compressed
+    if buffering:
+        result = CachedResult(b"".join(parts))
+        if encoding is not None:
+            result.encoded[encoding] = b"".join(compressed_parts)
+        RESULT_CACHE.set(key, result, result.size)
@@ -3,3 +3,4 @@
 from .root import API_V1  # noqa
 from . import auth  # noqa
 from . import bloqcat  # noqa
+from . import jobs  # noqa
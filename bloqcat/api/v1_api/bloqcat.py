@@ -1,14 +1,60 @@
 """Module containing the BloQCat Framework endpoint(s) of the v1 API."""
 
-from flask import request
+import re
+from concurrent.futures import wait
+from contextvars import copy_context
+from io import BytesIO
+from itertools import chain
+from json import dumps
+from logging import DEBUG
+from zipfile import ZIP_DEFLATED, ZipFile
+from flask import current_app, request, stream_with_context
 from flask.views import MethodView
 from http import HTTPStatus
 from flask import Response
 
 from .root import API_V1
-
-import xml.etree.ElementTree as ET
-import requests
+from ...qasm import QasmSectionError, load_program, scan_sections
+from ...aggregation import (
+    AGGREGATION_LOGGER,
+    RESULT_CACHE,
+    BodyTooLargeError,
+    SolutionBlock,
+    TopologyCycleError,
+    TopologyFormatError,
+    TopologyGraph,
+    cache_result,
+    extract_topology,
+    get_cached_body,
+    loads_json,
+    parse_topology,
+    read_body,
+    split_reusable_blocks,
+    store_aggregation_state,
+    tee_into_cache,
+    topology_fingerprint,
+)
+from ...tracing import TRACER
+from ...util.compression import encoding_headers, negotiate_encoding
+from ...util.logging import get_logger
+from ...atlas import (
+    AtlasDeadlineExceededError,
+    AtlasUnavailableError,
+    BACKGROUND_FETCH_POOL,
+    Deadline,
+    FETCH_POOL,
+    get_file,
+)
+
+
+def negotiate_response_encoding(size):
+    """Return the content encoding for a response body of (about) ``size`` bytes."""
+    config = current_app.config
+    if not config.get("AGGREGATION_COMPRESSION_ENABLED", True):
+        return None
+    if size < config.get("AGGREGATION_COMPRESSION_MIN_BYTES", 1024):
+        return None
+    return negotiate_encoding(request.accept_encodings)
 
 
 @API_V1.route("/bloqcat/winery/topology/deploy/json", methods=["POST"])
@@ -18,140 +64,418 @@ class TopologyView(MethodView):
     def post(self):
         # Parse the JSON topology file from the request body
         try:
-            data = request.json
-        except ET.ParseError as e:
+            topology = self.parse_request_topology()
+        except BodyTooLargeError:
+            return "Die Topologie ist zu groß.", HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        except TopologyFormatError as e:
             return f"Invalid JSON data: {str(e)}", HTTPStatus.BAD_REQUEST
 
-        # Validierung der Daten
-        valid, message = self.validate_data(data)
+        valid, message, solution_nodes, solution_relationships = self.process_topology(
+            topology
+        )
         if not valid:
             return message, HTTPStatus.BAD_REQUEST
 
-        # Process the topology
-        nodes = data.get("nodeTemplates", [])
-        relationships = data.get("relationshipTemplates", [])
-
-        valid_path, message_path = self.validate_path(nodes, relationships)
-        if not valid_path:
-            return message_path, HTTPStatus.BAD_REQUEST
+        deadline = Deadline(current_app.config.get("ATLAS_REQUEST_DEADLINE", 60))
 
-        solution_nodes, solution_relationships = self.create_solution_path(
-            nodes, relationships
-        )
+        # Bei einem erneuten Deployment nur die geänderten Concrete Solutions verarbeiten
+        if self.is_incremental_request() and topology.id is not None:
+            return self.aggregate_incremental(
+                topology.id, solution_nodes, solution_relationships, deadline
+            )
 
-        concrete_solution_files = self.fetch_files(solution_nodes)
+        try:
+            concrete_solution_files = self.fetch_files(solution_nodes, deadline)
+        except AtlasUnavailableError:
+            return (
+                "Der QC Atlas ist momentan nicht erreichbar.",
+                HTTPStatus.SERVICE_UNAVAILABLE,
+            )
+        except AtlasDeadlineExceededError:
+            return (
+                "Zeitüberschreitung beim Abrufen der Dateien.",
+                HTTPStatus.GATEWAY_TIMEOUT,
+            )
 
-        if not concrete_solution_files:
+        if not concrete_solution_files or len(concrete_solution_files) != len(
+            solution_nodes
+        ):
             return "Fehler beim Abrufen der Dateien.", HTTPStatus.BAD_REQUEST
 
+        # Bereits aggregierte identische Topologien direkt beantworten
+        fingerprint = topology_fingerprint(
+            solution_nodes,
+            solution_relationships,
+            (f.content_hash for f in concrete_solution_files),
+        )
+        cached_result = RESULT_CACHE.get(fingerprint)
+        if cached_result is not None:
+            return self.create_cached_file_response(fingerprint, cached_result)
+
+        # Dateien (einmal pro Inhalt) parsen, bevor die Antwort gestreamt wird
+        with TRACER.span("load_programs", files=len(concrete_solution_files)):
+            concrete_solution_programs = [
+                load_program(f.content, f.content_hash) for f in concrete_solution_files
+            ]
+            valid_programs, message_programs = self.validate_programs(
+                concrete_solution_programs, solution_nodes
+            )
+        if not valid_programs:
+            return message_programs, HTTPStatus.BAD_REQUEST
+
         # Aggregieren der Dateien
-        file_content = self.aggregate_concrete_solution_files(
-            concrete_solution_files, solution_nodes, solution_relationships
+        file_chunks = self.iter_aggregated_chunks(
+            concrete_solution_programs, solution_nodes, solution_relationships
         )
 
         # Erstellen des Dateiinhalts (nach erfolgreicher Validierung)
         # file_content = self.create_file_content(data)
 
-        # Erstellen einer Response mit dem Dateiinhalt
-        response = Response(
-            file_content,
-            mimetype="text/plain",
-            headers={"Content-Disposition": "attachment;filename=aggregation.qasm"},
+        # Erstellen einer Response, die den Dateiinhalt stückweise streamt
+        # (das vollständige Ergebnis wird anschließend gecacht)
+        encoding = negotiate_response_encoding(
+            sum(f.size for f in concrete_solution_files)
+        )
+        return self.create_file_response(
+            stream_with_context(
+                self.traced_aggregation(
+                    tee_into_cache(fingerprint, file_chunks, encoding), encoding
+                )
+            ),
+            cache_status="miss",
+            encoding=encoding,
         )
 
+    def parse_request_topology(self):
+        with TRACER.span("parse") as span:
+            body = self.read_request_body()
+            span.set_attribute("bytes", len(body))
+            topology = parse_topology(body)
+            span.set_attribute("nodes", len(topology.nodes or ()))
+            span.set_attribute("relationships", len(topology.relationships or ()))
+            return topology
+
+    def read_request_body(self):
+        # Begrenzen der Größe des Request-Bodys, bevor er gelesen wird
+        max_bytes = current_app.config.get("AGGREGATION_MAX_BODY_BYTES", 32 * 1024 * 1024)
+        return read_body(request.stream, request.content_length, max_bytes)
+
+    def is_incremental_request(self):
+        return request.args.get("incremental", "").lower() in ("1", "true", "yes")
+
+    def aggregate_incremental(
+        self, service_template_id, solution_nodes, solution_relationships, deadline
+    ):
+        """Aggregate a topology reusing the blocks of all concrete solutions that did
+        not change since the last aggregation of the service template."""
+        # Alle Dateien revalidieren (Datei-Cache oder bedingte Anfrage an den QC Atlas),
+        # damit geänderte Dateien erkannt werden
+        try:
+            files_by_id = self.fetch_files_by_id(list(solution_nodes), deadline)
+        except AtlasUnavailableError:
+            return (
+                "Der QC Atlas ist momentan nicht erreichbar.",
+                HTTPStatus.SERVICE_UNAVAILABLE,
+            )
+        except AtlasDeadlineExceededError:
+            return (
+                "Zeitüberschreitung beim Abrufen der Dateien.",
+                HTTPStatus.GATEWAY_TIMEOUT,
+            )
+        if not all(files_by_id.get(i) for i in solution_nodes):
+            return "Fehler beim Abrufen der Dateien.", HTTPStatus.BAD_REQUEST
+        content_hashes = {i: files_by_id[i].content_hash for i in solution_nodes}
+        reused_blocks, changed_ids = split_reusable_blocks(
+            service_template_id, solution_nodes, content_hashes
+        )
+
+        # Bereits aggregierte identische Topologien direkt beantworten
+        fingerprint = topology_fingerprint(
+            solution_nodes,
+            solution_relationships,
+            (content_hashes[i] for i in solution_nodes),
+        )
+        cached_result = RESULT_CACHE.get(fingerprint)
+        if cached_result is not None:
+            response = self.create_cached_file_response(fingerprint, cached_result)
+            response.headers["X-Aggregation-Reused"] = str(len(reused_blocks))
+            return response
+
+        # Nur die Dateien der geänderten Concrete Solutions parsen
+        programs = {i: block.program for i, block in reused_blocks.items()}
+        for node_id in changed_ids:
+            concrete_solution_file = files_by_id[node_id]
+            programs[node_id] = load_program(
+                concrete_solution_file.content, concrete_solution_file.content_hash
+            )
+        concrete_solution_programs = [programs[i] for i in solution_nodes]
+        valid_programs, message_programs = self.validate_programs(
+            concrete_solution_programs, solution_nodes
+        )
+        if not valid_programs:
+            return message_programs, HTTPStatus.BAD_REQUEST
+
+        blocks = {}
+        for node_id, node in solution_nodes.items():
+            block = reused_blocks.get(node_id)
+            if block is None:
+                program = programs[node_id]
+                block = SolutionBlock(
+                    node,
+                    content_hashes[node_id],
+                    program,
+                    self.render_concrete_solution(node, program),
+                )
+            blocks[node_id] = block
+        store_aggregation_state(service_template_id, blocks)
+
+        first_node = next(iter(solution_nodes.values()))
+        file_chunks = chain(
+            (
+                self.render_header(first_node, concrete_solution_programs[0]),
+                self.render_registers(first_node.qubit_count),
+            ),
+            (block.chunk for block in blocks.values()),
+            (self.render_measurements(first_node.qubit_count),),
+        )
+        encoding = negotiate_response_encoding(
+            sum(len(block.chunk) for block in blocks.values())
+        )
+        response = self.create_file_response(
+            stream_with_context(
+                self.traced_aggregation(
+                    tee_into_cache(fingerprint, file_chunks, encoding), encoding
+                )
+            ),
+            cache_status="miss",
+            encoding=encoding,
+        )
+        response.headers["X-Aggregation-Reused"] = str(len(reused_blocks))
         return response
 
+    def process_topology(self, data):
+        # Einmaliges Indizieren der Topologie für alle weiteren Schritte
+        with TRACER.span("validate_data") as span:
+            topology = TopologyGraph.from_record(data)
+            span.set_attribute("nodes", len(topology.node_list))
+            span.set_attribute("relationships", len(topology.relationship_list))
+
+            # Validierung der Daten
+            valid, message = self.validate_data(data, topology)
+            span.set_attribute("valid", valid)
+        if not valid:
+            return False, message, None, None
+
+        # Process the topology
+        with TRACER.span("validate_path") as span:
+            valid_path, message_path = self.validate_path(topology)
+            span.set_attribute("valid", valid_path)
+        if not valid_path:
+            return False, message_path, None, None
+
+        with TRACER.span("create_solution_path") as span:
+            solution_nodes, solution_relationships = self.create_solution_path(topology)
+            span.set_attribute("solution_nodes", len(solution_nodes))
+        return True, "Topologie ist gültig.", solution_nodes, solution_relationships
+
+    def aggregate_topology(self, data, deadline=None, pool=None):
+        """Aggregate a topology without streaming and return the http status and
+        the content (the aggregated file or the error message) of the result."""
+        processed_topology = self.process_topology(data)
+        valid, message, solution_nodes, _ = processed_topology
+        if not valid:
+            return HTTPStatus.BAD_REQUEST, message.encode()
+        try:
+            files_by_id = self.fetch_files_by_id(solution_nodes, deadline, pool)
+        except AtlasUnavailableError:
+            return (
+                HTTPStatus.SERVICE_UNAVAILABLE,
+                "Der QC Atlas ist momentan nicht erreichbar.".encode(),
+            )
+        except AtlasDeadlineExceededError:
+            return (
+                HTTPStatus.GATEWAY_TIMEOUT,
+                "Zeitüberschreitung beim Abrufen der Dateien.".encode(),
+            )
+        return self.aggregate_solution_path(processed_topology, files_by_id)
+
+    def aggregate_solution_path(self, processed_topology, files_by_id):
+        valid, message, solution_nodes, solution_relationships = processed_topology
+        if not valid:
+            return HTTPStatus.BAD_REQUEST, message.encode()
+
+        concrete_solution_files = [files_by_id.get(i) for i in solution_nodes]
+        if not all(concrete_solution_files):
+            return HTTPStatus.BAD_REQUEST, "Fehler beim Abrufen der Dateien.".encode()
+
+        fingerprint = topology_fingerprint(
+            solution_nodes,
+            solution_relationships,
+            (f.content_hash for f in concrete_solution_files),
+        )
+        cached_result = RESULT_CACHE.get(fingerprint)
+        if cached_result is not None:
+            return HTTPStatus.OK, cached_result.body
+
+        concrete_solution_programs = [
+            load_program(f.content, f.content_hash) for f in concrete_solution_files
+        ]
+        valid_programs, message_programs = self.validate_programs(
+            concrete_solution_programs, solution_nodes
+        )
+        if not valid_programs:
+            return HTTPStatus.BAD_REQUEST, message_programs.encode()
+
+        result = "".join(
+            self.iter_aggregated_chunks(
+                concrete_solution_programs, solution_nodes, solution_relationships
+            )
+        ).encode()
+        cache_result(fingerprint, result)
+        return HTTPStatus.OK, result
+
+    def create_cached_file_response(self, fingerprint, cached_result):
+        # komprimierte Varianten werden zusammen mit dem Ergebnis gecacht
+        encoding = negotiate_response_encoding(len(cached_result.body))
+        with TRACER.span("aggregate", cache_hit=True, encoding=encoding) as span:
+            body = get_cached_body(fingerprint, cached_result, encoding)
+            span.set_attribute("bytes", len(body))
+        return self.create_file_response(body, cache_status="hit", encoding=encoding)
+
+    def traced_aggregation(self, file_chunks, encoding):
+        return TRACER.traced_chunks(
+            "aggregate", file_chunks, cache_hit=False, encoding=encoding
+        )
+
+    def create_file_response(self, file_content, cache_status, encoding=None):
+        return Response(
+            file_content,
+            mimetype="text/plain",
+            headers={
+                "Content-Disposition": "attachment;filename=aggregation.qasm",
+                "X-Aggregation-Cache": cache_status,
+                **encoding_headers(encoding),
+            },
+        )
+
     def extract_cs(self, input_text):
-        lines = input_text.split("\n")
-        start_index = None
-        end_index = None
-
-        # Find the index of the line containing 'creg' and 'measure'
-        for i, line in enumerate(lines):
-            if "creg" in line and start_index is None:
-                start_index = i + 1
-            if "measure" in line and end_index is None:
-                end_index = i
-                break
-
-        # Check if both 'creg' and 'measure' were found
-        if start_index is not None and end_index is not None:
-            return "\n".join(lines[start_index:end_index])
-        else:
-            return "Unable to find the required sections."
-
-    def fetch_files(self, solution_nodes):
+        # raises a QasmSectionError if the 'creg' or the 'measure' line is missing
+        return scan_sections(input_text).require_body()
+
+    def validate_programs(self, concrete_solution_programs, solution_nodes):
+        first_node = next(iter(solution_nodes.values()))
+        has_header = first_node.has_header == "true"
+        for index, (program, node) in enumerate(
+            zip(concrete_solution_programs, solution_nodes.values())
+        ):
+            node_name = node.pattern_name
+            try:
+                program.sections.check(require_header=index == 0 and has_header)
+            except QasmSectionError as err:
+                return (
+                    False,
+                    f'Die Datei der Concrete Solution "{node_name}" ist ungültig: {err}',
+                )
+        return True, "Dateien sind gültig."
+
+    def fetch_files(self, solution_nodes, deadline=None):
+        node_ids = list(solution_nodes.keys())
+        if not node_ids:
+            return []
+        fetched_files = self.fetch_files_by_id(node_ids, deadline)
+
+        logger = get_logger(current_app, AGGREGATION_LOGGER)
         files_content = []
-        for node_id in solution_nodes.keys():
-            file_content = self.fetch_file_content(node_id)
+        for node_id in node_ids:
+            file_content = fetched_files[node_id]
             if file_content:
                 files_content.append(file_content)
-                # Hier drucken wir den Inhalt jeder Datei aus
-                print(f"Inhalt der Datei für Node ID {node_id}:")
-                print(file_content)
+                if logger.isEnabledFor(DEBUG):
+                    logger.debug(
+                        f"Fetched the file of concrete solution {node_id} "
+                        f"({file_content.size} bytes, sha256 {file_content.content_hash})."
+                    )
             else:
-                print(f"Fehler beim Abrufen der Datei für Node ID {node_id}")
+                logger.warning(
+                    f"Could not fetch the file of concrete solution {node_id}."
+                )
         return files_content
 
-    def validate_data(self, data):
+    def fetch_files_by_id(self, node_ids, deadline=None, pool=None):
+        """Fetch the files of the given concrete solutions in parallel (every id
+        only once) and return them by id (``None`` if a file is not available).
+
+        The files are fetched on ``pool`` (default: the pool of interactive requests).
+        """
+        node_ids = list(dict.fromkeys(node_ids))
+        if not node_ids:
+            return {}
+        if deadline is None:
+            deadline = Deadline(None)
+
+        # fetch all files in parallel (the spans of the fetches are part of the trace)
+        if pool is None:
+            pool = FETCH_POOL
+        app = current_app._get_current_object()
+
+        def fetch_in_app_context(node_id):
+            with app.app_context():
+                return self.fetch_file_content(node_id, deadline)
+
+        with TRACER.span("fetch_files", files=len(node_ids)):
+            futures = [
+                pool.submit(copy_context().run, fetch_in_app_context, i)
+                for i in node_ids
+            ]
+            _, not_done = wait(futures, timeout=deadline.remaining())
+            if not_done:
+                # fetches that did not start yet are dropped from the shared pool,
+                # running fetches are bounded by the deadline themselves
+                for future in not_done:
+                    future.cancel()
+                raise AtlasDeadlineExceededError("The request deadline was exceeded.")
+            return {i: future.result() for i, future in zip(node_ids, futures)}
+
+    def validate_data(self, data, topology):
         # Überprüfen, ob 'nodeTemplates' und 'relationshipTemplates' vorhanden sind
-        if "nodeTemplates" not in data or "relationshipTemplates" not in data:
+        if data.nodes is None or data.relationships is None:
             return (
                 False,
                 "Daten müssen 'nodeTemplates' und 'relationshipTemplates' enthalten.",
             )
 
         # Überprüfen, ob 'nodeTemplates' und 'relationshipTemplates' leer sind
-        if not data["nodeTemplates"] and not data["relationshipTemplates"]:
+        if not topology.node_list and not topology.relationship_list:
             return False, "Die Topologie ist leer."
 
         # Überprüfen, ob 'nodeTemplates' mindestens zwei Elemente hat
-        if len(data.get("nodeTemplates", [])) < 2:
+        if len(topology.node_list) < 2:
             return False, "'nodeTemplates' muss mindestens zwei Elemente haben."
 
         # Überprüfen, ob 'relationshipTemplates' mindestens ein Element hat
-        if len(data.get("relationshipTemplates", [])) < 1:
+        if len(topology.relationship_list) < 1:
             return False, "'relationshipTemplates' muss mindestens ein Element haben."
 
         # Überprüfen, ob es Knoten mit dem Präfix "Concrete Solution Of" gibt
-        if not any(
-            node.get("name", "").startswith("Concrete Solution of")
-            for node in data.get("nodeTemplates", [])
-        ):
+        if not topology.concrete_solutions:
             return False, "Bitte generieren Sie eine Solution Language!"
 
         # Wenn alle Validierungen erfolgreich sind
         return True, "Daten sind gültig."
 
-    def validate_path(self, nodes, relationships):
-        # Zuerst filtern wir die Nodes, die mit "Concrete Solution of" beginnen
-        concrete_solution_nodes = {
-            node["id"]: node
-            for node in nodes
-            if node.get("name", "").startswith("Concrete Solution of")
-        }
-
-        # Dann filtern wir die Relationships, die nur zwischen diesen Nodes existieren und deren Name "Aggregation" ist
-        valid_relationships = [
-            r
-            for r in relationships
-            if r.get("name") == "Aggregation"
-            and r["sourceElement"]["ref"] in concrete_solution_nodes
-            and r["targetElement"]["ref"] in concrete_solution_nodes
-        ]
+    def validate_path(self, topology):
+        # Die Aggregation-Relationships zwischen den "Concrete Solution of" Nodes
+        # sind bereits im Graphen indiziert
+        concrete_solution_nodes = topology.concrete_solutions
 
         # Überprüfen der Qubit-Anzahl für jede valide Beziehung
-        for relationship in valid_relationships:
-            source_node = concrete_solution_nodes[relationship["sourceElement"]["ref"]]
-            target_node = concrete_solution_nodes[relationship["targetElement"]["ref"]]
+        for relationship in topology.aggregation_relationships():
+            source_node = concrete_solution_nodes[relationship.source]
+            target_node = concrete_solution_nodes[relationship.target]
 
             # Zugriff auf die Qubit-Anzahl
-            source_qubits = (
-                source_node["properties"].get("kvproperties", {}).get("QubitCount")
-            )
-            target_qubits = (
-                target_node["properties"].get("kvproperties", {}).get("QubitCount")
-            )
+            source_qubits = source_node.qubit_count
+            target_qubits = target_node.qubit_count
 
             # Überprüfen, ob die Qubit-Anzahlen gleich sind
             if source_qubits != target_qubits:
@@ -160,112 +484,183 @@ class TopologyView(MethodView):
                     "Nicht übereinstimmende Qubit-Anzahlen in einer Aggregations-Beziehung.",
                 )
 
+        # Überprüfen, ob die Aggregationsbeziehungen eine Reihenfolge festlegen
+        try:
+            topology.aggregation_order()
+        except TopologyCycleError:
+            return False, "Die Aggregationsbeziehungen enthalten einen Zyklus."
+
         # Wenn alle Validierungen erfolgreich sind
         return True, "Pfade und Qubit-Anzahlen sind gültig."
 
-    def fetch_file_content(self, concrete_solution_id):
-        url = f"http://qc-atlas-api:6626/atlas/patterns/patternId/concrete-solutions/{concrete_solution_id}/file/content"
-        response = requests.get(url)
-        if response.status_code == 200:
-            return response.text
-        else:
-            return None
-
-    def create_solution_path(self, nodes, relationships):
-        # Filtern der Knoten, die mit "Concrete Solution of" beginnen
-        solution_nodes = {
-            node["id"]: node
-            for node in nodes
-            if node.get("name", "").startswith("Concrete Solution of")
-        }
-
-        # Filtern der Relationships vom Typ 'Aggregation'
-        aggregation_relationships = [
-            r for r in relationships if r.get("name") == "Aggregation"
-        ]
+    def fetch_file_content(self, concrete_solution_id, deadline=None):
+        return get_file(concrete_solution_id, deadline)
 
-        # Überprüfen, ob eine Aggregationsbeziehung zwischen den relevanten Knoten besteht
-        valid_solution_nodes = {}
-        for relation in aggregation_relationships:
-            source_id = relation["sourceElement"]["ref"]
-            target_id = relation["targetElement"]["ref"]
-            if source_id in solution_nodes and target_id in solution_nodes:
-                valid_solution_nodes[source_id] = solution_nodes[source_id]
-                valid_solution_nodes[target_id] = solution_nodes[target_id]
-
-        # Löschen Sie nicht verbundene Knoten
-        solution_nodes = valid_solution_nodes
-
-        # Filtern der Relationships, die nur zwischen den gültigen Nodes existieren
-        solution_relationships = [
-            r
-            for r in relationships
-            if r["sourceElement"]["ref"] in solution_nodes
-            and r["targetElement"]["ref"] in solution_nodes
-        ]
+    def create_solution_path(self, topology):
+        # Nur "Concrete Solution of" Knoten, die über eine Aggregationsbeziehung
+        # verbunden sind (in Reihenfolge der Aggregation), und alle Relationships
+        # zwischen diesen Knoten
+        solution_nodes, solution_relationships = topology.solution_path()
 
         # Ausgabe der Lösungsknoten und -beziehungen für Debugging-Zwecke
-        print("Solution Nodes:")
-        for node_id, node in solution_nodes.items():
-            print(f"Node ID: {node_id}, Node Data: {node}")
-
-        print("\nSolution Relationships:")
-        for relationship in solution_relationships:
-            print(relationship)
+        logger = get_logger(current_app, AGGREGATION_LOGGER)
+        if logger.isEnabledFor(DEBUG):
+            logger.debug(f"Solution nodes: {list(solution_nodes.values())}")
+            logger.debug(f"Solution relationships: {solution_relationships}")
 
         return solution_nodes, solution_relationships
 
     def aggregate_concrete_solution_files(
         self, concrete_solution_files, solution_nodes, solution_relationships
     ):
-        # Hier wird der Inhalt der Datei basierend auf den Daten erstellt
-        start_pattern_name = solution_nodes[list(solution_nodes.keys())[0]][
-            "name"
-        ].replace("Concrete Solution of ", "")
-        reg_size = (
-            solution_nodes[list(solution_nodes.keys())[0]]["properties"]
-            .get("kvproperties", {})
-            .get("QubitCount")
+        return "".join(
+            self.iter_aggregated_chunks(
+                [load_program(f) for f in concrete_solution_files],
+                solution_nodes,
+                solution_relationships,
+            )
         )
 
-        has_header = (
-            solution_nodes[list(solution_nodes.keys())[0]]["properties"]
-            .get("kvproperties", {})
-            .get("hasHeader")
+    def iter_aggregated_chunks(
+        self, concrete_solution_programs, solution_nodes, solution_relationships
+    ):
+        """Generate the aggregated file in chunks (header, registers, one chunk per
+        concrete solution and the measurements) from the parsed files."""
+        first_node = next(iter(solution_nodes.values()))
+        yield self.render_header(first_node, concrete_solution_programs[0])
+        yield self.render_registers(first_node.qubit_count)
+        for node, program in zip(solution_nodes.values(), concrete_solution_programs):
+            yield self.render_concrete_solution(node, program)
+        yield self.render_measurements(first_node.qubit_count)
+
+    def render_header(self, first_node, first_program):
+        if first_node.has_header == "true":
+            header = first_program.sections.require_header()
+            return (
+                "// -- Start HEADER --\n"
+                f'// -- HEADER created from Pattern "{first_node.pattern_name}" --\n'
+                f"{header}"
+                "\n// -- End HEADER --\n\n"
+            )
+        return (
+            "// -- Start HEADER --\n// -- No header defined --\n\n// -- End HEADER --\n\n"
         )
 
-        file_content = "// -- Start HEADER --\n"
+    def render_registers(self, reg_size):
+        return (
+            f"// -- Detected QREG size == {reg_size} --\n"
+            f"// -- Detected CREG size == {reg_size} --\n"
+            f"qreg q[{reg_size}];\n"
+            f"creg meas[{reg_size}];\n"
+            "\n"
+        )
 
-        if has_header == "true":
-            file_content += (
-                f'// -- HEADER created from Pattern "{start_pattern_name}" --\n'
-            )
-            file_content += self.extract_header_until_reg(concrete_solution_files[0])
-        else:
-            file_content += "// -- No header defined --\n"
+    def render_concrete_solution(self, node, program):
+        node_name = node.pattern_name
+        return (
+            f'// -- Start CS from Pattern "{node_name}" --\n'
+            f"{program.sections.require_body()}"
+            f'\n// -- End CS from Pattern "{node_name}" --\n\n'
+        )
+
+    def render_measurements(self, reg_size):
+        return "".join(f"measure q[{i}] -> meas[{i}];\n" for i in range(int(reg_size)))
 
-        file_content += "\n// -- End HEADER --\n\n"
+    def extract_header_until_reg(self, text):
+        return scan_sections(text).header
 
-        file_content += f"// -- Detected QREG size == {reg_size} --\n"
-        file_content += f"// -- Detected CREG size == {reg_size} --\n"
-        file_content += f"qreg q[{reg_size}];\n"
-        file_content += f"creg meas[{reg_size}];\n"
 
-        file_content += "\n"
-        for node in solution_nodes.values():
-            node_name = node["name"].replace("Concrete Solution of ", "")
-            file_content += f'// -- Start CS from Pattern "{node_name}" --\n'
-            file_content += self.extract_cs(concrete_solution_files.pop(0))
-            file_content += f'\n// -- End CS from Pattern "{node_name}" --\n\n'
+@API_V1.route("/bloqcat/winery/topology/deploy/batch", methods=["POST"])
+class TopologyBatchView(TopologyView):
+    """POST endpoint to retrieve the aggregated solutions of multiple topologies.
 
-        for i in range(int(reg_size)):
-            file_content += f"measure q[{i}] -> meas[{i}];\n"
+    The request body is a json list of topologies. Every concrete solution file
+    needed by any of the topologies is fetched only once. The response is a zip
+    archive containing the aggregated file (or the error) of every topology and
+    a ``manifest.json`` describing the result of every topology.
+    """
 
-        return file_content
+    def post(self):
+        try:
+            data = loads_json(self.read_request_body())
+        except BodyTooLargeError:
+            return "Die Topologien sind zu groß.", HTTPStatus.REQUEST_ENTITY_TOO_LARGE
+        except TopologyFormatError as e:
+            return f"Invalid JSON data: {str(e)}", HTTPStatus.BAD_REQUEST
 
-    def extract_header_until_reg(self, text):
-        lines = text.split("\n")
-        for i, line in enumerate(lines):
-            if line.startswith("qreg ") or line.startswith("creg "):
-                return "\n".join(lines[:i])
-        return None
+        if not isinstance(data, list) or not data:
+            return "Daten müssen eine Liste von Topologien sein.", HTTPStatus.BAD_REQUEST
+        max_topologies = current_app.config.get("AGGREGATION_BATCH_MAX_TOPOLOGIES", 100)
+        if len(data) > max_topologies:
+            return (
+                f"Es können höchstens {max_topologies} Topologien gleichzeitig aggregiert werden.",
+                HTTPStatus.BAD_REQUEST,
+            )
+
+        # Validierung aller Topologien, bevor Dateien abgerufen werden
+        topologies, processed = self.process_topologies(data)
+        del data
+
+        # Jede benötigte Datei wird für alle Topologien nur einmal abgerufen
+        node_ids = [
+            node_id
+            for valid, _, solution_nodes, _ in processed
+            if valid
+            for node_id in solution_nodes
+        ]
+        deadline = Deadline(current_app.config.get("ATLAS_REQUEST_DEADLINE", 60))
+        try:
+            files_by_id = self.fetch_files_by_id(
+                node_ids, deadline, BACKGROUND_FETCH_POOL
+            )
+        except AtlasUnavailableError:
+            return (
+                "Der QC Atlas ist momentan nicht erreichbar.",
+                HTTPStatus.SERVICE_UNAVAILABLE,
+            )
+        except AtlasDeadlineExceededError:
+            return (
+                "Zeitüberschreitung beim Abrufen der Dateien.",
+                HTTPStatus.GATEWAY_TIMEOUT,
+            )
+
+        archive = BytesIO()
+        manifest = []
+        with ZipFile(archive, "w", compression=ZIP_DEFLATED) as zip_file:
+            for index, (topology, result) in enumerate(zip(topologies, processed)):
+                name = self.result_name(index, topology)
+                status, content = self.aggregate_solution_path(result, files_by_id)
+                entry = {"index": index, "name": name, "status": status}
+                if status == HTTPStatus.OK:
+                    entry["file"] = f"{name}.qasm"
+                else:
+                    entry["file"] = f"{name}.error.txt"
+                    entry["message"] = content.decode()
+                zip_file.writestr(entry["file"], content)
+                manifest.append(entry)
+            zip_file.writestr("manifest.json", dumps(manifest, indent=2))
+
+        return Response(
+            archive.getvalue(),
+            mimetype="application/zip",
+            headers={"Content-Disposition": "attachment;filename=aggregation.zip"},
+        )
+
+    def process_topologies(self, data):
+        topologies = []
+        processed = []
+        for topology_data in data:
+            try:
+                topology = extract_topology(topology_data)
+            except TopologyFormatError as e:
+                topologies.append(None)
+                processed.append((False, f"Die Topologie ist ungültig: {e}", None, None))
+            else:
+                topologies.append(topology)
+                processed.append(self.process_topology(topology))
+        return topologies, processed
+
+    def result_name(self, index, topology):
+        topology_id = topology.id if topology is not None else None
+        safe_id = re.sub(r"[^A-Za-z0-9_.-]+", "_", str(topology_id or "")).strip("._")
+        return f"{index:03d}-{safe_id}" if safe_id else f"{index:03d}"
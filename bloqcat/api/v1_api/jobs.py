@@ -0,0 +1,153 @@
+"""Module containing the asynchronous aggregation job endpoints of the v1 API."""
+
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Optional
+
+from flask import Response, current_app, url_for
+from flask.views import MethodView
+from flask_smorest import abort
+
+from .bloqcat import TopologyView, negotiate_response_encoding
+from .models import AggregationJobSchema
+from .root import API_V1
+from ...aggregation import (
+    JOB_WORKERS,
+    RESULT_CACHE,
+    BodyTooLargeError,
+    JobState,
+    TopologyFormatError,
+    cache_result,
+    get_cached_body,
+    get_job,
+    parse_topology,
+)
+from ...atlas import BACKGROUND_FETCH_POOL, Deadline
+from ...util.compression import encoding_headers
+from ...db.models.aggregation import AggregationJob
+
+
+@dataclass
+class AggregationJobData:
+    id: str
+    state: str
+    created_at: datetime
+    started_at: Optional[datetime]
+    finished_at: Optional[datetime]
+    status_code: Optional[int]
+    message: Optional[str]
+    result_size: Optional[int]
+    self: str
+    result: Optional[str]
+
+    @classmethod
+    def from_job(cls, job: AggregationJob) -> "AggregationJobData":
+        result_url = None
+        if job.state == JobState.FINISHED.value:
+            result_url = url_for(
+                "api-v1.AggregationJobResultView", job_id=job.id, _external=True
+            )
+        return cls(
+            id=job.id,
+            state=job.state,
+            created_at=_as_utc(job.created_at),
+            started_at=_as_utc(job.started_at),
+            finished_at=_as_utc(job.finished_at),
+            status_code=job.status_code,
+            message=job.message,
+            result_size=job.result_size,
+            self=url_for("api-v1.AggregationJobView", job_id=job.id, _external=True),
+            result=result_url,
+        )
+
+
+def _as_utc(timestamp: Optional[datetime]) -> Optional[datetime]:
+    # sqlite does not store timezone information
+    if timestamp is not None and timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def aggregate_job_topology(topology: str):
+    deadline = Deadline(current_app.config.get("AGGREGATION_JOB_DEADLINE", 600))
+    return TopologyView().aggregate_topology(
+        parse_topology(topology.encode()), deadline, BACKGROUND_FETCH_POOL
+    )
+
+
+def get_job_or_404(job_id: str) -> AggregationJob:
+    job = get_job(job_id)
+    if job is None:
+        abort(HTTPStatus.NOT_FOUND, message="Der Auftrag existiert nicht.")
+    return job
+
+
+@API_V1.route("/bloqcat/winery/topology/jobs")
+class AggregationJobsView(MethodView):
+    """POST endpoint to aggregate a topology asynchronously."""
+
+    @API_V1.response(HTTPStatus.ACCEPTED, AggregationJobSchema())
+    def post(self):
+        """Submit a topology for aggregation and get the aggregation job."""
+        view = TopologyView()
+        try:
+            body = view.read_request_body()
+            topology = parse_topology(body)
+        except BodyTooLargeError:
+            abort(
+                HTTPStatus.REQUEST_ENTITY_TOO_LARGE, message="Die Topologie ist zu groß."
+            )
+        except TopologyFormatError as e:
+            abort(HTTPStatus.BAD_REQUEST, message=f"Invalid JSON data: {str(e)}")
+
+        # Ungültige Topologien werden sofort abgelehnt
+        valid, message, _, _ = view.process_topology(topology)
+        if not valid:
+            abort(HTTPStatus.BAD_REQUEST, message=message)
+
+        job = JOB_WORKERS.submit(
+            current_app._get_current_object(),
+            body.decode(),
+            aggregate_job_topology,
+        )
+        job_data = AggregationJobData.from_job(job)
+        return job_data, HTTPStatus.ACCEPTED, {"Location": job_data.self}
+
+
+@API_V1.route("/bloqcat/winery/topology/jobs/<string:job_id>")
+class AggregationJobView(MethodView):
+    """GET endpoint for the state of an aggregation job."""
+
+    @API_V1.response(HTTPStatus.OK, AggregationJobSchema())
+    def get(self, job_id: str):
+        """Get the state of an aggregation job."""
+        return AggregationJobData.from_job(get_job_or_404(job_id))
+
+
+@API_V1.route("/bloqcat/winery/topology/jobs/<string:job_id>/result")
+class AggregationJobResultView(MethodView):
+    """GET endpoint to download the aggregated file of a finished aggregation job."""
+
+    def get(self, job_id: str):
+        """Download the aggregated file of an aggregation job."""
+        job = get_job_or_404(job_id)
+        if job.state == JobState.FAILED.value:
+            return job.message, job.status_code
+        if job.state != JobState.FINISHED.value:
+            return "Der Auftrag ist noch nicht abgeschlossen.", HTTPStatus.CONFLICT
+
+        # Ergebnisse (und ihre komprimierten Varianten) werden gecacht
+        cache_key = f"job:{job.id}"
+        cached_result = RESULT_CACHE.get(cache_key)
+        if cached_result is None:
+            cached_result = cache_result(cache_key, job.result)
+        encoding = negotiate_response_encoding(len(cached_result.body))
+        return Response(
+            get_cached_body(cache_key, cached_result, encoding),
+            mimetype="text/plain",
+            headers={
+                "Content-Disposition": "attachment;filename=aggregation.qasm",
+                **encoding_headers(encoding),
+            },
+        )
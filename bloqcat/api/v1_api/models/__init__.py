@@ -2,3 +2,4 @@
 
 from .root import *  # noqa
 from .auth import *  # noqa
+from .jobs import *  # noqa
@@ -0,0 +1,19 @@
+"""Module containing all API schemas for the aggregation job API."""
+
+import marshmallow as ma
+from ...util import MaBaseSchema
+
+__all__ = ["AggregationJobSchema"]
+
+
+class AggregationJobSchema(MaBaseSchema):
+    id = ma.fields.String(required=True, allow_none=False, dump_only=True)
+    state = ma.fields.String(required=True, allow_none=False, dump_only=True)
+    created_at = ma.fields.DateTime(required=True, dump_only=True)
+    started_at = ma.fields.DateTime(allow_none=True, dump_only=True)
+    finished_at = ma.fields.DateTime(allow_none=True, dump_only=True)
+    status_code = ma.fields.Integer(allow_none=True, dump_only=True)
+    message = ma.fields.String(allow_none=True, dump_only=True)
+    result_size = ma.fields.Integer(allow_none=True, dump_only=True)
+    self = ma.fields.Url(required=True, allow_none=False, dump_only=True)
+    result = ma.fields.Url(allow_none=True, dump_only=True)
@@ -0,0 +1,47 @@
+"""Module containing the QC Atlas client used to fetch concrete solution files."""
+
+from typing import Optional
+
+from flask import Flask
+
+from .cli import register_cli_blueprint
+from .client import ATLAS, AtlasFile
+from .deadline import Deadline
+from .errors import AtlasError, AtlasDeadlineExceededError, AtlasUnavailableError
+from .files import FILE_CACHE, configure_file_cache, get_concrete_solution_file
+from .pool import BACKGROUND_FETCH_POOL, FETCH_POOL
+
+
+def get_file(
+    concrete_solution_id: str, deadline: Optional[Deadline] = None
+) -> Optional[AtlasFile]:
+    """Get the file of a concrete solution (served from cache if possible).
+
+    Requires an active app context.
+    """
+    return get_concrete_solution_file(ATLAS, concrete_solution_id, deadline)
+
+
+def register_atlas(app: Flask):
+    """Register the QC Atlas client, file cache and fetch pools with the flask app."""
+    ATLAS.init_app(app)
+    configure_file_cache(app)
+    FETCH_POOL.init_app(app)
+    BACKGROUND_FETCH_POOL.init_app(app)
+    register_cli_blueprint(app)
+    app.logger.info(f'Using QC Atlas at "{ATLAS.base_url}".')
+
+
+__all__ = [
+    "ATLAS",
+    "AtlasFile",
+    "AtlasError",
+    "AtlasDeadlineExceededError",
+    "AtlasUnavailableError",
+    "BACKGROUND_FETCH_POOL",
+    "Deadline",
+    "FETCH_POOL",
+    "FILE_CACHE",
+    "get_file",
+    "register_atlas",
+]
@@ -0,0 +1,106 @@
+"""Module containing the circuit breaker guarding the QC Atlas dependency."""
+
+from enum import Enum
+from threading import Lock
+from time import monotonic
+from typing import Callable
+
+
+class CircuitState(Enum):
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+
+class CircuitBreaker:
+    """Thread safe circuit breaker.
+
+    The circuit opens after ``failure_threshold`` consecutive failures. While it is
+    open all requests are rejected. After ``reset_timeout`` seconds up to
+    ``half_open_max_calls`` trial requests are let through; a successful trial
+    closes the circuit again, a failed trial opens it for another ``reset_timeout``.
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        clock: Callable[[], float] = monotonic,
+    ) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self._clock = clock
+        self._lock = Lock()
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._trial_calls = 0
+
+    def configure(
+        self, failure_threshold: int, reset_timeout: float, half_open_max_calls: int
+    ):
+        """Change the settings and reset the breaker to the closed state."""
+        with self._lock:
+            self.failure_threshold = failure_threshold
+            self.reset_timeout = reset_timeout
+            self.half_open_max_calls = half_open_max_calls
+            self._close()
+
+    @property
+    def state(self) -> CircuitState:
+        with self._lock:
+            self._update_state()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """Check if a request may be sent. Every allowed request must be followed by
+        a call to :py:meth:`record_success`, :py:meth:`record_failure` or
+        :py:meth:`release`."""
+        with self._lock:
+            self._update_state()
+            if self._state == CircuitState.CLOSED:
+                return True
+            if self._state == CircuitState.HALF_OPEN:
+                if self._trial_calls < self.half_open_max_calls:
+                    self._trial_calls += 1
+                    return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self._close()
+
+    def record_failure(self):
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN:
+                self._open()
+                return
+            self._failures += 1
+            if self._state == CircuitState.CLOSED:
+                if self._failures >= self.failure_threshold > 0:
+                    self._open()
+
+    def release(self):
+        """Give back an allowed request that ended without telling anything about the
+        health of the QC Atlas (e.g. cut short by a deadline)."""
+        with self._lock:
+            if self._state == CircuitState.HALF_OPEN and self._trial_calls > 0:
+                self._trial_calls -= 1
+
+    def _update_state(self):
+        if self._state == CircuitState.OPEN:
+            if self._clock() - self._opened_at >= self.reset_timeout:
+                self._state = CircuitState.HALF_OPEN
+                self._trial_calls = 0
+
+    def _open(self):
+        self._state = CircuitState.OPEN
+        self._opened_at = self._clock()
+        self._trial_calls = 0
+
+    def _close(self):
+        self._state = CircuitState.CLOSED
+        self._failures = 0
+        self._trial_calls = 0
@@ -0,0 +1,178 @@
+"""CLI functions for the atlas module."""
+
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from flask import Blueprint, Flask, current_app
+import click
+
+from ..util.logging import get_logger
+from .client import ATLAS, ATLAS_LOGGER, AtlasClient, AtlasFile
+from .errors import AtlasError
+from .files import get_concrete_solution_file
+
+ATLAS_CLI_BLP = Blueprint("atlas_cli", __name__, cli_group="atlas")
+ATLAS_CLI = ATLAS_CLI_BLP.cli  # expose as attribute for autodoc generation
+
+
+@ATLAS_CLI.command("warm-cache")
+@click.option(
+    "--id",
+    "concrete_solution_ids",
+    multiple=True,
+    help="Only prefetch these concrete solutions (default: all listed by the QC Atlas).",
+)
+@click.option(
+    "--concurrency",
+    "-c",
+    type=click.IntRange(min=1),
+    default=None,
+    help="Number of parallel downloads (default: ATLAS_FETCH_CONCURRENCY).",
+)
+@click.option(
+    "--force",
+    is_flag=True,
+    help="Revalidate files that are already cached or stored with the QC Atlas.",
+)
+def warm_cache(
+    concrete_solution_ids: Sequence[str], concurrency: Optional[int], force: bool
+):
+    """Prefetch concrete solution files into the db store and the in-process cache."""
+    ids = list(concrete_solution_ids)
+    if not ids:
+        try:
+            ids = ATLAS.list_concrete_solutions()
+        except AtlasError as err:
+            raise click.ClickException(str(err)) from err
+    click.echo(f"Prefetching {len(ids)} concrete solution files.")
+
+    if concurrency is None:
+        concurrency = current_app.config.get("ATLAS_FETCH_CONCURRENCY", 8)
+    fetched, total_bytes, failed = warm_cache_function(
+        current_app._get_current_object(), ATLAS, ids, concurrency, force
+    )
+
+    click.echo(f"Fetched {fetched} files ({total_bytes} bytes), {len(failed)} failed.")
+    for concrete_solution_id, reason in failed:
+        click.echo(f"  {concrete_solution_id}: {reason}", err=True)
+
+
+def warm_cache_function(
+    app: Flask,
+    client: AtlasClient,
+    concrete_solution_ids: Sequence[str],
+    concurrency: int,
+    force: bool = False,
+) -> Tuple[int, int, List[Tuple[str, str]]]:
+    """Fetch the files of the given concrete solutions with bounded parallelism.
+
+    Returns the number of fetched files, their total size in bytes and a list of
+    failed concrete solution ids together with the reason.
+    """
+    logger = get_logger(app, ATLAS_LOGGER)
+
+    def fetch(concrete_solution_id: str) -> Optional[AtlasFile]:
+        with app.app_context():
+            return get_concrete_solution_file(
+                client, concrete_solution_id, revalidate=force
+            )
+
+    fetched = 0
+    total_bytes = 0
+    failed: List[Tuple[str, str]] = []
+    with ThreadPoolExecutor(
+        max_workers=concurrency, thread_name_prefix="atlas-warm"
+    ) as executor:
+        futures = {executor.submit(fetch, i): i for i in concrete_solution_ids}
+        with click.progressbar(
+            as_completed(futures), length=len(futures), label="Fetching files"
+        ) as progress:
+            for future in progress:
+                concrete_solution_id = futures[future]
+                try:
+                    file = future.result()
+                except AtlasError as err:
+                    failed.append((concrete_solution_id, str(err)))
+                    continue
+                if file is None:
+                    failed.append((concrete_solution_id, "file could not be fetched"))
+                    continue
+                fetched += 1
+                total_bytes += file.size
+
+    logger.info(
+        f"Prefetched {fetched} concrete solution files ({total_bytes} bytes), "
+        f"{len(failed)} failed."
+    )
+    return fetched, total_bytes, failed
+
+
+@ATLAS_CLI.command("stub")
+@click.option("--host", default="127.0.0.1", show_default=True)
+@click.option("--port", type=int, default=6626, show_default=True)
+@click.option(
+    "--fixtures",
+    type=click.Path(exists=True, file_okay=False, path_type=Path),
+    default=None,
+    help="Directory with *.qasm files served by their file name (without extension).",
+)
+@click.option(
+    "--latency", type=float, default=0.0, help="Added latency per request in seconds."
+)
+@click.option(
+    "--jitter", type=float, default=0.0, help="Maximum random extra latency in seconds."
+)
+@click.option(
+    "--error-rate",
+    type=click.FloatRange(0, 1),
+    default=0.0,
+    help="Probability of answering a request with 503.",
+)
+@click.option(
+    "--file-size",
+    type=int,
+    default=None,
+    help="Answer unknown ids with generated QASM files of this size in bytes.",
+)
+@click.option(
+    "--qubits", type=int, default=2, help="Register size of generated QASM files."
+)
+@click.option("--seed", type=int, default=None, help="Seed for latency and errors.")
+def stub(
+    host: str,
+    port: int,
+    fixtures: Optional[Path],
+    latency: float,
+    jitter: float,
+    error_rate: float,
+    file_size: Optional[int],
+    qubits: int,
+    seed: Optional[int],
+):
+    """Run a local stand-in for the QC Atlas API serving QASM fixtures.
+
+    Point ATLAS_BASE_URL (e.g. with the env var BLOQCAT_ATLAS_BASE_URL) to the stub
+    to run the aggregation without a QC Atlas.
+    """
+    from werkzeug.serving import run_simple
+
+    from .stub import create_stub_app
+
+    stub_app = create_stub_app(
+        fixtures_dir=fixtures,
+        latency=latency,
+        latency_jitter=jitter,
+        error_rate=error_rate,
+        file_size=file_size,
+        qubits=qubits,
+        seed=seed,
+    )
+    click.echo(f"Serving QC Atlas stub on http://{host}:{port}")
+    run_simple(host, port, stub_app, threaded=True)
+
+
+def register_cli_blueprint(app: Flask):
+    """Method to register the atlas CLI blueprint."""
+    app.register_blueprint(ATLAS_CLI_BLP)
+    app.logger.info("Registered atlas cli blueprint.")
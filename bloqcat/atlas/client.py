@@ -0,0 +1,275 @@
+"""Module containing the HTTP client for the QC Atlas API."""
+
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from hashlib import sha256
+from itertools import count
+from logging import Logger, getLogger
+from time import sleep
+from typing import Any, List, Optional, Tuple
+
+from flask import Flask
+from requests import Response, Session
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException
+
+from ..tracing import TRACER
+from ..util.logging import get_logger
+from .breaker import CircuitBreaker
+from .deadline import Deadline
+from .errors import AtlasDeadlineExceededError, AtlasUnavailableError
+
+ATLAS_LOGGER = "atlas"
+
+# responses of these statuses are retried (like connection errors)
+RETRY_STATUSES = (502, 503, 504)
+
+CONCRETE_SOLUTIONS_PATH = "/atlas/patterns/patternId/concrete-solutions"
+CONCRETE_SOLUTION_FILE_PATH = (
+    CONCRETE_SOLUTIONS_PATH + "/{concrete_solution_id}/file/content"
+)
+
+
+@dataclass
+class AtlasFile:
+    """A concrete solution file together with the http validators of the response."""
+
+    concrete_solution_id: str
+    content: str
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    fetched_at: datetime = field(default_factory=lambda: datetime.now(timezone.utc))
+    content_hash: str = ""
+    size: int = 0
+
+    def __post_init__(self):
+        if not self.content_hash or not self.size:
+            encoded = self.content.encode()
+            self.content_hash = sha256(encoded).hexdigest()
+            self.size = len(encoded)
+
+
+class AtlasClient:
+    """Client for the QC Atlas API using a pooled keep-alive session.
+
+    The client is configured with the flask app config in :py:meth:`init_app`.
+    The session and the circuit breaker are shared between all threads of the worker
+    process.
+    """
+
+    def __init__(self) -> None:
+        self.base_url: str = "http://qc-atlas-api:6626"
+        self.timeout = (3.05, 30.0)
+        self.retries = 3
+        self.retry_backoff = 0.3
+        self.session: Optional[Session] = None
+        self.breaker = CircuitBreaker()
+        self.logger: Logger = getLogger(__name__)
+
+    def init_app(self, app: Flask):
+        """Configure the client and create the pooled http session."""
+        config = app.config
+        self.base_url = config.get("ATLAS_BASE_URL", self.base_url).rstrip("/")
+        self.timeout = (
+            config.get("ATLAS_CONNECT_TIMEOUT", 3.05),
+            config.get("ATLAS_READ_TIMEOUT", 30.0),
+        )
+        self.logger = get_logger(app, ATLAS_LOGGER)
+        self.breaker.configure(
+            failure_threshold=config.get("ATLAS_BREAKER_FAILURE_THRESHOLD", 5),
+            reset_timeout=config.get("ATLAS_BREAKER_RESET_TIMEOUT", 30),
+            half_open_max_calls=config.get("ATLAS_BREAKER_HALF_OPEN_MAX_CALLS", 1),
+        )
+
+        # retries are sent by _get, so that they stop at the deadline of the request
+        self.retries = max(0, config.get("ATLAS_RETRIES", 3))
+        self.retry_backoff = config.get("ATLAS_RETRY_BACKOFF", 0.3)
+        pool_size = config.get("ATLAS_POOL_SIZE", 16)
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+
+        if self.session is not None:
+            self.session.close()
+        session = Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        self.session = session
+
+    def url_for(self, path: str) -> str:
+        """Build the full url for a path of the atlas api."""
+        return f"{self.base_url}{path}"
+
+    def _get(
+        self, url: str, deadline: Optional[Deadline] = None, **kwargs
+    ) -> Tuple[Response, int]:
+        """Send a GET request, retrying connection errors and 502, 503, 504 responses.
+
+        Every try gets the timeout clamped to the remaining time of the deadline and
+        no retry is started if the deadline expires before the backoff is over.
+        Returns the last response and the number of tries.
+
+        Raises:
+            RequestException: if the last try failed
+            AtlasDeadlineExceededError: if the deadline expired before the first try
+        """
+        for attempt in count(1):
+            timeout = self.timeout
+            if deadline is not None:
+                deadline.check()
+                timeout = (deadline.clamp(timeout[0]), deadline.clamp(timeout[1]))
+            error: Optional[RequestException] = None
+            try:
+                response = self.session.get(url, timeout=timeout, **kwargs)
+                if response.status_code not in RETRY_STATUSES:
+                    return response, attempt
+            except RequestException as err:
+                error = err
+
+            backoff = self.retry_backoff * 2 ** (attempt - 1)
+            remaining = deadline.remaining() if deadline is not None else None
+            if attempt > self.retries or (remaining is not None and remaining <= backoff):
+                if error is not None:
+                    raise error
+                return response, attempt
+            if error is None:
+                response.close()
+            sleep(backoff)
+
+    def list_concrete_solutions(self) -> List[str]:
+        """List the ids of all concrete solutions known to the QC Atlas.
+
+        Supports plain json lists as well as paged (``content``) and HAL
+        (``_embedded``) responses.
+
+        Raises:
+            AtlasUnavailableError: if the list could not be retrieved
+        """
+        if self.session is None:
+            raise RuntimeError("The atlas client was not initialized with an app.")
+        ids: List[str] = []
+        page = 0
+        while True:
+            try:
+                response, _ = self._get(
+                    self.url_for(CONCRETE_SOLUTIONS_PATH),
+                    params={"page": page, "size": 100},
+                )
+                response.raise_for_status()
+                data = response.json()
+            except (RequestException, ValueError) as err:
+                raise AtlasUnavailableError(
+                    f"Could not list the concrete solutions: {err}"
+                ) from err
+            ids.extend(str(item["id"]) for item in _page_items(data) if "id" in item)
+            total_pages = data.get("totalPages") if isinstance(data, dict) else None
+            page += 1
+            if not isinstance(total_pages, int) or page >= total_pages:
+                return ids
+
+    def fetch_concrete_solution_file(
+        self,
+        concrete_solution_id: str,
+        cached: Optional[AtlasFile] = None,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[AtlasFile]:
+        """Fetch the file content of a concrete solution.
+
+        If a cached file is given, the request is sent as a conditional request using
+        the validators of the cached file. If the QC Atlas answers with 304 Not
+        Modified, the cached file is returned with an updated fetch time.
+
+        Returns None if the file could not be retrieved.
+
+        Raises:
+            AtlasUnavailableError: if the circuit breaker rejects the request
+            AtlasDeadlineExceededError: if the deadline expired before or during the
+                request
+        """
+        if self.session is None:
+            raise RuntimeError("The atlas client was not initialized with an app.")
+        if deadline is not None:
+            deadline.check()
+        if not self.breaker.allow_request():
+            raise AtlasUnavailableError("The QC Atlas is currently unavailable.")
+        url = self.url_for(
+            CONCRETE_SOLUTION_FILE_PATH.format(concrete_solution_id=concrete_solution_id)
+        )
+        headers = {}
+        if cached is not None:
+            if cached.etag:
+                headers["If-None-Match"] = cached.etag
+            if cached.last_modified:
+                headers["If-Modified-Since"] = cached.last_modified
+        response = self._get_file(concrete_solution_id, url, headers, deadline)
+        if response is None:
+            return None
+        if response.status_code >= 500:
+            self.breaker.record_failure()
+        else:
+            self.breaker.record_success()
+        if response.status_code == 304 and cached is not None:
+            return replace(
+                cached,
+                etag=response.headers.get("ETag", cached.etag),
+                last_modified=response.headers.get("Last-Modified", cached.last_modified),
+                fetched_at=datetime.now(timezone.utc),
+            )
+        if response.status_code == 200:
+            return AtlasFile(
+                concrete_solution_id=concrete_solution_id,
+                content=response.text,
+                etag=response.headers.get("ETag"),
+                last_modified=response.headers.get("Last-Modified"),
+            )
+        self.logger.warning(
+            f"Fetching the file of concrete solution {concrete_solution_id} failed "
+            f"with status {response.status_code}."
+        )
+        return None
+
+    def _get_file(
+        self,
+        concrete_solution_id: str,
+        url: str,
+        headers: dict,
+        deadline: Optional[Deadline] = None,
+    ) -> Optional[Response]:
+        with TRACER.span(
+            "atlas.request",
+            concrete_solution_id=concrete_solution_id,
+            conditional=bool(headers),
+        ) as span:
+            try:
+                response, tries = self._get(url, deadline, headers=headers)
+            except (RequestException, AtlasDeadlineExceededError) as err:
+                span.record_error(err)
+                if deadline is not None and deadline.expired:
+                    # the timeout was cut short by the deadline, not a QC Atlas failure
+                    self.breaker.release()
+                    raise AtlasDeadlineExceededError(
+                        "The request deadline was exceeded."
+                    ) from err
+                self.breaker.record_failure()
+                self.logger.warning(
+                    f"Could not fetch the file of concrete solution {concrete_solution_id}: {err}"
+                )
+                return None
+            span.set_attribute("tries", tries)
+            span.set_attribute("status_code", response.status_code)
+            span.set_attribute("bytes", len(response.content))
+            return response
+
+
+# the client instance shared by the whole app (configured in register_atlas)
+ATLAS = AtlasClient()
+
+
+def _page_items(data: Any) -> List[Any]:
+    if isinstance(data, list):
+        return data
+    if isinstance(data, dict):
+        if isinstance(data.get("content"), list):
+            return data["content"]
+        for items in data.get("_embedded", {}).values():
+            if isinstance(items, list):
+                return items
+    return []
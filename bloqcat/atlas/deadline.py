@@ -0,0 +1,42 @@
+"""Module containing the deadline used to bound the duration of a request."""
+
+from time import monotonic
+from typing import Optional
+
+from .errors import AtlasDeadlineExceededError
+
+
+class Deadline:
+    """A point in time after which no further work should be started.
+
+    A deadline created with ``timeout=None`` never expires.
+    """
+
+    __slots__ = ("expires_at",)
+
+    def __init__(self, timeout: Optional[float]) -> None:
+        self.expires_at: Optional[float] = (
+            None if timeout is None else monotonic() + timeout
+        )
+
+    def remaining(self) -> Optional[float]:
+        """The remaining time in seconds (None if the deadline never expires)."""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - monotonic())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and monotonic() >= self.expires_at
+
+    def check(self):
+        """Raise an :py:class:`AtlasDeadlineExceededError` if the deadline expired."""
+        if self.expired:
+            raise AtlasDeadlineExceededError("The request deadline was exceeded.")
+
+    def clamp(self, timeout: float) -> float:
+        """Limit a timeout to the remaining time of the deadline."""
+        remaining = self.remaining()
+        if remaining is None:
+            return timeout
+        return min(timeout, remaining)
@@ -0,0 +1,13 @@
+"""Module containing the exceptions raised when the QC Atlas cannot be used."""
+
+
+class AtlasError(Exception):
+    """Base class for errors of the QC Atlas dependency."""
+
+
+class AtlasUnavailableError(AtlasError):
+    """Raised when requests to the QC Atlas are blocked by the circuit breaker."""
+
+
+class AtlasDeadlineExceededError(AtlasError):
+    """Raised when the deadline of the current request is exceeded."""
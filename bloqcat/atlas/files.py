@@ -0,0 +1,127 @@
+"""Module containing the cached lookup of concrete solution files.
+
+Files are looked up in the in-process cache first, then in the persistent db store
+and only then fetched from the QC Atlas.
+"""
+
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from typing import Optional
+
+from flask import Flask, current_app
+
+from ..tracing import TRACER
+from ..util.cache import LRUCache
+from .client import AtlasClient, AtlasFile
+from .deadline import Deadline
+from .errors import AtlasDeadlineExceededError, AtlasUnavailableError
+from .singleflight import SingleFlight
+from . import store
+
+FILE_CACHE: LRUCache[AtlasFile] = LRUCache()
+
+# only one lookup per concrete solution (and revalidation flag) is in flight at any time
+FILE_LOOKUPS: SingleFlight[Optional[AtlasFile]] = SingleFlight()
+
+
+def configure_file_cache(app: Flask):
+    """Configure the limits of the concrete solution file cache."""
+    config = app.config
+    FILE_CACHE.configure(
+        max_entries=config.get("ATLAS_CACHE_MAX_ENTRIES", 1024),
+        max_bytes=config.get("ATLAS_CACHE_MAX_BYTES", 64 * 1024 * 1024),
+        ttl=config.get("ATLAS_CACHE_TTL", 300),
+    )
+
+
+def get_concrete_solution_file(
+    client: AtlasClient,
+    concrete_solution_id: str,
+    deadline: Optional[Deadline] = None,
+    revalidate: bool = False,
+) -> Optional[AtlasFile]:
+    """Get the file of a concrete solution from the cache, the db store or the QC Atlas.
+
+    Expired files (or all files if ``revalidate`` is set) are revalidated with a
+    conditional request. Concurrent lookups of the same concrete solution share a
+    single lookup, a caller only waits for it within its own deadline.
+    Requires an active app context.
+
+    Raises:
+        AtlasUnavailableError: if the QC Atlas is unavailable and no copy is known
+        AtlasDeadlineExceededError: if the deadline expired during the lookup
+    """
+    with TRACER.span("atlas.fetch", concrete_solution_id=concrete_solution_id) as span:
+        file = None if revalidate else FILE_CACHE.get(concrete_solution_id)
+        span.set_attribute("cache_hit", file is not None)
+        if file is None:
+            if deadline is None:
+                deadline = Deadline(None)
+            file = _shared_lookup(client, concrete_solution_id, deadline, revalidate)
+        span.set_attribute("bytes", file.size if file is not None else 0)
+        return file
+
+
+def _shared_lookup(
+    client: AtlasClient,
+    concrete_solution_id: str,
+    deadline: Deadline,
+    revalidate: bool,
+) -> Optional[AtlasFile]:
+    lookup = partial(_lookup_file, client, concrete_solution_id, deadline, revalidate)
+    while True:
+        try:
+            return FILE_LOOKUPS.do(
+                (concrete_solution_id, revalidate),
+                lookup,
+                timeout=deadline.remaining(),
+            )
+        except TimeoutError as err:
+            raise AtlasDeadlineExceededError(
+                "The request deadline was exceeded."
+            ) from err
+        except AtlasDeadlineExceededError:
+            # the shared lookup ran out of the deadline of the caller executing it,
+            # the other callers try again within their own deadline
+            if deadline.expired:
+                raise
+
+
+def _lookup_file(
+    client: AtlasClient,
+    concrete_solution_id: str,
+    deadline: Deadline,
+    revalidate: bool = False,
+) -> Optional[AtlasFile]:
+    config = current_app.config
+    use_store = config.get("ATLAS_STORE_ENABLED", True)
+
+    # an expired cache entry still provides the validators for revalidation
+    known = FILE_CACHE.peek(concrete_solution_id)
+    if known is None and use_store:
+        known = store.load_file(concrete_solution_id)
+        if known is not None and not revalidate:
+            max_age = timedelta(seconds=config.get("ATLAS_STORE_MAX_AGE", 86400))
+            if datetime.now(timezone.utc) - known.fetched_at <= max_age:
+                FILE_CACHE.set(concrete_solution_id, known, known.size)
+                return known
+
+    try:
+        file = client.fetch_concrete_solution_file(
+            concrete_solution_id, cached=known, deadline=deadline
+        )
+    except AtlasUnavailableError:
+        if known is None:
+            raise
+        file = None
+    if file is None:
+        # serve an outdated copy rather than failing if the QC Atlas is unavailable
+        return known
+
+    FILE_CACHE.set(concrete_solution_id, file, file.size)
+    if use_store:
+        if known is not None and known.content_hash == file.content_hash:
+            store.renew_file(file)
+        else:
+            store.save_file(file)
+    return file
@@ -0,0 +1,55 @@
+"""Module containing the worker pool fetching concrete solution files in parallel."""
+
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import Callable, Optional, TypeVar
+
+from flask import Flask
+
+T = TypeVar("T")
+
+
+class FetchPool:
+    """Worker pool shared by the requests of this process.
+
+    The size is read from the config key ``size_key``. The threads are only started
+    once the first fetch is submitted (i.e. after the worker processes were forked).
+    """
+
+    def __init__(self, size_key: str, max_workers: int, thread_name_prefix: str):
+        self.size_key = size_key
+        self.max_workers = max_workers
+        self.thread_name_prefix = thread_name_prefix
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._lock = Lock()
+
+    def init_app(self, app: Flask):
+        max_workers = max(1, app.config.get(self.size_key, self.max_workers))
+        with self._lock:
+            if self._executor is not None and max_workers != self.max_workers:
+                # running fetches still finish on the old pool
+                self._executor.shutdown(wait=False)
+                self._executor = None
+            self.max_workers = max_workers
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers,
+                    thread_name_prefix=self.thread_name_prefix,
+                )
+            return self._executor
+
+    def submit(self, fetch: Callable[..., T], *args) -> "Future[T]":
+        """Queue a fetch on the pool."""
+        return self.executor.submit(fetch, *args)
+
+
+# the pool for interactive requests and a separate pool for batch requests and
+# aggregation jobs, so that large batches never queue ahead of interactive requests
+FETCH_POOL = FetchPool("ATLAS_FETCH_CONCURRENCY", 8, "atlas-fetch")
+BACKGROUND_FETCH_POOL = FetchPool(
+    "ATLAS_BACKGROUND_FETCH_CONCURRENCY", 4, "atlas-background-fetch"
+)
@@ -0,0 +1,60 @@
+"""Module containing request coalescing for concurrent identical calls."""
+
+from threading import Event, Lock
+from typing import Callable, Dict, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class _Call(Generic[V]):
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result: Optional[V] = None
+        self.error: Optional[BaseException] = None
+
+
+class SingleFlight(Generic[V]):
+    """Coalesce concurrent calls with the same key into a single call.
+
+    The first caller for a key executes the function, all callers arriving while the
+    call is in flight wait for it and share its result or its exception.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Lock()
+        self._calls: Dict[Hashable, _Call[V]] = {}
+
+    def do(
+        self, key: Hashable, function: Callable[[], V], timeout: Optional[float] = None
+    ) -> V:
+        """Execute function for key unless a call for key is already in flight.
+
+        Raises:
+            TimeoutError: if waiting for the call in flight takes longer than timeout
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            is_leader = call is None
+            if call is None:
+                call = _Call()
+                self._calls[key] = call
+
+        if not is_leader:
+            if not call.done.wait(timeout):
+                raise TimeoutError(f"Waiting for the call with key {key} timed out.")
+            if call.error is not None:
+                raise call.error
+            return call.result  # type: ignore
+
+        try:
+            call.result = function()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
@@ -0,0 +1,143 @@
+"""Module containing the persistent database store for concrete solution files.
+
+File contents are stored deduplicated by their sha256 hash.
+All functions require an active app context.
+"""
+
+from datetime import datetime, timezone
+from typing import Optional
+
+from flask import current_app
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from ..db import DB
+from ..db.models.atlas import AtlasFileContent, ConcreteSolutionFile
+from ..util.logging import get_logger
+from .client import ATLAS_LOGGER, AtlasFile
+
+
+def _as_utc(timestamp: datetime) -> datetime:
+    # sqlite does not store timezone information
+    if timestamp.tzinfo is None:
+        return timestamp.replace(tzinfo=timezone.utc)
+    return timestamp
+
+
+def load_file(concrete_solution_id: str) -> Optional[AtlasFile]:
+    """Load the stored file of a concrete solution."""
+    try:
+        stored = DB.session.get(ConcreteSolutionFile, concrete_solution_id)
+    except SQLAlchemyError as err:
+        DB.session.rollback()
+        get_logger(current_app, ATLAS_LOGGER).warning(
+            f"Could not load concrete solution {concrete_solution_id} from the db: {err}"
+        )
+        return None
+    if stored is None:
+        return None
+    return AtlasFile(
+        concrete_solution_id=stored.concrete_solution_id,
+        content=stored.file_content.content,
+        etag=stored.etag,
+        last_modified=stored.last_modified,
+        fetched_at=_as_utc(stored.fetched_at),
+        content_hash=stored.content_hash,
+        size=stored.file_content.size,
+    )
+
+
+def save_file(file: AtlasFile):
+    """Store the file of a concrete solution, replacing the previously stored file."""
+    try:
+        _save_file(file)
+        DB.session.commit()
+    except SQLAlchemyError as err:
+        DB.session.rollback()
+        get_logger(current_app, ATLAS_LOGGER).warning(
+            f"Could not store concrete solution {file.concrete_solution_id} in the db: {err}"
+        )
+
+
+def renew_file(file: AtlasFile):
+    """Update the validators and the fetch time of a stored file with unchanged content.
+
+    Falls back to :py:func:`save_file` if the file is not stored yet.
+    """
+    try:
+        result = DB.session.execute(
+            update(ConcreteSolutionFile)
+            .where(
+                ConcreteSolutionFile.concrete_solution_id == file.concrete_solution_id,
+                ConcreteSolutionFile.content_hash == file.content_hash,
+            )
+            .values(
+                etag=file.etag,
+                last_modified=file.last_modified,
+                fetched_at=file.fetched_at,
+            )
+        )
+        DB.session.commit()
+    except SQLAlchemyError as err:
+        DB.session.rollback()
+        get_logger(current_app, ATLAS_LOGGER).warning(
+            f"Could not renew concrete solution {file.concrete_solution_id} in the db: {err}"
+        )
+        return
+    if result.rowcount == 0:
+        save_file(file)
+
+
+def _save_file(file: AtlasFile):
+    session = DB.session
+    if session.get(AtlasFileContent, file.content_hash) is None:
+        try:
+            with session.begin_nested():
+                session.add(
+                    AtlasFileContent(
+                        content_hash=file.content_hash,
+                        content=file.content,
+                        size=file.size,
+                    )
+                )
+        except IntegrityError:
+            pass  # the same content was stored concurrently by another worker
+
+    stored = session.get(ConcreteSolutionFile, file.concrete_solution_id)
+    if stored is None:
+        try:
+            with session.begin_nested():
+                session.add(
+                    ConcreteSolutionFile(
+                        concrete_solution_id=file.concrete_solution_id,
+                        content_hash=file.content_hash,
+                        etag=file.etag,
+                        last_modified=file.last_modified,
+                        fetched_at=file.fetched_at,
+                    )
+                )
+            return
+        except IntegrityError:
+            # the file was stored concurrently by another worker, replace it
+            stored = session.get(ConcreteSolutionFile, file.concrete_solution_id)
+
+    old_hash = None
+    if stored.content_hash != file.content_hash:
+        old_hash = stored.content_hash
+    stored.content_hash = file.content_hash
+    stored.etag = file.etag
+    stored.last_modified = file.last_modified
+    stored.fetched_at = file.fetched_at
+    session.flush()
+
+    if old_hash is not None:
+        # remove file contents that are no longer referenced by any concrete solution
+        still_used = session.execute(
+            select(ConcreteSolutionFile.concrete_solution_id)
+            .where(ConcreteSolutionFile.content_hash == old_hash)
+            .limit(1)
+        ).first()
+        if still_used is None:
+            old_content = session.get(AtlasFileContent, old_hash)
+            if old_content is not None:
+                session.delete(old_content)
@@ -0,0 +1,121 @@
+"""Module containing a local stand-in for the QC Atlas API.
+
+The stub serves concrete solution files from a directory of QASM fixtures (the file
+name without extension is the concrete solution id). Unknown ids are answered with
+generated QASM files if a synthetic file size is configured. Latency and error rate
+can be configured to benchmark the aggregation pipeline without a running QC Atlas.
+"""
+
+from hashlib import sha256
+from pathlib import Path
+from random import Random
+from time import sleep
+from typing import Callable, Dict, Optional, Union
+
+from flask import Flask, Response, jsonify, request
+from werkzeug.http import http_date
+
+DEFAULT_FIXTURES = Path(__file__).parent / "stub_fixtures"
+
+_GATES = ("h q[{0}];", "x q[{0}];", "z q[{0}];", "t q[{0}];", "cx q[{0}],q[{1}];")
+
+
+def generate_qasm(size: int, qubits: int = 2, seed: Union[int, str] = 0) -> str:
+    """Generate a QASM 2 file of roughly ``size`` bytes with the given register size.
+
+    The generated file is deterministic for the same arguments.
+    """
+    rng = Random(seed)
+    lines = ["OPENQASM 2.0;", 'include "qelib1.inc";', f"qreg q[{qubits}];"]
+    lines.append(f"creg c[{qubits}];")
+    measurements = [f"measure q[{i}] -> c[{i}];" for i in range(qubits)]
+    length = sum(len(line) + 1 for line in lines + measurements)
+    while length < size:
+        first = rng.randrange(qubits)
+        second = (first + 1 + rng.randrange(max(1, qubits - 1))) % qubits
+        gate = rng.choice(_GATES if qubits > 1 else _GATES[:-1])
+        line = gate.format(first, second)
+        lines.append(line)
+        length += len(line) + 1
+    lines.extend(measurements)
+    return "\n".join(lines) + "\n"
+
+
+def load_fixtures(fixtures_dir: Union[str, Path]) -> Dict[str, str]:
+    """Load all ``*.qasm`` files of a directory keyed by their file name stem."""
+    return {
+        path.stem: path.read_text() for path in sorted(Path(fixtures_dir).glob("*.qasm"))
+    }
+
+
+def create_stub_app(
+    fixtures_dir: Optional[Union[str, Path]] = None,
+    latency: float = 0.0,
+    latency_jitter: float = 0.0,
+    error_rate: float = 0.0,
+    file_size: Union[int, Callable[[str], int], None] = None,
+    qubits: int = 2,
+    seed: Optional[int] = None,
+) -> Flask:
+    """Create the flask app of the QC Atlas stub.
+
+    Args:
+        fixtures_dir (str|Path, optional): directory with ``*.qasm`` fixtures. Defaults
+            to the fixtures shipped with this module.
+        latency (float, optional): added latency in seconds for every request.
+        latency_jitter (float, optional): maximum random latency in seconds added on
+            top of ``latency``.
+        error_rate (float, optional): probability (0..1) to answer with 503.
+        file_size (int|Callable, optional): if set, unknown ids are answered with
+            generated QASM files of this size in bytes (or of the size returned by
+            the callable for the id).
+        qubits (int, optional): register size of the generated QASM files.
+        seed (int, optional): seed for the random latency and errors.
+    """
+    files = load_fixtures(fixtures_dir or DEFAULT_FIXTURES)
+    last_modified = http_date(0)
+    rng = Random(seed)
+
+    app = Flask("qc-atlas-stub")
+
+    def get_file(concrete_solution_id: str) -> Optional[str]:
+        content = files.get(concrete_solution_id)
+        if content is None and file_size:
+            size = file_size(concrete_solution_id) if callable(file_size) else file_size
+            content = generate_qasm(size, qubits, seed=concrete_solution_id)
+            files[concrete_solution_id] = content
+        return content
+
+    @app.before_request
+    def simulate_network():
+        delay = latency + (rng.random() * latency_jitter if latency_jitter else 0)
+        if delay > 0:
+            sleep(delay)
+        if error_rate and rng.random() < error_rate:
+            return Response("Simulated error.", status=503)
+
+    @app.route("/atlas/patterns/<pattern_id>/concrete-solutions")
+    def list_concrete_solutions(pattern_id: str):
+        return jsonify(
+            {
+                "content": [{"id": cs_id} for cs_id in files],
+                "totalPages": 1,
+                "totalElements": len(files),
+            }
+        )
+
+    @app.route(
+        "/atlas/patterns/<pattern_id>/concrete-solutions/<concrete_solution_id>"
+        "/file/content"
+    )
+    def file_content(pattern_id: str, concrete_solution_id: str):
+        content = get_file(concrete_solution_id)
+        if content is None:
+            return Response("Not found.", status=404)
+        etag = f'"{sha256(content.encode()).hexdigest()}"'
+        headers = {"ETag": etag, "Last-Modified": last_modified}
+        if etag in request.headers.get("If-None-Match", ""):
+            return Response(status=304, headers=headers)
+        return Response(content, mimetype="text/plain", headers=headers)
+
+    return app
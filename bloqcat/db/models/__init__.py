@@ -5,3 +5,5 @@
 # or migration creation resulting in missing database tabes!
 
 from . import example  # noqa
+from . import atlas  # noqa
+from . import aggregation  # noqa
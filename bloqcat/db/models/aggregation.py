@@ -0,0 +1,29 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.sql import sqltypes as sql
+
+from ..db import MODEL
+
+
+class AggregationJob(MODEL):
+    """An asynchronous aggregation of a topology and (once finished) its result."""
+
+    __tablename__ = "AggregationJob"
+    id: Mapped[str] = mapped_column(sql.String(32), primary_key=True)
+    state: Mapped[str] = mapped_column(sql.String(16), index=True)
+    topology: Mapped[str] = mapped_column(sql.Text(), deferred=True)
+    created_at: Mapped[datetime] = mapped_column(sql.DateTime(timezone=True), index=True)
+    started_at: Mapped[Optional[datetime]] = mapped_column(
+        sql.DateTime(timezone=True), nullable=True
+    )
+    finished_at: Mapped[Optional[datetime]] = mapped_column(
+        sql.DateTime(timezone=True), nullable=True
+    )
+    status_code: Mapped[Optional[int]] = mapped_column(sql.Integer(), nullable=True)
+    message: Mapped[Optional[str]] = mapped_column(sql.Text(), nullable=True)
+    result_size: Mapped[Optional[int]] = mapped_column(sql.Integer(), nullable=True)
+    result: Mapped[Optional[bytes]] = mapped_column(
+        sql.LargeBinary(), nullable=True, deferred=True
+    )
@@ -0,0 +1,32 @@
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import ForeignKey
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+from sqlalchemy.sql import sqltypes as sql
+
+from ..db import MODEL
+
+
+class AtlasFileContent(MODEL):
+    """The content of a file fetched from the QC Atlas, addressed by its sha256 hash."""
+
+    __tablename__ = "AtlasFileContent"
+    content_hash: Mapped[str] = mapped_column(sql.String(64), primary_key=True)
+    content: Mapped[str] = mapped_column(sql.Text())
+    size: Mapped[int] = mapped_column(sql.Integer())
+
+
+class ConcreteSolutionFile(MODEL):
+    """The last fetched file of a concrete solution together with its http validators."""
+
+    __tablename__ = "ConcreteSolutionFile"
+    concrete_solution_id: Mapped[str] = mapped_column(sql.String(255), primary_key=True)
+    content_hash: Mapped[str] = mapped_column(
+        ForeignKey(AtlasFileContent.content_hash), index=True
+    )
+    etag: Mapped[Optional[str]] = mapped_column(sql.String(255), nullable=True)
+    last_modified: Mapped[Optional[str]] = mapped_column(sql.String(64), nullable=True)
+    fetched_at: Mapped[datetime] = mapped_column(sql.DateTime(timezone=True))
+
+    file_content: Mapped[AtlasFileContent] = relationship(lazy="joined")
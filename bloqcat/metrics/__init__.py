@@ -0,0 +1,226 @@
+"""Module containing the prometheus metrics of the service and the ``/metrics`` route.
+
+Request metrics are recorded with request hooks, the metrics of the aggregation
+stages and of the atlas requests are derived from the ended tracing spans.
+With multiple worker processes every process writes a snapshot to
+``METRICS_DIR`` (default ``metrics`` in the instance folder) and a scrape
+returns the merged snapshots of all processes. Remove the snapshots when the
+service is redeployed to reset the counters.
+"""
+
+from os import makedirs
+from pathlib import Path
+from time import perf_counter
+from typing import List, Optional
+
+from flask import Blueprint, Flask, Response, g, request
+
+from ..aggregation import AGGREGATION_STATES, RESULT_CACHE
+from ..atlas import FILE_CACHE
+from ..qasm import PROGRAM_CACHE
+from ..tracing import TRACER, Span
+from .registry import (
+    DEFAULT_LATENCY_BUCKETS,
+    DEFAULT_SIZE_BUCKETS,
+    Counter,
+    Gauge,
+    Histogram,
+    MetricsRegistry,
+    merge_snapshots,
+    render_text,
+)
+from .snapshots import SnapshotWriter, read_snapshots
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+METRICS = MetricsRegistry()
+
+REQUEST_DURATION = METRICS.histogram(
+    "bloqcat_http_request_duration_seconds",
+    "Duration of the http requests in seconds.",
+    ("endpoint", "method", "status"),
+)
+REQUESTS_IN_FLIGHT = METRICS.gauge(
+    "bloqcat_http_requests_in_flight",
+    "Number of http requests currently handled.",
+    ("endpoint",),
+)
+STAGE_DURATION = METRICS.histogram(
+    "bloqcat_aggregation_stage_duration_seconds",
+    "Duration of the stages of the aggregation pipeline in seconds.",
+    ("stage",),
+)
+ATLAS_REQUEST_DURATION = METRICS.histogram(
+    "bloqcat_atlas_request_duration_seconds",
+    "Duration of the requests to the pattern atlas in seconds.",
+    ("status",),
+)
+ATLAS_REQUESTS = METRICS.counter(
+    "bloqcat_atlas_requests_total",
+    "Number of requests to the pattern atlas by response status.",
+    ("status",),
+)
+OUTPUT_SIZE = METRICS.histogram(
+    "bloqcat_aggregation_output_bytes",
+    "Size of the aggregated files in bytes (after compression).",
+    ("cache",),
+    buckets=DEFAULT_SIZE_BUCKETS,
+)
+CACHE_HITS = METRICS.counter(
+    "bloqcat_cache_hits_total", "Number of cache hits.", ("cache",)
+)
+CACHE_MISSES = METRICS.counter(
+    "bloqcat_cache_misses_total", "Number of cache misses.", ("cache",)
+)
+CACHE_ENTRIES = METRICS.gauge(
+    "bloqcat_cache_entries", "Number of entries in the cache.", ("cache",)
+)
+CACHE_BYTES = METRICS.gauge(
+    "bloqcat_cache_bytes", "Size of the cached entries in bytes.", ("cache",)
+)
+
+CACHES = {
+    "result": RESULT_CACHE,
+    "incremental": AGGREGATION_STATES,
+    "atlas_file": FILE_CACHE,
+    "qasm_program": PROGRAM_CACHE,
+}
+
+# spans of the aggregation pipeline recorded as stage durations
+AGGREGATION_STAGES = frozenset(
+    (
+        "parse",
+        "validate_data",
+        "validate_path",
+        "create_solution_path",
+        "fetch_files",
+        "load_programs",
+        "aggregate",
+    )
+)
+
+SNAPSHOT_WRITER = SnapshotWriter(METRICS)
+
+METRICS_BLP = Blueprint("metrics", __name__)
+
+
+def _collect_cache_stats():
+    for name, cache in CACHES.items():
+        stats = cache.stats
+        CACHE_HITS.set_total(stats.hits, cache=name)
+        CACHE_MISSES.set_total(stats.misses, cache=name)
+        CACHE_ENTRIES.set(stats.entries, cache=name)
+        CACHE_BYTES.set(stats.bytes, cache=name)
+
+
+METRICS.add_collector(_collect_cache_stats)
+
+
+def record_span(span: Span):
+    """Derive the stage, atlas and output size metrics from an ended span."""
+    if span.name in AGGREGATION_STAGES:
+        STAGE_DURATION.observe(span.duration, stage=span.name)
+        if span.name == "aggregate" and span.status == "ok":
+            cache = "hit" if span.attributes.get("cache_hit") else "miss"
+            OUTPUT_SIZE.observe(span.attributes.get("bytes", 0), cache=cache)
+    elif span.name == "atlas.request":
+        status = span.attributes.get("status_code", "error")
+        ATLAS_REQUEST_DURATION.observe(span.duration, status=status)
+        ATLAS_REQUESTS.inc(status=status)
+
+
+def _request_endpoint() -> str:
+    rule = request.url_rule
+    return rule.rule if rule is not None else "unmatched"
+
+
+def _start_request_metrics():
+    SNAPSHOT_WRITER.ensure_started()
+    endpoint = _request_endpoint()
+    REQUESTS_IN_FLIGHT.inc(endpoint=endpoint)
+    g.request_metrics = [endpoint, perf_counter(), 500]
+
+
+def _record_response_status(response: Response) -> Response:
+    request_metrics = g.get("request_metrics")
+    if request_metrics is not None:
+        request_metrics[2] = response.status_code
+    return response
+
+
+def _end_request_metrics(error: Optional[BaseException] = None):
+    request_metrics = g.pop("request_metrics", None)
+    if request_metrics is not None:
+        endpoint, start, status = request_metrics
+        REQUESTS_IN_FLIGHT.dec(endpoint=endpoint)
+        REQUEST_DURATION.observe(
+            perf_counter() - start,
+            endpoint=endpoint,
+            method=request.method,
+            status=status,
+        )
+
+
+def _cache_hit_ratios(merged) -> List[str]:
+    hits = merged.get(CACHE_HITS.name, {}).get("samples", {})
+    misses = merged.get(CACHE_MISSES.name, {}).get("samples", {})
+    name = "bloqcat_cache_hit_ratio"
+    lines = [
+        f"# HELP {name} Ratio of cache hits to all cache lookups.",
+        f"# TYPE {name} gauge",
+    ]
+    for key in sorted(hits.keys() | misses.keys()):
+        lookups = hits.get(key, 0) + misses.get(key, 0)
+        ratio = hits.get(key, 0) / lookups if lookups else 0.0
+        lines.append(f'{name}{{cache="{key[0]}"}} {ratio!r}')
+    return lines
+
+
+@METRICS_BLP.route("/metrics")
+def show_metrics():
+    """Route exposing the metrics of all worker processes for prometheus."""
+    directory = SNAPSHOT_WRITER.directory
+    if directory is None:
+        merged = merge_snapshots([(METRICS.snapshot(), True)])
+    else:
+        SNAPSHOT_WRITER.write()
+        merged = merge_snapshots(read_snapshots(directory))
+    return Response(
+        render_text(merged, _cache_hit_ratios(merged)), content_type=CONTENT_TYPE
+    )
+
+
+def register_metrics(app: Flask):
+    """Record the request metrics and register the ``/metrics`` route."""
+    if not app.config.get("METRICS_ENABLED", True):
+        return
+    directory: Optional[Path] = Path(
+        app.config.get("METRICS_DIR") or Path(app.instance_path) / "metrics"
+    )
+    try:
+        makedirs(directory, exist_ok=True)
+    except OSError:
+        app.logger.warning(
+            f"Metrics directory '{directory}' is not writable, "
+            "only the metrics of the scraped process are exposed."
+        )
+        directory = None
+    SNAPSHOT_WRITER.configure(directory, app.config.get("METRICS_SNAPSHOT_INTERVAL", 5))
+    TRACER.add_listener(record_span)
+    app.before_request(_start_request_metrics)
+    app.after_request(_record_response_status)
+    app.teardown_request(_end_request_metrics)
+    app.register_blueprint(METRICS_BLP)
+
+
+__all__ = [
+    "DEFAULT_LATENCY_BUCKETS",
+    "DEFAULT_SIZE_BUCKETS",
+    "METRICS",
+    "Counter",
+    "Gauge",
+    "Histogram",
+    "MetricsRegistry",
+    "record_span",
+    "register_metrics",
+]
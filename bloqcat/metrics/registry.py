@@ -0,0 +1,238 @@
+"""Module containing counters, gauges and histograms and their text exposition.
+
+The state of a registry can be written as a json snapshot. Snapshots of multiple
+processes are merged by adding up their samples; gauges are only taken from
+processes that are still alive.
+"""
+
+from bisect import bisect_left
+from math import inf
+from threading import Lock
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+LabelValues = Tuple[str, ...]
+
+# in seconds
+DEFAULT_LATENCY_BUCKETS = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+    60.0,
+)
+
+# in bytes (1 KiB to 64 MiB)
+DEFAULT_SIZE_BUCKETS = tuple(float(1024 * 4**i) for i in range(9))
+
+
+class Metric:
+    """Base class of all metrics, samples are kept per combination of label values."""
+
+    type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self._lock = Lock()
+        self._samples: Dict[LabelValues, Any] = {}
+
+    def _key(self, labels: Dict[str, Any]) -> LabelValues:
+        if len(labels) != len(self.labels):
+            raise ValueError(f"Metric {self.name} requires the labels {self.labels}.")
+        return tuple(str(labels[label]) for label in self.labels)
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            samples = [
+                [list(key), self._dump(value)] for key, value in self._samples.items()
+            ]
+        return {
+            "type": self.type,
+            "help": self.documentation,
+            "labels": list(self.labels),
+            "samples": samples,
+        }
+
+    def _dump(self, value: Any) -> Any:
+        return value
+
+
+class Counter(Metric):
+    type = "counter"
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = self._samples.get(key, 0) + amount
+
+    def set_total(self, total: float, **labels: Any):
+        """Set the total of a counter backed by an external cumulative value."""
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = total
+
+
+class Gauge(Metric):
+    type = "gauge"
+
+    def set(self, value: float, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = value
+
+    def inc(self, amount: float = 1, **labels: Any):
+        key = self._key(labels)
+        with self._lock:
+            self._samples[key] = self._samples.get(key, 0) + amount
+
+    def dec(self, amount: float = 1, **labels: Any):
+        self.inc(-amount, **labels)
+
+
+class Histogram(Metric):
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labels)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value: float, **labels: Any):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._samples.get(key)
+            if state is None:
+                # counts per bucket (not cumulative) + overflow, sum
+                state = self._samples[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            state[0][index] += 1
+            state[1] += value
+
+    def snapshot(self) -> Dict[str, Any]:
+        snapshot = super().snapshot()
+        snapshot["buckets"] = list(self.buckets)
+        return snapshot
+
+    def _dump(self, value: Any) -> Any:
+        return [list(value[0]), value[1]]
+
+
+class MetricsRegistry:
+    """A collection of metrics and of collectors updating them before a snapshot."""
+
+    def __init__(self):
+        self.metrics: Dict[str, Metric] = {}
+        self._collectors: List[Callable[[], None]] = []
+
+    def register(self, metric: Metric) -> Metric:
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        return self.register(Counter(name, documentation, labels))
+
+    def gauge(self, name: str, documentation: str, labels: Sequence[str] = ()):
+        return self.register(Gauge(name, documentation, labels))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labels: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_LATENCY_BUCKETS,
+    ):
+        return self.register(Histogram(name, documentation, labels, buckets))
+
+    def add_collector(self, collector: Callable[[], None]):
+        self._collectors.append(collector)
+
+    def snapshot(self) -> Dict[str, Any]:
+        for collector in self._collectors:
+            collector()
+        return {name: metric.snapshot() for name, metric in self.metrics.items()}
+
+
+def merge_snapshots(snapshots: Iterable[Tuple[Dict[str, Any], bool]]) -> Dict[str, Any]:
+    """Merge the snapshots of multiple processes.
+
+    ``snapshots`` yields the snapshot and whether its process is still alive.
+    """
+    merged: Dict[str, Any] = {}
+    for snapshot, alive in snapshots:
+        for name, metric in snapshot.items():
+            if metric["type"] == "gauge" and not alive:
+                continue
+            target = merged.get(name)
+            if target is None:
+                target = merged[name] = {**metric, "samples": {}}
+            samples = target["samples"]
+            for key, value in metric["samples"]:
+                key = tuple(key)
+                if key not in samples:
+                    samples[key] = value
+                elif metric["type"] == "histogram":
+                    counts, total = samples[key]
+                    samples[key] = [
+                        [a + b for a, b in zip(counts, value[0])],
+                        total + value[1],
+                    ]
+                else:
+                    samples[key] = samples[key] + value
+    return merged
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == inf:
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+def render_text(merged: Dict[str, Any], extra_lines: Optional[List[str]] = None) -> str:
+    """Render merged snapshots in the prometheus text exposition format."""
+    lines: List[str] = []
+    for name, metric in sorted(merged.items()):
+        lines.append(f"# HELP {name} {metric['help']}")
+        lines.append(f"# TYPE {name} {metric['type']}")
+        label_names = metric["labels"]
+        for key, value in sorted(metric["samples"].items()):
+            if metric["type"] != "histogram":
+                labels = _format_labels(label_names, key)
+                lines.append(f"{name}{labels} {_format_value(value)}")
+                continue
+            counts, total = value
+            cumulative = 0
+            for bound, count in zip(list(metric["buckets"]) + [inf], counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                labels = _format_labels(label_names, key, le)
+                lines.append(f"{name}_bucket{labels} {cumulative}")
+            labels = _format_labels(label_names, key)
+            lines.append(f"{name}_sum{labels} {_format_value(total)}")
+            lines.append(f"{name}_count{labels} {cumulative}")
+    lines.extend(extra_lines or [])
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,198 @@
+"""Module writing and reading the metric snapshots of all worker processes.
+
+Every process writes its snapshot to ``<pid>-<token>.json`` in the metrics
+directory (periodically and before a scrape), the random token keeps a process
+from overwriting the snapshot of a dead process with the same pid. A scrape
+merges the snapshots of all processes, so the counters of restarted workers are
+kept. Before a new process writes its first snapshot, the counters of dead
+processes are folded into ``archive.json`` and their snapshots are removed.
+"""
+
+from json import dump, load
+from os import getpid, kill, replace
+from pathlib import Path
+from threading import Lock, Thread
+from time import sleep
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+from uuid import uuid4
+
+from .registry import MetricsRegistry, merge_snapshots
+
+try:
+    from fcntl import LOCK_EX, LOCK_UN, flock
+except ImportError:  # pragma: no cover
+    flock = None  # snapshots of dead processes are not compacted
+
+ARCHIVE = "archive.json"
+LOCK_FILE = "compaction.lock"
+
+
+def _write_json(path: Path, content: Dict[str, Any]):
+    temp_path = path.with_name(path.name + ".tmp")
+    with temp_path.open("w", encoding="utf-8") as json_file:
+        dump(content, json_file)
+    replace(temp_path, path)
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    try:
+        with path.open(encoding="utf-8") as json_file:
+            return load(json_file)
+    except (OSError, ValueError):
+        return None  # removed or unreadable file
+
+
+def write_snapshot(registry: MetricsRegistry, directory: Path, token: str):
+    """Atomically replace the snapshot file of the current process."""
+    pid = getpid()
+    _write_json(
+        directory / f"{pid}-{token}.json",
+        {"pid": pid, "token": token, "metrics": registry.snapshot()},
+    )
+
+
+def _is_alive(pid: int) -> bool:
+    if pid == getpid():
+        return True
+    try:
+        kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True  # the process exists but belongs to another user
+    return True
+
+
+def _is_dead(content: Dict[str, Any], token: str) -> bool:
+    pid = content.get("pid")
+    if pid == getpid():
+        # a snapshot with the pid of this process but another token is left
+        # over from a dead process that had the same pid
+        return content.get("token") != token
+    return not isinstance(pid, int) or not _is_alive(pid)
+
+
+def read_snapshots(directory: Path) -> Iterator[Tuple[Dict[str, Any], bool]]:
+    """Yield the snapshots of all processes (and the archive of dead processes)
+    and whether the process is alive."""
+    snapshots = []
+    for path in sorted(directory.glob("*.json")):
+        if path.name != ARCHIVE:
+            content = _read_json(path)
+            if content is not None:
+                snapshots.append((path.name, content))
+    # the archive is read last: if it was written after the snapshots were read,
+    # it lists the snapshots it contains (that may still have been read)
+    archive = _read_json(directory / ARCHIVE)
+    folded = set()
+    if archive is not None:
+        folded.update(archive.get("folded", ()))
+        yield archive["metrics"], False
+    for name, content in snapshots:
+        if name not in folded:
+            yield content["metrics"], _is_alive(content["pid"])
+
+
+def _as_snapshot(merged: Dict[str, Any]) -> Dict[str, Any]:
+    """Convert merged metrics back into the snapshot format (without gauges)."""
+    return {
+        name: {
+            **metric,
+            "samples": [[list(key), value] for key, value in metric["samples"].items()],
+        }
+        for name, metric in merged.items()
+        if metric["type"] != "gauge"
+    }
+
+
+def compact_snapshots(directory: Path, token: str):
+    """Fold the snapshots of dead processes into the archive and remove them.
+
+    The archive lists the snapshots it already contains, so that snapshots which
+    could not be removed after the archive was written are not counted twice.
+    """
+    if flock is None:
+        return
+    with (directory / LOCK_FILE).open("a") as lock_file:
+        flock(lock_file.fileno(), LOCK_EX)
+        try:
+            archive = _read_json(directory / ARCHIVE) or {"metrics": {}, "folded": []}
+            already_folded = set(archive.get("folded", ()))
+            dead: List[Path] = []
+            snapshots = [(archive["metrics"], False)]
+            for path in sorted(directory.glob("*.json")):
+                if path.name == ARCHIVE:
+                    continue
+                content = _read_json(path)
+                if content is None or not _is_dead(content, token):
+                    continue
+                dead.append(path)
+                if path.name not in already_folded:
+                    snapshots.append((content["metrics"], False))
+            if not dead:
+                return
+            if len(snapshots) > 1:
+                _write_json(
+                    directory / ARCHIVE,
+                    {
+                        "metrics": _as_snapshot(merge_snapshots(snapshots)),
+                        "folded": [path.name for path in dead],
+                    },
+                )
+            for path in dead:
+                path.unlink(missing_ok=True)
+        finally:
+            flock(lock_file.fileno(), LOCK_UN)
+
+
+class SnapshotWriter:
+    """Writes the snapshot of the current process in a background thread.
+
+    The thread is started lazily per process, so that workers forked from a
+    preloaded app start their own writer.
+    """
+
+    def __init__(self, registry: MetricsRegistry):
+        self.registry = registry
+        self.directory: Optional[Path] = None
+        self.interval: float = 5
+        self._lock = Lock()
+        self._pid: Optional[int] = None
+        self._token: Optional[str] = None
+        self._token_pid: Optional[int] = None
+
+    def configure(self, directory: Optional[Path], interval: float):
+        self.directory = directory
+        self.interval = interval
+
+    def ensure_started(self):
+        if self.directory is None or self._pid == getpid():
+            return
+        with self._lock:
+            if self._pid == getpid():
+                return
+            self._pid = getpid()
+            Thread(target=self._run, name="metrics-snapshots", daemon=True).start()
+
+    def write(self):
+        directory = self.directory
+        if directory is None:
+            return
+        with self._lock:
+            if self._token_pid != getpid():
+                # first snapshot of this process
+                self._token = uuid4().hex
+                self._token_pid = getpid()
+                try:
+                    compact_snapshots(directory, self._token)
+                except OSError:
+                    pass  # compacted by the next new process
+            write_snapshot(self.registry, directory, self._token)
+
+    def _run(self):
+        while True:
+            sleep(self.interval)
+            try:
+                self.write()
+            except OSError:
+                pass  # retried with the next interval
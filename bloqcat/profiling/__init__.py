@@ -0,0 +1,121 @@
+"""Module containing the opt-in profiling of single requests with cProfile.
+
+With ``PROFILING_ENABLED`` a request is profiled if it sends the
+``PROFILING_HEADER`` (default ``X-Bloqcat-Profile``) or is sampled with
+``PROFILING_SAMPLE_RATE``. The profile covers the request thread until the
+(streamed) response is closed and is written to ``PROFILING_DIR`` in the
+instance folder; the id of the profile is returned in the ``X-Profile-Id``
+header. Work done in the fetch threads shows up as waiting time only.
+The captured profiles are listed in the debug routes.
+"""
+
+from cProfile import Profile
+from datetime import datetime, timezone
+from os import makedirs
+from pathlib import Path
+from random import random
+from time import perf_counter
+from typing import Optional
+
+from flask import Flask, Response, current_app, g, request
+
+from ..util.logging import get_logger
+from .profiles import (
+    FunctionStats,
+    ProfileInfo,
+    is_profile_id,
+    list_profiles,
+    new_profile_id,
+    profile_path,
+    remove_old_profiles,
+    save_profile,
+    summarize_profile,
+)
+
+PROFILING_LOGGER = "profiling"
+PROFILE_ID_HEADER = "X-Profile-Id"
+
+
+def get_profile_dir(app: Flask) -> Path:
+    return Path(app.instance_path) / app.config.get("PROFILING_DIR", "profiles")
+
+
+def _should_profile(app: Flask) -> bool:
+    header = app.config.get("PROFILING_HEADER", "X-Bloqcat-Profile")
+    if header and request.headers.get(header, "").lower() in ("1", "true", "yes"):
+        return True
+    return random() < app.config.get("PROFILING_SAMPLE_RATE", 0.0)
+
+
+def _start_profile():
+    if not _should_profile(current_app):
+        return
+    profiler = Profile()
+    try:
+        profiler.enable()
+    except ValueError:
+        return  # another profiler is already active
+    g.request_profile = (new_profile_id(), profiler, perf_counter())
+
+
+def _finish_profile(app: Flask, request_profile, metadata):
+    profile_id, profiler, start = request_profile
+    profiler.disable()
+    metadata["duration"] = perf_counter() - start
+    directory = get_profile_dir(app)
+    try:
+        makedirs(directory, exist_ok=True)
+        save_profile(directory, profile_id, profiler, metadata)
+        remove_old_profiles(directory, app.config.get("PROFILING_MAX_PROFILES", 100))
+    except OSError:
+        get_logger(app, PROFILING_LOGGER).exception(
+            f"Could not write the profile {profile_id}."
+        )
+
+
+def _request_metadata(status_code: Optional[int]):
+    return {
+        "created": datetime.now(timezone.utc).isoformat(),
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "status_code": status_code,
+    }
+
+
+def _attach_profile(response: Response) -> Response:
+    request_profile = g.pop("request_profile", None)
+    if request_profile is not None:
+        # keep profiling until the streamed response body is consumed
+        app = current_app._get_current_object()  # type: ignore[attr-defined]
+        metadata = _request_metadata(response.status_code)
+        response.call_on_close(lambda: _finish_profile(app, request_profile, metadata))
+        response.headers[PROFILE_ID_HEADER] = request_profile[0]
+    return response
+
+
+def _end_failed_profile(error: Optional[BaseException] = None):
+    request_profile = g.pop("request_profile", None)
+    if request_profile is not None:
+        _finish_profile(current_app, request_profile, _request_metadata(None))
+
+
+def register_profiling(app: Flask):
+    """Profile the requests selected by header or sampling if profiling is enabled."""
+    if not app.config.get("PROFILING_ENABLED", False):
+        return
+    app.before_request(_start_profile)
+    app.after_request(_attach_profile)
+    app.teardown_request(_end_failed_profile)
+
+
+__all__ = [
+    "PROFILE_ID_HEADER",
+    "FunctionStats",
+    "ProfileInfo",
+    "get_profile_dir",
+    "is_profile_id",
+    "list_profiles",
+    "profile_path",
+    "register_profiling",
+    "summarize_profile",
+]
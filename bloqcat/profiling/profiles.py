@@ -0,0 +1,111 @@
+"""Module storing, listing and summarizing the captured request profiles."""
+
+from cProfile import Profile
+from datetime import datetime, timezone
+from json import dump, load
+from os import urandom
+from pathlib import Path
+from pstats import Stats
+from re import fullmatch
+from typing import Any, Dict, List, NamedTuple, Optional
+
+PROFILE_SUFFIX = ".prof"
+METADATA_SUFFIX = ".json"
+
+
+class ProfileInfo(NamedTuple):
+    id: str
+    created: str
+    method: str
+    path: str
+    status_code: Optional[int]
+    duration: float
+    size: int
+
+
+class FunctionStats(NamedTuple):
+    function: str
+    calls: int
+    primitive_calls: int
+    total_time: float
+    cumulative_time: float
+
+
+def new_profile_id() -> str:
+    """Create a profile id that sorts by creation time."""
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+    return f"{timestamp}-{urandom(3).hex()}"
+
+
+def is_profile_id(profile_id: str) -> bool:
+    return fullmatch(r"[0-9]{8}T[0-9]{12}-[0-9a-f]{6}", profile_id) is not None
+
+
+def profile_path(directory: Path, profile_id: str) -> Path:
+    return directory / f"{profile_id}{PROFILE_SUFFIX}"
+
+
+def save_profile(
+    directory: Path, profile_id: str, profiler: Profile, metadata: Dict[str, Any]
+):
+    """Write the profile (pstats format) and its metadata to the directory."""
+    profiler.dump_stats(profile_path(directory, profile_id))
+    with (directory / f"{profile_id}{METADATA_SUFFIX}").open(
+        "w", encoding="utf-8"
+    ) as metadata_file:
+        dump(metadata, metadata_file)
+
+
+def load_profile_info(directory: Path, profile_id: str) -> Optional[ProfileInfo]:
+    path = profile_path(directory, profile_id)
+    try:
+        with (directory / f"{profile_id}{METADATA_SUFFIX}").open(
+            encoding="utf-8"
+        ) as metadata_file:
+            metadata = load(metadata_file)
+        size = path.stat().st_size
+    except (OSError, ValueError):
+        return None
+    return ProfileInfo(
+        id=profile_id,
+        created=metadata.get("created", ""),
+        method=metadata.get("method", ""),
+        path=metadata.get("path", ""),
+        status_code=metadata.get("status_code"),
+        duration=metadata.get("duration", 0.0),
+        size=size,
+    )
+
+
+def list_profiles(directory: Path) -> List[ProfileInfo]:
+    """List the captured profiles, newest first."""
+    if not directory.is_dir():
+        return []
+    profiles = []
+    for path in sorted(directory.glob(f"*{PROFILE_SUFFIX}"), reverse=True):
+        info = load_profile_info(directory, path.stem)
+        if info is not None:
+            profiles.append(info)
+    return profiles
+
+
+def remove_old_profiles(directory: Path, keep: int):
+    """Remove all but the ``keep`` newest profiles."""
+    paths = sorted(directory.glob(f"*{PROFILE_SUFFIX}"), reverse=True)
+    for path in paths[keep:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(METADATA_SUFFIX).unlink(missing_ok=True)
+
+
+def summarize_profile(
+    directory: Path, profile_id: str, limit: int = 30
+) -> List[FunctionStats]:
+    """Return the functions of a profile with the highest cumulative time."""
+    stats = Stats(str(profile_path(directory, profile_id)))
+    functions = []
+    entries = stats.stats.items()  # type: ignore[attr-defined]
+    for (filename, line, name), (primitive, calls, total, cumulative, _) in entries:
+        location = f"{filename}:{line}({name})" if line else name
+        functions.append(FunctionStats(location, calls, primitive, total, cumulative))
+    functions.sort(key=lambda function: function.cumulative_time, reverse=True)
+    return functions[:limit]
@@ -0,0 +1,28 @@
+"""Module containing the QASM processing used for the aggregation of concrete solutions."""
+
+from flask import Flask
+
+from .ir import PROGRAM_CACHE, QasmProgram, load_program, parse_program
+from .scanner import QasmSectionError, QasmSections, scan_sections
+
+
+def register_qasm(app: Flask):
+    """Configure the cache of parsed QASM programs."""
+    config = app.config
+    PROGRAM_CACHE.configure(
+        max_entries=config.get("QASM_PROGRAM_CACHE_MAX_ENTRIES", 1024),
+        max_bytes=config.get("QASM_PROGRAM_CACHE_MAX_BYTES", 256 * 1024 * 1024),
+        ttl=float("inf"),
+    )
+
+
+__all__ = [
+    "PROGRAM_CACHE",
+    "QasmProgram",
+    "QasmSectionError",
+    "QasmSections",
+    "load_program",
+    "parse_program",
+    "register_qasm",
+    "scan_sections",
+]
@@ -0,0 +1,260 @@
+"""Module containing the parsed representation of a concrete solution QASM file.
+
+The program is created once per file content (see :py:func:`load_program`) and keeps
+the scanned sections. The records of the registers, gates and measurements are only
+parsed when they are accessed, the aggregation itself only needs the sections. The
+gates are stored column wise to keep the memory footprint small.
+"""
+
+import re
+from array import array
+from hashlib import sha256
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from ..util.cache import LRUCache
+from .scanner import QasmSections, scan_sections
+
+
+# matches comments or complete statements (gate definitions end with a block)
+_STATEMENT = re.compile(
+    r"//[^\n]*|([A-Za-z_]\w*)[^;{/]*(?:/(?!/)[^;{/]*)*(?:\{[^}]*\}|;)"
+)
+
+
+class QasmRegister(NamedTuple):
+    kind: str  # "qreg" or "creg"
+    name: str
+    size: int
+
+
+class QasmMeasurement(NamedTuple):
+    qubits: str  # e.g. "q[0]" or "q"
+    bits: str
+
+
+class QasmGate(NamedTuple):
+    name: str
+    params: Optional[str]
+    args: Tuple[str, ...]
+    start: int
+    end: int
+
+
+class GateTable:
+    """Column wise storage of the gate statements of the body.
+
+    Only the gate name (as index into a table of distinct names) and the offsets of
+    the statement in the file text are stored, parameters and arguments are parsed
+    when a gate is accessed.
+    """
+
+    __slots__ = ("text", "name_table", "name_ids", "offsets", "_name_index")
+
+    def __init__(self, text: str) -> None:
+        self.text = text
+        self.name_table: List[str] = []
+        self.name_ids = array("I")
+        self.offsets = array("q")
+        self._name_index: Dict[str, int] = {}
+
+    def scan(self, start: int, end: int):
+        """Append all statements of the text between start and end."""
+        name_table = self.name_table
+        name_index = self._name_index
+        name_ids = self.name_ids.append
+        offsets = self.offsets.append
+        for match in _STATEMENT.finditer(self.text, start, end):
+            name = match.group(1)
+            if name is None:
+                continue  # comment
+            name_id = name_index.get(name)
+            if name_id is None:
+                name_id = name_index[name] = len(name_table)
+                name_table.append(name)
+            name_ids(name_id)
+            statement_start, statement_end = match.span()
+            offsets(statement_start)
+            offsets(statement_end)
+
+    def name(self, index: int) -> str:
+        return self.name_table[self.name_ids[index]]
+
+    def __len__(self) -> int:
+        return len(self.name_ids)
+
+    def __getitem__(self, index: int) -> QasmGate:
+        start, end = self.offsets[2 * index], self.offsets[2 * index + 1]
+        name, params, args = _parse_gate(self.text[start:end])
+        return QasmGate(name, params, args, start, end)
+
+    def __iter__(self) -> Iterator[QasmGate]:
+        return (self[i] for i in range(len(self)))
+
+
+class _ProgramRecords(NamedTuple):
+    header_lines: Tuple[str, ...]
+    registers: Tuple[QasmRegister, ...]
+    gates: GateTable
+    measurements: Tuple[QasmMeasurement, ...]
+
+
+class QasmProgram:
+    """The parsed form of a concrete solution file.
+
+    Only the sections are scanned when the program is created, the records of the
+    registers, gates and measurements are parsed on first access.
+    """
+
+    __slots__ = ("content_hash", "sections", "_records")
+
+    def __init__(self, content_hash: str, sections: QasmSections) -> None:
+        self.content_hash = content_hash
+        self.sections = sections
+        self._records: Optional[_ProgramRecords] = None
+
+    @property
+    def is_parsed(self) -> bool:
+        """True if the records of the program were parsed."""
+        return self._records is not None
+
+    @property
+    def records(self) -> _ProgramRecords:
+        records = self._records
+        if records is None:
+            records = self._records = _parse_records(self.sections)
+            _update_cached_size(self)
+        return records
+
+    @property
+    def header_lines(self) -> Tuple[str, ...]:
+        return self.records.header_lines
+
+    @property
+    def registers(self) -> Tuple[QasmRegister, ...]:
+        return self.records.registers
+
+    @property
+    def gates(self) -> GateTable:
+        return self.records.gates
+
+    @property
+    def measurements(self) -> Tuple[QasmMeasurement, ...]:
+        return self.records.measurements
+
+    @property
+    def qubit_count(self) -> int:
+        """The total size of all quantum registers."""
+        return sum(r.size for r in self.registers if r.kind == "qreg")
+
+    @property
+    def size_estimate(self) -> int:
+        """A rough estimate of the memory used by the program in bytes.
+
+        The file text is included, as the sections and the gate table keep it alive
+        as long as the program is cached (even after it left the file cache).
+        """
+        size = 256 + len(self.sections.text) + 16 * len(self.sections.register_spans)
+        records = self._records
+        if records is not None:
+            gates = records.gates
+            size += (
+                96 * len(records.registers)
+                + 120 * len(records.measurements)
+                + gates.name_ids.itemsize * len(gates.name_ids)
+                + gates.offsets.itemsize * len(gates.offsets)
+                + 64 * len(gates.name_table)
+            )
+        return size
+
+
+def _iter_statements(text: str, start: int, end: int) -> Iterator[Tuple[str, int, int]]:
+    """Iterate over the names and offsets of the statements between start and end."""
+    for match in _STATEMENT.finditer(text, start, end):
+        name = match.group(1)
+        if name is not None:
+            yield name, match.start(), match.end()
+
+
+def _parse_register(line: str) -> Optional[QasmRegister]:
+    kind, _, declaration = line.partition(" ")
+    name, _, size = declaration.partition("[")
+    try:
+        return QasmRegister(kind, name.strip(), int(size.split("]", 1)[0]))
+    except ValueError:
+        return None
+
+
+def _parse_gate(statement: str) -> Tuple[str, Optional[str], Tuple[str, ...]]:
+    statement = statement.rstrip(";").strip()
+    params: Optional[str] = None
+    paren = statement.find("(")
+    space = statement.find(" ")
+    if paren >= 0 and (space < 0 or paren < space):
+        close = statement.find(")", paren)
+        name = statement[:paren].strip()
+        params = statement[paren + 1 : close]
+        rest = statement[close + 1 :]
+    else:
+        name, _, rest = statement.partition(" ")
+    args = tuple(a.strip() for a in rest.split(",") if a.strip())
+    return name, params, args
+
+
+def _parse_records(sections: QasmSections) -> _ProgramRecords:
+    text = sections.text
+    header = sections.header
+    header_lines = tuple(header.split("\n")) if header else ()
+
+    registers = tuple(
+        r for r in (_parse_register(line) for line in sections.registers) if r
+    )
+
+    gates = GateTable(text)
+    if sections.body_span is not None:
+        gates.scan(*sections.body_span)
+
+    measurements: List[QasmMeasurement] = []
+    if sections.measure_start is not None:
+        for name, start, end in _iter_statements(text, sections.measure_start, len(text)):
+            if name == "measure":
+                statement = text[start + len(name) : end].rstrip(";")
+                qubits, _, bits = statement.partition("->")
+                measurements.append(QasmMeasurement(qubits.strip(), bits.strip()))
+
+    return _ProgramRecords(header_lines, registers, gates, tuple(measurements))
+
+
+def parse_program(text: str, content_hash: Optional[str] = None) -> QasmProgram:
+    """Parse a QASM file into a :py:class:`QasmProgram` (without caching).
+
+    Unlike :py:func:`load_program` all records are parsed immediately.
+    """
+    if content_hash is None:
+        content_hash = sha256(text.encode()).hexdigest()
+    program = QasmProgram(content_hash, scan_sections(text))
+    program.records  # parse all records now
+    return program
+
+
+# parsed programs never expire, as they are addressed by the hash of the file content
+PROGRAM_CACHE: LRUCache[QasmProgram] = LRUCache(max_entries=1024, ttl=float("inf"))
+
+
+def _update_cached_size(program: QasmProgram):
+    # account for the records parsed after the program was cached
+    if PROGRAM_CACHE.peek(program.content_hash) is program:
+        PROGRAM_CACHE.set(program.content_hash, program, program.size_estimate)
+
+
+def load_program(text: str, content_hash: Optional[str] = None) -> QasmProgram:
+    """Get the program for a file, scanning its sections only once per content hash.
+
+    The records of the program are parsed when they are accessed first.
+    """
+    if content_hash is None:
+        content_hash = sha256(text.encode()).hexdigest()
+    program = PROGRAM_CACHE.get(content_hash)
+    if program is None:
+        program = QasmProgram(content_hash, scan_sections(text))
+        PROGRAM_CACHE.set(content_hash, program, program.size_estimate)
+    return program
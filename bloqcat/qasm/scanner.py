@@ -0,0 +1,170 @@
+"""Module containing the single pass scanner splitting a QASM file into its sections.
+
+The sections of a concrete solution file are:
+
+header
+    everything before the first line starting with ``qreg`` or ``creg``
+registers
+    the ``qreg``/``creg`` declarations
+body
+    the lines after the first line containing ``creg`` up to (excluding) the first line
+    containing ``measure``
+measurements
+    everything starting with the first line containing ``measure``
+"""
+
+from typing import List, Optional, Tuple
+
+Span = Tuple[int, int]
+
+
+class QasmSectionError(ValueError):
+    """Raised when a required section is missing in a QASM file."""
+
+    def __init__(self, section: str) -> None:
+        super().__init__(f"Unable to find the {section} section.")
+        self.section = section
+
+
+class QasmSections:
+    """The sections of a QASM file as offsets into the original text.
+
+    A section that is missing in the file is ``None``, an empty section is an empty
+    span. The section text is only sliced from the file when it is accessed.
+    """
+
+    __slots__ = ("text", "header_span", "register_spans", "body_span", "measure_start")
+
+    def __init__(
+        self,
+        text: str,
+        header_span: Optional[Span],
+        register_spans: List[Span],
+        body_span: Optional[Span],
+        measure_start: Optional[int],
+    ) -> None:
+        self.text = text
+        self.header_span = header_span
+        self.register_spans = register_spans
+        self.body_span = body_span
+        self.measure_start = measure_start
+
+    @property
+    def header(self) -> Optional[str]:
+        """The header (without the newline before the first register declaration)."""
+        if self.header_span is None:
+            return None
+        return self.text[self.header_span[0] : self.header_span[1]]
+
+    @property
+    def registers(self) -> List[str]:
+        """The register declaration lines."""
+        return [self.text[start:end] for start, end in self.register_spans]
+
+    @property
+    def body(self) -> Optional[str]:
+        """The body between the creg line and the first measure line."""
+        if self.body_span is None:
+            return None
+        return self.text[self.body_span[0] : self.body_span[1]]
+
+    @property
+    def measurements(self) -> Optional[str]:
+        """Everything from the first measure line to the end of the file."""
+        if self.measure_start is None:
+            return None
+        return self.text[self.measure_start :]
+
+    def check(self, require_header: bool = False):
+        """Raise a :py:class:`QasmSectionError` if a required section is missing."""
+        if self.body_span is None:
+            raise QasmSectionError("concrete solution")
+        if require_header and self.header_span is None:
+            raise QasmSectionError("header")
+
+    def require_header(self) -> str:
+        header = self.header
+        if header is None:
+            raise QasmSectionError("header")
+        return header
+
+    def require_body(self) -> str:
+        body = self.body
+        if body is None:
+            raise QasmSectionError("concrete solution")
+        return body
+
+
+def _line_start(text: str, offset: int) -> int:
+    return text.rfind("\n", 0, offset) + 1
+
+
+def _line_end(text: str, offset: int) -> int:
+    end = text.find("\n", offset)
+    return len(text) if end < 0 else end
+
+
+def _find_line(text: str, prefix: str, start: int, end: int) -> int:
+    """Find the first line starting with prefix that starts in [start, end)."""
+    if start == 0 and text.startswith(prefix):
+        return 0
+    index = text.find("\n" + prefix, max(0, start - 1), end + len(prefix))
+    return -1 if index < 0 or index + 1 >= end else index + 1
+
+
+def _find_register_lines(text: str, end: int) -> List[Span]:
+    spans: List[Span] = []
+    for prefix in ("qreg ", "creg "):
+        start = _find_line(text, prefix, 0, end)
+        while start >= 0:
+            line_end = _line_end(text, start)
+            spans.append((start, line_end))
+            start = _find_line(text, prefix, line_end + 1, end)
+    spans.sort()
+    return spans
+
+
+def scan_sections(text: str) -> QasmSections:
+    """Find the sections of a QASM file.
+
+    Only the part of the file up to the first line containing ``measure`` is scanned
+    (a constant number of times with :py:meth:`str.find`), the rest of the file is not
+    touched. No part of the file is copied.
+    """
+    measure = text.find("measure")
+    measure_start = None if measure < 0 else _line_start(text, measure)
+    # the creg line may also be the measure line
+    scan_end = len(text) if measure < 0 else _line_end(text, measure)
+
+    body_span: Optional[Span] = None
+    creg = text.find("creg", 0, scan_end)
+    if creg >= 0 and measure_start is not None:
+        body_start = _line_end(text, creg) + 1
+        if body_start > measure_start:
+            # creg and measure on the same line
+            body_span = (measure_start, measure_start)
+        else:
+            body_span = (body_start, max(body_start, measure_start - 1))
+
+    register_spans = _find_register_lines(text, scan_end)
+    header_span: Optional[Span] = None
+    if register_spans:
+        first_register = register_spans[0][0]
+    else:
+        # the register declarations may follow the first measure line
+        first_register = min(
+            (
+                i
+                for i in (
+                    _find_line(text, "qreg ", scan_end, len(text)),
+                    _find_line(text, "creg ", scan_end, len(text)),
+                )
+                if i >= 0
+            ),
+            default=-1,
+        )
+    if first_register >= 0:
+        # the header does not include the newline before the register line
+        header_span = (0, max(0, first_register - 1))
+
+    return QasmSections(text, header_span, register_spans, body_span, measure_start)
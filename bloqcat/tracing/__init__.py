@@ -0,0 +1,100 @@
+"""Module containing the tracing of the aggregation pipeline.
+
+The exporter is configured with ``TRACING_EXPORTER``: ``"log"`` (default, logs
+every span at debug level), ``"jsonl"`` (appends to ``TRACING_FILE`` in the
+instance folder, the file is not rotated), ``"none"`` or the import path
+``"package.module:factory"`` of a callable taking the app and returning a
+:class:`SpanExporter`.
+"""
+
+from importlib import import_module
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from flask import Flask, Response, g, request
+
+from ..util.logging import get_logger
+from .exporters import JsonLinesExporter, LoggingExporter
+from .spans import (
+    TRACER,
+    Span,
+    SpanExporter,
+    Tracer,
+    activate_span,
+    current_span,
+    deactivate_span,
+)
+
+TRACING_LOGGER = "tracing"
+
+
+def _jsonl_exporter(app: Flask) -> SpanExporter:
+    path = Path(app.instance_path) / app.config.get("TRACING_FILE", "traces.jsonl")
+    return JsonLinesExporter(path)
+
+
+def _logging_exporter(app: Flask) -> SpanExporter:
+    return LoggingExporter(get_logger(app, TRACING_LOGGER))
+
+
+EXPORTERS: Dict[str, Callable[[Flask], Optional[SpanExporter]]] = {
+    "jsonl": _jsonl_exporter,
+    "log": _logging_exporter,
+    "none": lambda app: None,
+}
+
+
+def create_exporter(app: Flask) -> Optional[SpanExporter]:
+    """Create the span exporter configured for the app."""
+    name = app.config.get("TRACING_EXPORTER", "log") or "none"
+    factory = EXPORTERS.get(name)
+    if factory is None:
+        module_name, _, attribute = name.partition(":")
+        factory = getattr(import_module(module_name), attribute)
+    return factory(app)
+
+
+def _start_request_span():
+    if TRACER.enabled:
+        span = TRACER.start_span("http.request", method=request.method, path=request.path)
+        g.request_span = (span, activate_span(span))
+
+
+def _record_response_status(response: Response) -> Response:
+    request_span = g.get("request_span")
+    if request_span is not None:
+        request_span[0].set_attribute("status_code", response.status_code)
+    return response
+
+
+def _end_request_span(error: Optional[BaseException] = None):
+    request_span = g.pop("request_span", None)
+    if request_span is not None:
+        span, token = request_span
+        deactivate_span(token)
+        if error is not None:
+            span.record_error(error)
+        TRACER.end_span(span)
+
+
+def register_tracing(app: Flask):
+    """Configure the span exporter and trace every request."""
+    TRACER.set_exporter(create_exporter(app))
+    app.before_request(_start_request_span)
+    app.after_request(_record_response_status)
+    app.teardown_request(_end_request_span)
+
+
+__all__ = [
+    "EXPORTERS",
+    "TRACER",
+    "JsonLinesExporter",
+    "LoggingExporter",
+    "Span",
+    "SpanExporter",
+    "Tracer",
+    "activate_span",
+    "current_span",
+    "deactivate_span",
+    "register_tracing",
+]
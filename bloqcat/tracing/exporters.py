@@ -0,0 +1,50 @@
+"""Module containing the available span exporters."""
+
+from json import dumps
+from logging import Logger
+from pathlib import Path
+from threading import Lock
+from typing import Optional, TextIO, Union
+
+from .spans import Span, SpanExporter
+
+
+class JsonLinesExporter(SpanExporter):
+    """Append every span as a single json line to a file."""
+
+    def __init__(self, path: Union[str, Path]):
+        self.path = Path(path)
+        self._file: Optional[TextIO] = None
+        self._lock = Lock()
+
+    def export(self, span: Span):
+        line = dumps(span.to_dict(), default=str, separators=(",", ":")) + "\n"
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = self.path.open("a", encoding="utf-8")
+            # a single write per line keeps lines of multiple processes intact
+            self._file.write(line)
+            self._file.flush()
+
+    def shutdown(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+class LoggingExporter(SpanExporter):
+    """Log every span at debug level."""
+
+    def __init__(self, logger: Logger):
+        self.logger = logger
+
+    def export(self, span: Span):
+        self.logger.debug(
+            "span %s took %.3f ms (%s) %s",
+            span.name,
+            (span.duration or 0) * 1000,
+            span.status,
+            span.attributes,
+        )
@@ -0,0 +1,175 @@
+"""Module containing timed spans and the tracer creating them."""
+
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from os import urandom
+from time import perf_counter, time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, TypeVar
+
+T = TypeVar("T")
+
+
+def _new_id(size: int) -> str:
+    return urandom(size).hex()
+
+
+class Span:
+    """A timed operation with attributes, part of a trace."""
+
+    __slots__ = (
+        "name",
+        "trace_id",
+        "span_id",
+        "parent_id",
+        "start_time",
+        "duration",
+        "attributes",
+        "status",
+        "_start",
+    )
+
+    def __init__(self, name: str, parent: Optional["Span"] = None, **attributes: Any):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else _new_id(16)
+        self.span_id = _new_id(8)
+        self.parent_id = parent.span_id if parent is not None else None
+        self.start_time = time()
+        self.duration: Optional[float] = None
+        self.attributes: Dict[str, Any] = attributes
+        self.status = "ok"
+        self._start = perf_counter()
+
+    def set_attribute(self, key: str, value: Any):
+        self.attributes[key] = value
+
+    def record_error(self, error: BaseException):
+        self.status = "error"
+        self.attributes["error"] = type(error).__name__
+
+    def end(self):
+        if self.duration is None:
+            self.duration = perf_counter() - self._start
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start_time": self.start_time,
+            "duration": self.duration,
+            "status": self.status,
+            "attributes": self.attributes,
+        }
+
+
+class SpanExporter:
+    """Base class of all span exporters."""
+
+    def export(self, span: Span):
+        raise NotImplementedError()
+
+    def shutdown(self):
+        pass
+
+
+_CURRENT_SPAN: ContextVar[Optional[Span]] = ContextVar(
+    "bloqcat_current_span", default=None
+)
+
+
+def current_span() -> Optional[Span]:
+    """Return the innermost active span of the current context."""
+    return _CURRENT_SPAN.get()
+
+
+def activate_span(span: Optional[Span]) -> Token:
+    """Make a span the current span until :func:`deactivate_span` is called."""
+    return _CURRENT_SPAN.set(span)
+
+
+def deactivate_span(token: Token):
+    try:
+        _CURRENT_SPAN.reset(token)
+    except ValueError:
+        # the token was created in a different context, only forget the span
+        _CURRENT_SPAN.set(None)
+
+
+class Tracer:
+    """Creates spans and passes finished spans to the configured exporter.
+
+    Spans opened with :meth:`span` become the parent of all spans opened inside
+    of them (also in threads started with a copy of the current context).
+    Without an exporter spans are still created but never exported.
+    """
+
+    def __init__(self, exporter: Optional[SpanExporter] = None):
+        self.exporter = exporter
+        self._listeners: List[Callable[[Span], None]] = []
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    def set_exporter(self, exporter: Optional[SpanExporter]):
+        previous, self.exporter = self.exporter, exporter
+        if previous is not None and previous is not exporter:
+            previous.shutdown()
+
+    def add_listener(self, listener: Callable[[Span], None]):
+        """Call ``listener`` with every ended span (also without an exporter)."""
+        if listener not in self._listeners:
+            self._listeners.append(listener)
+
+    def start_span(self, name: str, **attributes: Any) -> Span:
+        """Start a span that does not become the current span."""
+        return Span(name, _CURRENT_SPAN.get(), **attributes)
+
+    def end_span(self, span: Span):
+        span.end()
+        for listener in self._listeners:
+            listener(span)
+        exporter = self.exporter
+        if exporter is not None:
+            exporter.export(span)
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Open a span as the current span for the duration of the with block."""
+        span = self.start_span(name, **attributes)
+        token = _CURRENT_SPAN.set(span)
+        try:
+            yield span
+        except BaseException as err:
+            span.record_error(err)
+            raise
+        finally:
+            _CURRENT_SPAN.reset(token)
+            self.end_span(span)
+
+    def traced_chunks(
+        self, name: str, chunks: Iterable[T], size: Callable[[T], int] = len, **attributes
+    ) -> Iterator[T]:
+        """Wrap a (streamed) iterable in a span that ends with the iteration.
+
+        The number of chunks and their total size are recorded as attributes.
+        """
+        span = self.start_span(name, **attributes)
+        count = 0
+        total = 0
+        try:
+            for chunk in chunks:
+                count += 1
+                total += size(chunk)
+                yield chunk
+        except BaseException as err:
+            span.record_error(err)
+            raise
+        finally:
+            span.set_attribute("chunks", count)
+            span.set_attribute("bytes", total)
+            self.end_span(span)
+
+
+TRACER = Tracer()
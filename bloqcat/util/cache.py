@@ -0,0 +1,156 @@
+"""Module containing a thread safe in-process LRU cache."""
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from threading import Lock
+from time import monotonic
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+V = TypeVar("V")
+
+
+class CacheEntry(Generic[V]):
+    """A single cache entry with its size in bytes and its expiry time."""
+
+    __slots__ = ("value", "size", "expires_at")
+
+    def __init__(self, value: V, size: int, expires_at: float) -> None:
+        self.value = value
+        self.size = size
+        self.expires_at = expires_at
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expirations: int = 0
+    entries: int = 0
+    bytes: int = 0
+
+
+class LRUCache(Generic[V]):
+    """Thread safe LRU cache with a per entry ttl, an entry limit and a byte budget.
+
+    Entries larger than ``max_entry_bytes`` (default: the whole byte budget) are not
+    cached.
+
+    Expired entries are not returned by :py:meth:`get` but stay in the cache until
+    they are evicted or overwritten (:py:meth:`peek` still returns them).
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 1024,
+        max_bytes: int = 64 * 1024 * 1024,
+        ttl: float = 300.0,
+        clock: Callable[[], float] = monotonic,
+        max_entry_bytes: Optional[int] = None,
+    ) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = Lock()
+        self._entries: "OrderedDict[Hashable, CacheEntry[V]]" = OrderedDict()
+        self._bytes = 0
+        self._stats = CacheStats()
+
+    def configure(
+        self,
+        max_entries: int,
+        max_bytes: int,
+        ttl: float,
+        max_entry_bytes: Optional[int] = None,
+    ):
+        """Change the cache limits, evicting entries if the new limits require it."""
+        with self._lock:
+            self.max_entries = max_entries
+            self.max_bytes = max_bytes
+            self.max_entry_bytes = max_entry_bytes
+            self.ttl = ttl
+            self._evict()
+
+    @property
+    def entry_size_limit(self) -> int:
+        """The size in bytes of the largest value that is cached."""
+        if self.max_entry_bytes is None:
+            return self.max_bytes
+        return min(self.max_entry_bytes, self.max_bytes)
+
+    def get(self, key: Hashable) -> Optional[V]:
+        """Get the value for key if it is cached and not expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats.misses += 1
+                return None
+            if entry.expires_at <= self._clock():
+                self._stats.misses += 1
+                self._stats.expirations += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats.hits += 1
+            return entry.value
+
+    def peek(self, key: Hashable) -> Optional[V]:
+        """Get the value for key even if it is expired without updating the counters.
+
+        Use this to get the validators for a conditional request of an expired entry.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            return entry.value if entry is not None else None
+
+    def set(self, key: Hashable, value: V, size: int, ttl: Optional[float] = None):
+        """Cache value under key.
+
+        Values larger than :py:attr:`entry_size_limit` are not cached.
+        """
+        with self._lock:
+            self._remove(key)
+            if size > self.entry_size_limit or self.max_entries <= 0:
+                return
+            expires_at = self._clock() + (self.ttl if ttl is None else ttl)
+            self._entries[key] = CacheEntry(value, size, expires_at)
+            self._bytes += size
+            self._evict()
+
+    def invalidate(self, key: Hashable):
+        """Remove key from the cache."""
+        with self._lock:
+            self._remove(key)
+
+    def clear(self):
+        """Remove all entries from the cache."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    @property
+    def stats(self) -> CacheStats:
+        """A snapshot of the cache counters."""
+        with self._lock:
+            return CacheStats(
+                hits=self._stats.hits,
+                misses=self._stats.misses,
+                evictions=self._stats.evictions,
+                expirations=self._stats.expirations,
+                entries=len(self._entries),
+                bytes=self._bytes,
+            )
+
+    def _remove(self, key: Hashable):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry.size
+
+    def _evict(self):
+        while self._entries and (
+            len(self._entries) > self.max_entries or self._bytes > self.max_bytes
+        ):
+            _, entry = self._entries.popitem(last=False)
+            self._bytes -= entry.size
+            self._stats.evictions += 1
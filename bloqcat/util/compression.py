@@ -0,0 +1,66 @@
+"""Module containing the compression of http response bodies.
+
+``gzip`` is always available, ``br`` only if ``brotli`` (or ``brotlicffi``) is
+installed.
+"""
+
+import zlib
+from typing import Dict, Optional, Tuple
+
+from werkzeug.datastructures import Accept
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    try:
+        import brotlicffi as brotli
+    except ImportError:
+        brotli = None
+
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# preferred encodings first
+SUPPORTED_ENCODINGS: Tuple[str, ...] = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encodings: Accept) -> Optional[str]:
+    """Return the best supported content encoding accepted by the client."""
+    return accept_encodings.best_match(SUPPORTED_ENCODINGS)
+
+
+class StreamCompressor:
+    """Incremental compressor for a single response body."""
+
+    def __init__(self, encoding: str):
+        if encoding == "gzip":
+            self._compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)
+            self._process = self._compressor.compress
+            self._finish = self._compressor.flush
+        elif encoding == "br" and brotli is not None:
+            self._compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+            self._process = self._compressor.process
+            self._finish = self._compressor.finish
+        else:
+            raise ValueError(f"Unsupported content encoding {encoding}.")
+        self.encoding = encoding
+
+    def compress(self, data: bytes) -> bytes:
+        return self._process(data)
+
+    def finish(self) -> bytes:
+        return self._finish()
+
+
+def compress(data: bytes, encoding: str) -> bytes:
+    """Compress a complete body with the given content encoding."""
+    compressor = StreamCompressor(encoding)
+    return compressor.compress(data) + compressor.finish()
+
+
+def encoding_headers(encoding: Optional[str]) -> Dict[str, str]:
+    """Return the response headers for a (possibly not) compressed body."""
+    headers = {"Vary": "Accept-Encoding"}
+    if encoding is not None:
+        headers["Content-Encoding"] = encoding
+    return headers
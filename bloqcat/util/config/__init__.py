@@ -5,9 +5,22 @@ from logging import WARNING, INFO
 
 from .sqlalchemy_config import SQLAchemyProductionConfig, SQLAchemyDebugConfig
 from .smorest_config import SmorestProductionConfig, SmorestDebugConfig
-
-
-class ProductionConfig(SQLAchemyProductionConfig, SmorestProductionConfig):
+from .atlas_config import AtlasProductionConfig, AtlasDebugConfig
+from .aggregation_config import AggregationProductionConfig, AggregationDebugConfig
+from .tracing_config import TracingProductionConfig, TracingDebugConfig
+from .metrics_config import MetricsProductionConfig, MetricsDebugConfig
+from .profiling_config import ProfilingProductionConfig, ProfilingDebugConfig
+
+
+class ProductionConfig(
+    SQLAchemyProductionConfig,
+    SmorestProductionConfig,
+    AtlasProductionConfig,
+    AggregationProductionConfig,
+    TracingProductionConfig,
+    MetricsProductionConfig,
+    ProfilingProductionConfig,
+):
     ENV = "production"
     SECRET_KEY = urandom(32)
 
@@ -27,7 +40,16 @@ class ProductionConfig(SQLAchemyProductionConfig, SmorestProductionConfig):
     DEFAULT_LOG_DATE_FORMAT = None
 
 
-class DebugConfig(ProductionConfig, SQLAchemyDebugConfig, SmorestDebugConfig):
+class DebugConfig(
+    ProductionConfig,
+    SQLAchemyDebugConfig,
+    SmorestDebugConfig,
+    AtlasDebugConfig,
+    AggregationDebugConfig,
+    TracingDebugConfig,
+    MetricsDebugConfig,
+    ProfilingDebugConfig,
+):
     ENV = "development"
     DEBUG = True
     SECRET_KEY = "debug_secret"  # FIXME make sure this NEVER! gets used in production!!!
@@ -0,0 +1,37 @@
+class AggregationProductionConfig:
+    # cache for parsed concrete solution files (addressed by the content hash)
+    QASM_PROGRAM_CACHE_MAX_ENTRIES = 1024
+    QASM_PROGRAM_CACHE_MAX_BYTES = 256 * 1024 * 1024
+
+    # cache for aggregated files keyed by the topology fingerprint (ttl in seconds),
+    # larger files (including their compressed variants) are streamed without caching
+    AGGREGATION_RESULT_CACHE_MAX_ENTRIES = 256
+    AGGREGATION_RESULT_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    AGGREGATION_RESULT_CACHE_MAX_ENTRY_BYTES = 4 * 1024 * 1024
+    AGGREGATION_RESULT_CACHE_TTL = 60 * 60
+
+    # last aggregation per service template for incremental re-aggregations
+    # (ttl in seconds, the files of all concrete solutions are still revalidated)
+    AGGREGATION_INCREMENTAL_MAX_ENTRIES = 256
+    AGGREGATION_INCREMENTAL_MAX_BYTES = 64 * 1024 * 1024
+    AGGREGATION_INCREMENTAL_TTL = 10 * 60
+
+    # gzip/brotli compression of aggregated files (only above the minimum size)
+    AGGREGATION_COMPRESSION_ENABLED = True
+    AGGREGATION_COMPRESSION_MIN_BYTES = 1024
+
+    # maximum size of a topology request body in bytes
+    AGGREGATION_MAX_BODY_BYTES = 32 * 1024 * 1024
+
+    # maximum number of topologies in a single batch aggregation request
+    AGGREGATION_BATCH_MAX_TOPOLOGIES = 100
+
+    # asynchronous aggregation jobs (deadline and retention in seconds, jobs that did
+    # not finish within twice the deadline are marked as failed)
+    AGGREGATION_JOB_WORKERS = 2
+    AGGREGATION_JOB_DEADLINE = 10 * 60
+    AGGREGATION_JOB_RETENTION = 24 * 60 * 60
+
+
+class AggregationDebugConfig(AggregationProductionConfig):
+    pass
@@ -0,0 +1,44 @@
+class AtlasProductionConfig:
+    # base url of the QC Atlas api (without trailing slash)
+    ATLAS_BASE_URL = "http://qc-atlas-api:6626"
+
+    # maximum number of concrete solution files fetched in parallel for all requests
+    # of a process, batch requests and aggregation jobs use a separate pool
+    ATLAS_FETCH_CONCURRENCY = 8
+    ATLAS_BACKGROUND_FETCH_CONCURRENCY = 4
+
+    # number of keep-alive connections kept open to the QC Atlas
+    ATLAS_POOL_SIZE = 16
+
+    # timeouts in seconds
+    ATLAS_CONNECT_TIMEOUT = 3.05
+    ATLAS_READ_TIMEOUT = 30
+
+    # retries for connection errors and 502, 503, 504 responses (no retry is sent
+    # after the deadline of the request)
+    ATLAS_RETRIES = 3
+    ATLAS_RETRY_BACKOFF = 0.3
+
+    # circuit breaker: open after this many consecutive failures, try again after
+    # the reset timeout (in seconds) with a limited number of trial requests
+    ATLAS_BREAKER_FAILURE_THRESHOLD = 5
+    ATLAS_BREAKER_RESET_TIMEOUT = 30
+    ATLAS_BREAKER_HALF_OPEN_MAX_CALLS = 1
+
+    # overall time budget (in seconds) for fetching all files of one request
+    # set to None to disable the deadline
+    ATLAS_REQUEST_DEADLINE = 60
+
+    # in-process cache for concrete solution files (ttl in seconds)
+    ATLAS_CACHE_MAX_ENTRIES = 1024
+    ATLAS_CACHE_MAX_BYTES = 64 * 1024 * 1024
+    ATLAS_CACHE_TTL = 300
+
+    # persistent store for concrete solution files in the database
+    ATLAS_STORE_ENABLED = True
+    # stored files older than this (in seconds) are revalidated with the QC Atlas
+    ATLAS_STORE_MAX_AGE = 24 * 60 * 60
+
+
+class AtlasDebugConfig(AtlasProductionConfig):
+    pass
@@ -0,0 +1,11 @@
+class MetricsProductionConfig:
+    # prometheus metrics at /metrics, the snapshots of all worker processes are
+    # written to METRICS_DIR (default "metrics" in the instance folder) every
+    # METRICS_SNAPSHOT_INTERVAL seconds
+    METRICS_ENABLED = True
+    METRICS_DIR = ""
+    METRICS_SNAPSHOT_INTERVAL = 5
+
+
+class MetricsDebugConfig(MetricsProductionConfig):
+    pass
@@ -0,0 +1,13 @@
+class ProfilingProductionConfig:
+    # opt-in cProfile profiles of requests sending PROFILING_HEADER (value "1") or
+    # sampled with PROFILING_SAMPLE_RATE, written to PROFILING_DIR in the instance
+    # folder (only the newest PROFILING_MAX_PROFILES are kept)
+    PROFILING_ENABLED = False
+    PROFILING_HEADER = "X-Bloqcat-Profile"
+    PROFILING_SAMPLE_RATE = 0.0
+    PROFILING_DIR = "profiles"
+    PROFILING_MAX_PROFILES = 100
+
+
+class ProfilingDebugConfig(ProfilingProductionConfig):
+    pass
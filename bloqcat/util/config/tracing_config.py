@@ -0,0 +1,9 @@
+class TracingProductionConfig:
+    # span exporter ("log", "jsonl", "none" or "package.module:factory") and the
+    # file of the jsonl exporter (relative to the instance folder, not rotated)
+    TRACING_EXPORTER = "log"
+    TRACING_FILE = "traces.jsonl"
+
+
+class TracingDebugConfig(TracingProductionConfig):
+    pass
@@ -6,6 +6,7 @@ This Module should only be loaded in debug Mode.
 from flask.app import Flask
 from . import root  # noqa
 from . import routes  # noqa
+from . import profiles  # noqa
 
 
 def register_debug_routes(app: Flask):
@@ -0,0 +1,55 @@
+"""Module containing the debug routes listing the captured request profiles."""
+
+from flask import abort, current_app, render_template, send_file
+
+from ...profiling import (
+    get_profile_dir,
+    is_profile_id,
+    list_profiles,
+    profile_path,
+    summarize_profile,
+)
+from .root import DEBUG_BLP
+
+
+def _existing_profile_path(profile_id: str):
+    if not is_profile_id(profile_id):
+        abort(404)
+    path = profile_path(get_profile_dir(current_app), profile_id)
+    if not path.is_file():
+        abort(404)
+    return path
+
+
+@DEBUG_BLP.route("/profiles")
+def profiles():
+    """Render a list of all captured request profiles."""
+    return render_template(
+        "debug/profiles/all.html",
+        title="Flask Template – Profiles",
+        profiles=list_profiles(get_profile_dir(current_app)),
+        enabled=current_app.config.get("PROFILING_ENABLED", False),
+    )
+
+
+@DEBUG_BLP.route("/profiles/<profile_id>")
+def profile(profile_id: str):
+    """Render the functions with the highest cumulative time of a profile."""
+    _existing_profile_path(profile_id)
+    return render_template(
+        "debug/profiles/profile.html",
+        title=f"Flask Template – Profile {profile_id}",
+        profile_id=profile_id,
+        functions=summarize_profile(get_profile_dir(current_app), profile_id),
+    )
+
+
+@DEBUG_BLP.route("/profiles/<profile_id>/download")
+def download_profile(profile_id: str):
+    """Download a profile in the pstats format (e.g. for snakeviz)."""
+    return send_file(
+        _existing_profile_path(profile_id),
+        mimetype="application/octet-stream",
+        as_attachment=True,
+        download_name=f"{profile_id}.prof",
+    )
@@ -0,0 +1,56 @@
+"""Add the persistent store for concrete solution files.
+
+Revision ID: 3b8e51f0c2a4
+Revises: a7f2c9d41e36
+Create Date: 2026-10-17 01:05:12.418203
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "3b8e51f0c2a4"
+down_revision = "a7f2c9d41e36"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "AtlasFileContent",
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("content", sa.Text(), nullable=False),
+        sa.Column("size", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("content_hash", name=op.f("pk_AtlasFileContent")),
+    )
+    op.create_table(
+        "ConcreteSolutionFile",
+        sa.Column("concrete_solution_id", sa.String(length=255), nullable=False),
+        sa.Column("content_hash", sa.String(length=64), nullable=False),
+        sa.Column("etag", sa.String(length=255), nullable=True),
+        sa.Column("last_modified", sa.String(length=64), nullable=True),
+        sa.Column("fetched_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(
+            ["content_hash"],
+            ["AtlasFileContent.content_hash"],
+            name=op.f("fk_ConcreteSolutionFile_content_hash_AtlasFileContent"),
+        ),
+        sa.PrimaryKeyConstraint(
+            "concrete_solution_id", name=op.f("pk_ConcreteSolutionFile")
+        ),
+    )
+    with op.batch_alter_table("ConcreteSolutionFile", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_ConcreteSolutionFile_content_hash"),
+            ["content_hash"],
+            unique=False,
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("ConcreteSolutionFile", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_ConcreteSolutionFile_content_hash"))
+
+    op.drop_table("ConcreteSolutionFile")
+    op.drop_table("AtlasFileContent")
@@ -0,0 +1,48 @@
+"""Add the table for asynchronous aggregation jobs.
+
+Revision ID: 8c1d6a7e94b2
+Revises: 3b8e51f0c2a4
+Create Date: 2026-10-17 02:14:37.905112
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "8c1d6a7e94b2"
+down_revision = "3b8e51f0c2a4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "AggregationJob",
+        sa.Column("id", sa.String(length=32), nullable=False),
+        sa.Column("state", sa.String(length=16), nullable=False),
+        sa.Column("topology", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("started_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("finished_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column("status_code", sa.Integer(), nullable=True),
+        sa.Column("message", sa.Text(), nullable=True),
+        sa.Column("result_size", sa.Integer(), nullable=True),
+        sa.Column("result", sa.LargeBinary(), nullable=True),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_AggregationJob")),
+    )
+    with op.batch_alter_table("AggregationJob", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_AggregationJob_created_at"), ["created_at"], unique=False
+        )
+        batch_op.create_index(
+            batch_op.f("ix_AggregationJob_state"), ["state"], unique=False
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("AggregationJob", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_AggregationJob_state"))
+        batch_op.drop_index(batch_op.f("ix_AggregationJob_created_at"))
+
+    op.drop_table("AggregationJob")
@@ -0,0 +1,42 @@
+"""Baseline with the tables that existed before the first migration.
+
+Databases created with ``flask create-db`` before the migrations were added
+already contain these tables and are marked as migrated to this revision with
+``flask db stamp a7f2c9d41e36`` before running ``flask db upgrade``.
+
+Revision ID: a7f2c9d41e36
+Revises:
+Create Date: 2026-10-17 00:58:03.274916
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "a7f2c9d41e36"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "Example",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=120), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_Example")),
+    )
+    op.create_table(
+        "TestDataclass",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(length=50), nullable=True),
+        sa.Column("fullname", sa.String(length=50), nullable=False),
+        sa.Column("nickname", sa.String(length=12), nullable=False),
+        sa.PrimaryKeyConstraint("id", name=op.f("pk_TestDataclass")),
+    )
+
+
+def downgrade():
+    op.drop_table("TestDataclass")
+    op.drop_table("Example")
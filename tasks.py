@@ -238,3 +238,71 @@ def update_dependencies(c):
         hide="err",
         warn=True,
     )
+
+
+@task
+def bench(c, profile="quick", group=None, output=None, compare=None):
+    """Run the benchmarks of the aggregation pipeline and save the results as json.
+
+    Args:
+        c (Context): task context
+        profile (str, optional): the benchmark parameters ("quick" or "full"). Defaults to "quick".
+        group (str, optional): only run this benchmark group ("topology", "sections", "aggregation" or "end_to_end"). Defaults to all groups.
+        output (str, optional): the result file. Defaults to benchmarks/results/<commit>-<profile>.json.
+        compare (str, optional): result file of an earlier run to compare with. Defaults to None.
+    """
+    cmd = ["python", "-m", "benchmarks", "--profile", profile]
+    if group:
+        cmd += ["--group", group]
+    if output:
+        cmd += ["--output", output]
+    if compare:
+        cmd += ["--compare", compare]
+    c.run(join(cmd), echo=True)
+
+
+@task
+def load_test(
+    c,
+    server="auto",
+    workers=2,
+    threads=8,
+    concurrency=8,
+    duration=30,
+    mix=None,
+    output=None,
+):
+    """Load test the aggregation endpoint under a WSGI server with the QC Atlas stub.
+
+    Further options are listed by ``python -m benchmarks.load --help``.
+
+    Args:
+        c (Context): task context
+        server (str, optional): "gunicorn", "waitress", "werkzeug" or "auto" (the first installed one). Defaults to "auto".
+        workers (int, optional): number of gunicorn workers. Defaults to 2.
+        threads (int, optional): threads per worker. Defaults to 8.
+        concurrency (int, optional): number of concurrent clients. Defaults to 8.
+        duration (int, optional): seconds of load (after a warmup). Defaults to 30.
+        mix (str, optional): weighted request mix, e.g. "repeated-small=60,unique-large=40". Defaults to None.
+        output (str, optional): write the report as json to this file. Defaults to None.
+    """
+    cmd = [
+        "python",
+        "-m",
+        "benchmarks.load",
+        "--server",
+        server,
+        "--workers",
+        str(workers),
+        "--threads",
+        str(threads),
+        "--concurrency",
+        str(concurrency),
+        "--duration",
+        str(duration),
+    ]
+    if mix:
+        cmd += ["--mix", mix]
+    if output:
+        cmd += ["--output", output]
+    c.run(join(cmd), echo=True)
@@ -0,0 +1,82 @@
+"""Tests of the circuit breaker guarding the QC Atlas."""
+
+from bloqcat.atlas.breaker import CircuitBreaker, CircuitState
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def open_breaker(clock, half_open_max_calls=1):
+    breaker = CircuitBreaker(
+        failure_threshold=3,
+        reset_timeout=30,
+        half_open_max_calls=half_open_max_calls,
+        clock=clock,
+    )
+    for _ in range(3):
+        assert breaker.allow_request()
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(failure_threshold=3, clock=FakeClock())
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success()  # resets the consecutive failures
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.CLOSED
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    assert not breaker.allow_request()
+
+
+def test_half_open_after_the_reset_timeout():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 29.9
+    assert breaker.state == CircuitState.OPEN
+    clock.now = 30
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
+    # only a limited number of trial requests is let through
+    assert not breaker.allow_request()
+
+
+def test_successful_trial_closes_the_circuit():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 30
+    assert breaker.allow_request()
+    breaker.record_success()
+    assert breaker.state == CircuitState.CLOSED
+    assert breaker.allow_request()
+
+
+def test_failed_trial_opens_the_circuit_again():
+    clock = FakeClock()
+    breaker = open_breaker(clock, half_open_max_calls=2)
+    clock.now = 30
+    assert breaker.allow_request()
+    breaker.record_failure()
+    assert breaker.state == CircuitState.OPEN
+    clock.now = 59
+    assert not breaker.allow_request()
+    clock.now = 60
+    assert breaker.state == CircuitState.HALF_OPEN
+
+
+def test_released_trial_can_be_retried():
+    clock = FakeClock()
+    breaker = open_breaker(clock)
+    clock.now = 30
+    assert breaker.allow_request()
+    breaker.release()
+    assert breaker.state == CircuitState.HALF_OPEN
+    assert breaker.allow_request()
@@ -0,0 +1,79 @@
+"""Tests of the in-process LRU cache."""
+
+from bloqcat.util.cache import LRUCache
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_evicts_least_recently_used_entry_by_count():
+    cache = LRUCache(max_entries=2, max_bytes=1000)
+    cache.set("a", 1, 1)
+    cache.set("b", 2, 1)
+    assert cache.get("a") == 1  # "b" is now the least recently used entry
+    cache.set("c", 3, 1)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats.evictions == 1
+
+
+def test_evicts_by_bytes():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", "a", 4)
+    cache.set("b", "b", 4)
+    cache.set("c", "c", 4)
+    assert cache.get("a") is None
+    assert cache.stats.bytes == 8
+    assert cache.stats.entries == 2
+
+
+def test_values_larger_than_the_budget_are_not_cached():
+    cache = LRUCache(max_entries=10, max_bytes=10)
+    cache.set("a", "a", 4)
+    cache.set("huge", "huge", 11)
+    assert cache.get("huge") is None
+    assert cache.get("a") == "a"
+
+
+def test_max_entry_bytes():
+    cache = LRUCache(max_entries=10, max_bytes=100, max_entry_bytes=10)
+    assert cache.entry_size_limit == 10
+    cache.set("small", "small", 10)
+    cache.set("large", "large", 11)
+    assert cache.get("small") == "small"
+    assert cache.get("large") is None
+
+    # replacing an entry with a value above the limit removes the entry
+    cache.set("small", "larger", 20)
+    assert cache.get("small") is None
+    assert cache.stats.bytes == 0
+
+
+def test_expires_entries_after_ttl():
+    clock = FakeClock()
+    cache = LRUCache(max_entries=10, max_bytes=100, ttl=10, clock=clock)
+    cache.set("a", 1, 1)
+    cache.set("b", 2, 1, ttl=30)
+    clock.now = 9.9
+    assert cache.get("a") == 1
+    clock.now = 10
+    assert cache.get("a") is None
+    assert cache.get("b") == 2
+    assert cache.stats.expirations == 1
+    # expired entries still provide the value for revalidation
+    assert cache.peek("a") == 1
+
+
+def test_configure_evicts_to_the_new_limits():
+    cache = LRUCache(max_entries=10, max_bytes=100)
+    for key in range(5):
+        cache.set(key, key, 10)
+    cache.configure(max_entries=2, max_bytes=100, ttl=300)
+    assert cache.stats.entries == 2
+    assert cache.get(4) == 4
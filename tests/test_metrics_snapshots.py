@@ -0,0 +1,85 @@
+"""Tests of the metric snapshots shared between worker processes."""
+
+from json import dump
+from os import getpid
+
+from bloqcat.metrics.registry import MetricsRegistry, merge_snapshots
+from bloqcat.metrics.snapshots import ARCHIVE, SnapshotWriter, read_snapshots
+
+# a pid that is not used by a running process (above the default pid_max)
+DEAD_PID = 2**22 + 1
+
+
+def registry_with(requests, in_flight=0, latency=None):
+    registry = MetricsRegistry()
+    registry.counter("requests_total", "Requests.").inc(requests)
+    registry.gauge("in_flight", "In flight.").set(in_flight)
+    histogram = registry.histogram("latency_seconds", "Latency.", buckets=(1.0,))
+    for value in latency or ():
+        histogram.observe(value)
+    return registry
+
+
+def write_dead_snapshot(directory, registry, name, pid=DEAD_PID, token="dead"):
+    with (directory / name).open("w", encoding="utf-8") as snapshot_file:
+        dump({"pid": pid, "token": token, "metrics": registry.snapshot()}, snapshot_file)
+
+
+def totals(directory):
+    merged = merge_snapshots(read_snapshots(directory))
+    return {
+        name: dict(metric["samples"])
+        for name, metric in merged.items()
+        if metric["samples"]
+    }
+
+
+def test_dead_snapshots_are_folded_into_the_archive(tmp_path):
+    write_dead_snapshot(tmp_path, registry_with(2, 5, [0.5]), "1-a.json")
+    write_dead_snapshot(
+        tmp_path, registry_with(3, 1, [2.0]), "2-b.json", pid=DEAD_PID + 1
+    )
+    before = totals(tmp_path)
+
+    writer = SnapshotWriter(registry_with(1, 1))
+    writer.configure(tmp_path, interval=5)
+    writer.write()
+
+    names = {path.name for path in tmp_path.glob("*.json")}
+    assert names == {ARCHIVE, f"{getpid()}-{writer._token}.json"}
+    after = totals(tmp_path)
+    assert after["requests_total"] == {(): 6}
+    # one observation per bucket (le 1.0 and +Inf), sum 2.5
+    assert after["latency_seconds"] == {(): [[1, 1], 2.5]}
+    # only the gauge of the live process is exposed, before and after the compaction
+    assert "in_flight" not in before
+    assert after["in_flight"] == {(): 1}
+
+
+def test_archive_accumulates_over_compactions(tmp_path):
+    for generation in range(3):
+        write_dead_snapshot(tmp_path, registry_with(1), f"{generation}-old.json")
+        writer = SnapshotWriter(registry_with(0))
+        writer.configure(tmp_path, interval=5)
+        writer.write()
+    assert totals(tmp_path)["requests_total"] == {(): 3}
+    assert len(list(tmp_path.glob("*.json"))) == 2
+
+
+def test_snapshot_of_a_reused_pid_is_not_overwritten(tmp_path):
+    # left over from a dead process that had the pid of the current process
+    write_dead_snapshot(tmp_path, registry_with(4), f"{getpid()}.json", pid=getpid())
+    writer = SnapshotWriter(registry_with(1))
+    writer.configure(tmp_path, interval=5)
+    writer.write()
+    assert totals(tmp_path)["requests_total"] == {(): 5}
+
+
+def test_folded_snapshots_are_not_counted_twice(tmp_path):
+    write_dead_snapshot(tmp_path, registry_with(2), "1-a.json")
+    writer = SnapshotWriter(registry_with(0))
+    writer.configure(tmp_path, interval=5)
+    writer.write()
+    # a snapshot that was folded but could not be removed
+    write_dead_snapshot(tmp_path, registry_with(2), "1-a.json")
+    assert totals(tmp_path)["requests_total"] == {(): 2}
@@ -0,0 +1,91 @@
+"""Tests of the QASM section scanner against the previous line based extraction."""
+
+import pytest
+
+from bloqcat.qasm import QasmSectionError, scan_sections
+
+
+def line_based_extract_cs(input_text):
+    """The body extraction used before the scanner (returning None if not found)."""
+    lines = input_text.split("\n")
+    start_index = None
+    end_index = None
+    for i, line in enumerate(lines):
+        if "creg" in line and start_index is None:
+            start_index = i + 1
+        if "measure" in line and end_index is None:
+            end_index = i
+            break
+    if start_index is not None and end_index is not None:
+        return "\n".join(lines[start_index:end_index])
+    return None
+
+
+def line_based_extract_header(text):
+    """The header extraction used before the scanner."""
+    lines = text.split("\n")
+    for i, line in enumerate(lines):
+        if line.startswith("qreg ") or line.startswith("creg "):
+            return "\n".join(lines[:i])
+    return None
+
+
+FILES = {
+    "complete": (
+        'OPENQASM 2.0;\ninclude "qelib1.inc";\nqreg q[2];\ncreg meas[2];\n'
+        "h q[0];\ncx q[0],q[1];\nmeasure q[0] -> meas[0];\nmeasure q[1] -> meas[1];\n"
+    ),
+    "no header": "qreg q[1];\ncreg c[1];\nx q[0];\nmeasure q[0] -> c[0];\n",
+    "comments": (
+        "OPENQASM 2.0;\n// the creg follows the qreg\nqreg q[1];\ncreg c[1];\n"
+        "// no measure here\nx q[0];\nmeasure q[0] -> c[0];"
+    ),
+    "creg before qreg": (
+        "OPENQASM 2.0;\ncreg c[1];\nqreg q[1];\nh q[0];\nmeasure q[0] -> c[0];\n"
+    ),
+    "crlf": (
+        "OPENQASM 2.0;\r\nqreg q[1];\r\ncreg c[1];\r\nh q[0];\r\nx q[0];\r\n"
+        "measure q[0] -> c[0];\r\n"
+    ),
+    "creg and measure on one line": "qreg q[1];\ncreg c[1]; measure q[0] -> c[0];\n",
+    "measure before creg": "OPENQASM 2.0;\nqreg q[1];\nmeasure q[0] -> c[0];\ncreg c[1];\n",
+    "empty body": "OPENQASM 2.0;\nqreg q[1];\ncreg c[1];\nmeasure q[0] -> c[0];\n",
+    "no measure": "OPENQASM 2.0;\nqreg q[1];\ncreg c[1];\nh q[0];\n",
+    "no creg": "OPENQASM 2.0;\nqreg q[1];\nh q[0];\nmeasure q[0] -> c[0];\n",
+    "indented registers": "OPENQASM 2.0;\n qreg q[1];\n creg c[1];\nh q[0];\nmeasure q;\n",
+    "empty": "",
+}
+
+
+@pytest.mark.parametrize("text", FILES.values(), ids=FILES.keys())
+def test_body_matches_line_based_extraction(text):
+    assert scan_sections(text).body == line_based_extract_cs(text)
+
+
+@pytest.mark.parametrize("text", FILES.values(), ids=FILES.keys())
+def test_header_matches_line_based_extraction(text):
+    assert scan_sections(text).header == line_based_extract_header(text)
+
+
+def test_register_lines():
+    sections = scan_sections(FILES["creg before qreg"])
+    assert sections.registers == ["creg c[1];", "qreg q[1];"]
+
+
+def test_measurements_start_at_the_first_measure_line():
+    sections = scan_sections(FILES["complete"])
+    assert sections.measurements == (
+        "measure q[0] -> meas[0];\nmeasure q[1] -> meas[1];\n"
+    )
+
+
+def test_missing_sections_raise():
+    with pytest.raises(QasmSectionError):
+        scan_sections(FILES["no measure"]).require_body()
+    with pytest.raises(QasmSectionError):
+        scan_sections(FILES["no creg"]).check()
+    # the body is found, but no line starts with a register declaration
+    without_header = "h q[0]; creg c[1];\nx q[0];\nmeasure q -> c;\n"
+    scan_sections(without_header).check()
+    with pytest.raises(QasmSectionError):
+        scan_sections(without_header).check(require_header=True)
@@ -0,0 +1,105 @@
+"""Tests of the request coalescing of concurrent lookups."""
+
+from threading import Event, Lock, Thread
+from time import monotonic, sleep
+
+import pytest
+
+from bloqcat.atlas.singleflight import SingleFlight
+
+
+class CountingEvent(Event):
+    """Event counting the threads waiting for it."""
+
+    def __init__(self):
+        super().__init__()
+        self.waiting = 0
+        self._count_lock = Lock()
+
+    def wait(self, timeout=None):
+        with self._count_lock:
+            self.waiting += 1
+        return super().wait(timeout)
+
+
+def coalesce(function, followers=3):
+    """Call function through a single flight from a leader and several followers.
+
+    The leader runs function, the followers are started once it is running and
+    the function returns only after all followers wait for its result.
+    """
+    flight = SingleFlight()
+    started, release = Event(), Event()
+    calls = []
+    results = []
+
+    def leader_function():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return function()
+
+    def call():
+        try:
+            results.append(flight.do("key", leader_function, timeout=5))
+        except Exception as err:
+            results.append(err)
+
+    leader = Thread(target=call)
+    leader.start()
+    assert started.wait(5)
+    done = flight._calls["key"].done = CountingEvent()
+    threads = [Thread(target=call) for _ in range(followers)]
+    for thread in threads:
+        thread.start()
+    give_up = monotonic() + 5
+    while done.waiting < followers and monotonic() < give_up:
+        sleep(0.001)
+    release.set()
+    for thread in [leader, *threads]:
+        thread.join(5)
+    return calls, results
+
+
+def test_concurrent_calls_share_the_result():
+    calls, results = coalesce(lambda: "result")
+    assert len(calls) == 1
+    assert results == ["result"] * 4
+
+
+def fail():
+    raise RuntimeError("failed")
+
+
+def test_concurrent_calls_share_the_error():
+    calls, results = coalesce(fail)
+    assert len(calls) == 1
+    assert len(results) == 4
+    # all callers get the same exception instance
+    assert all(result is results[0] for result in results)
+    assert isinstance(results[0], RuntimeError)
+
+
+def test_the_next_call_after_a_failure_runs_again():
+    flight = SingleFlight()
+    with pytest.raises(RuntimeError):
+        flight.do("key", fail)
+    assert flight.do("key", lambda: "result") == "result"
+
+
+def test_followers_stop_waiting_after_the_timeout():
+    flight = SingleFlight()
+    started, release = Event(), Event()
+
+    def slow():
+        started.set()
+        release.wait(5)
+        return "result"
+
+    leader = Thread(target=flight.do, args=("key", slow))
+    leader.start()
+    assert started.wait(5)
+    with pytest.raises(TimeoutError):
+        flight.do("key", lambda: "other", timeout=0.01)
+    release.set()
+    leader.join(5)
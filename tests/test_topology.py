@@ -0,0 +1,110 @@
+"""Tests of the topology graph, the aggregation order and the topology fingerprint."""
+
+from random import Random
+
+import pytest
+
+from bloqcat.aggregation import TopologyCycleError, TopologyGraph, topology_fingerprint
+
+CONCRETE_SOLUTION = "Concrete Solution of Pattern {}"
+
+
+def node(node_id, name=None):
+    return {
+        "id": node_id,
+        "name": name or CONCRETE_SOLUTION.format(node_id),
+        "properties": {"kvproperties": {"QubitCount": "2", "hasHeader": "true"}},
+    }
+
+
+def relationship(source, target, name="Aggregation"):
+    return {
+        "id": f"{name}-{source}-{target}",
+        "name": name,
+        "sourceElement": {"ref": source},
+        "targetElement": {"ref": target},
+    }
+
+
+def topology(node_ids, edges, patterns=()):
+    return {
+        "id": "service-template",
+        "nodeTemplates": [node(i) for i in node_ids]
+        + [node(p, name=f"Pattern {p}") for p in patterns],
+        "relationshipTemplates": [relationship(*edge) for edge in edges],
+    }
+
+
+def order_of(data):
+    return TopologyGraph.from_topology(data).aggregation_order()
+
+
+def test_follows_the_aggregation_relationships():
+    data = topology(["c", "a", "b"], [("a", "b"), ("b", "c")])
+    assert order_of(data) == ["a", "b", "c"]
+
+
+def test_unconstrained_nodes_keep_the_order_of_the_node_templates():
+    # a and d both precede c, b precedes d
+    data = topology(["c", "d", "b", "a"], [("a", "c"), ("d", "c"), ("b", "d")])
+    assert order_of(data) == ["b", "d", "a", "c"]
+
+
+def test_order_does_not_depend_on_the_order_of_the_relationships():
+    edges = [("a", "b"), ("a", "c"), ("b", "d"), ("c", "d"), ("e", "d")]
+    expected = order_of(topology(["a", "b", "c", "d", "e"], edges))
+    rng = Random(1)
+    for _ in range(10):
+        shuffled = edges[:]
+        rng.shuffle(shuffled)
+        assert order_of(topology(["a", "b", "c", "d", "e"], shuffled)) == expected
+
+
+def test_only_concrete_solutions_connected_by_aggregations_are_ordered():
+    data = topology(
+        ["a", "b", "lonely"],
+        [("a", "b"), ("p", "a", "Solution"), ("b", "p")],
+        patterns=["p"],
+    )
+    assert order_of(data) == ["a", "b"]
+
+
+def test_detects_cycles():
+    data = topology(
+        ["a", "b", "c", "d"], [("a", "b"), ("b", "c"), ("c", "b"), ("c", "d")]
+    )
+    with pytest.raises(TopologyCycleError) as error:
+        order_of(data)
+    assert error.value.node_ids == ["b", "c", "d"]
+
+
+def fingerprint_of(data, content_hashes):
+    solution_nodes, solution_relationships = TopologyGraph.from_topology(
+        data
+    ).solution_path()
+    return topology_fingerprint(
+        solution_nodes,
+        solution_relationships,
+        (content_hashes[i] for i in solution_nodes),
+    )
+
+
+def test_fingerprint_is_stable_under_reordering():
+    node_ids = ["a", "b", "c", "d"]
+    edges = [("a", "b"), ("b", "c"), ("c", "d"), ("p", "a", "Solution")]
+    hashes = {i: f"hash-{i}" for i in node_ids}
+    expected = fingerprint_of(topology(node_ids, edges, patterns=["p"]), hashes)
+    rng = Random(2)
+    for _ in range(10):
+        data = topology(node_ids, edges, patterns=["p"])
+        rng.shuffle(data["nodeTemplates"])
+        rng.shuffle(data["relationshipTemplates"])
+        assert fingerprint_of(data, hashes) == expected
+
+
+def test_fingerprint_depends_on_the_files_and_the_order():
+    hashes = {"a": "hash-a", "b": "hash-b"}
+    forward = fingerprint_of(topology(["a", "b"], [("a", "b")]), hashes)
+    assert fingerprint_of(topology(["a", "b"], [("b", "a")]), hashes) != forward
+    changed = {**hashes, "b": "hash-b2"}
+    assert fingerprint_of(topology(["a", "b"], [("a", "b")]), changed) != forward